@@ -24,9 +24,13 @@
 """
 
 import base64
-import json
-import re
+import os
+import random
+import threading
+import time
 import html as html_lib
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
@@ -35,6 +39,10 @@ import requests
 import streamlit as st
 from dotenv import load_dotenv
 
+from src.chat_history import ChatHistory
+from src.recommendations import RecommendationCatalog, normalize_question
+from src.url_buttons import convert_links_to_buttons, get_resolver
+
 # ===== 키워드 설정 =====
 # 상담원 전화 연결을 위한 키워드 리스트 (사용자 입력에서 이 키워드들이 포함되면 전화 연결 버튼이 표시됩니다)
 COUNSELOR_KEYWORDS = [
@@ -99,25 +107,39 @@ def get_app_paths() -> Tuple[Path, Path, Path]:
     return logo, user_avatar, bot_avatar
 
 
-def load_recommendations() -> List[Dict[str, Any]]:
-    """추천 질문 목록을 JSON 파일에서 로드합니다."""
-    try:
-        recommendations_file = Path(__file__).resolve().parent / "recommendations.json"
-        if recommendations_file.exists():
-            with open(recommendations_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get("recommendations", [])
-        else:
-            st.warning("추천 질문 파일을 찾을 수 없습니다.")
-            return []
-    except Exception as e:
-        st.error(f"추천 질문 로드 오류: {e}")
-        return []
+# 첫 화면에 표시할 샘플 질문 수 / 카테고리당 최대 개수
+SAMPLE_QUESTION_COUNT = int(os.getenv("SAMPLE_QUESTION_COUNT", "5"))
+SAMPLE_PER_CATEGORY = int(os.getenv("SAMPLE_PER_CATEGORY", "1"))
+
+
+@st.cache_resource
+def get_recommendation_catalog() -> RecommendationCatalog:
+    """추천 질문 카탈로그 (프로세스당 1개). 파일이 바뀐 경우에만 다시 읽습니다."""
+    return RecommendationCatalog(Path(__file__).resolve().parent / "recommendations.json")
+
+
+def get_session_samples() -> List[Dict[str, Any]]:
+    """이 세션에 보여줄 샘플 질문. 카테고리별로 뽑아 세션 동안 고정합니다."""
+    catalog = get_recommendation_catalog()
+    catalog.items()  # 필요 시 변경 감지/재로드
+    if catalog.last_error:
+        st.warning(catalog.last_error)
+    cached = st.session_state.get("sample_questions")
+    if cached is None or cached[0] != catalog.version:
+        samples = catalog.sample(SAMPLE_QUESTION_COUNT, SAMPLE_PER_CATEGORY, random.Random())
+        cached = (catalog.version, samples)
+        st.session_state["sample_questions"] = cached
+    return cached[1]
 
 
 def call_api(user_text: str, user_id: str, session_id: str) -> Dict[str, Any]:
-    """외부 API를 호출하여 응답을 받습니다."""
-    api_url = "http://34.64.207.124:8000/agent/"
+    """외부 API를 호출하여 응답을 받습니다.
+
+    백그라운드 스레드에서도 호출되므로 Streamlit 요소를 직접 그리지 않습니다.
+    오류 시에는 대체 응답에 `_error` 필드를 담아 반환하고, 화면 표시는 호출 측에서 처리합니다.
+    """
+    # 로컬 서비스(python -m src.server)로 테스트하려면 AGENT_API_URL=http://127.0.0.1:8000/agent/
+    api_url = os.getenv("AGENT_API_URL", "http://34.64.207.124:8000/agent/")
     
     payload = {
         "user_id": user_id,
@@ -178,8 +200,8 @@ def call_api(user_text: str, user_id: str, session_id: str) -> Dict[str, Any]:
 
         return api_response
     except requests.exceptions.RequestException as e:
-        st.error(f"API 호출 오류: {e}")
         return {
+            "_error": f"API 호출 오류: {e}",
             "user_id": user_id,
             "session_id": session_id,
             "response": "죄송합니다. 일시적인 오류가 발생했습니다. 잠시 후 다시 시도해주세요.",
@@ -190,6 +212,198 @@ def call_api(user_text: str, user_id: str, session_id: str) -> Dict[str, Any]:
         }
 
 
+# ===== 공유 응답 캐시 =====
+# 추천(샘플) 질문처럼 세션 문맥과 무관한 질문은 여러 사용자가 동일하게 보내므로,
+# 짧은 TTL 동안 응답을 공유하고 동시에 들어온 동일 요청은 하나의 upstream 호출로 병합합니다.
+AGENT_CACHE_TTL = float(os.getenv("AGENT_CACHE_TTL", "60"))
+AGENT_CACHE_MAX_ENTRIES = int(os.getenv("AGENT_CACHE_MAX_ENTRIES", "256"))
+
+
+class SharedResponseCache:
+    """세션 간 공유되는 TTL 응답 캐시 + 진행 중(in-flight) 요청 병합."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self.stats = {"hit": 0, "miss": 0, "coalesced": 0}
+
+    def get_or_fetch(self, key: str, fetch) -> Dict[str, Any]:
+        """캐시 적중 시 저장된 응답, 진행 중인 동일 요청이 있으면 그 결과를, 아니면 fetch() 결과를 반환."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.monotonic() - entry[0] < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.stats["hit"] += 1
+                    return entry[1]
+                del self._entries[key]
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.stats["miss"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fetch()
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(exc)
+            raise
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            # 오류 응답은 캐시하지 않음 (병합된 대기 요청에는 그대로 전달)
+            if not result.get("_error"):
+                self._entries[key] = (time.monotonic(), result)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        future.set_result(result)
+        return result
+
+
+@st.cache_resource
+def get_shared_response_cache() -> SharedResponseCache:
+    """프로세스당 1개의 공유 응답 캐시."""
+    return SharedResponseCache(AGENT_CACHE_TTL, AGENT_CACHE_MAX_ENTRIES)
+
+
+# 공유 응답에서 가져오는 필드 (답변 내용만, user_id/session_id 등 upstream 세션 정보는 제외)
+SHARED_ANSWER_FIELDS = ("response", "refUrl", "intent", "guardrail_result", "sentiment", "_error")
+
+
+def call_api_shared(user_text: str, user_id: str, session_id: str, cache: SharedResponseCache) -> Dict[str, Any]:
+    """세션과 무관한 질문용 API 호출. 공유 캐시/요청 병합을 거칩니다.
+
+    upstream 호출은 세션 정보 없이 수행하고, 반환 값에는 답변 필드만 복사한 뒤 호출자의 user_id/session_id를 둡니다.
+    upstream 응답의 user_id/session_id(공유 호출용으로 서버가 발급한 값)는 호출자에게 넘기지 않으므로,
+    아직 서버 세션이 없는 호출자는 빈 session_id를 그대로 받고 다음 직접 호출에서 자기 세션을 발급받습니다.
+    백그라운드 스레드에서 실행되므로 캐시 객체는 호출 측(스크립트 스레드)에서 받아 전달합니다.
+    """
+    shared = cache.get_or_fetch(
+        normalize_question(user_text), lambda: call_api(user_text, "", "")
+    )
+    response: Dict[str, Any] = {k: shared[k] for k in SHARED_ANSWER_FIELDS if k in shared}
+    response["refUrl"] = list(shared.get("refUrl", []))
+    response["user_id"] = user_id
+    response["session_id"] = session_id
+    return response
+
+
+def is_session_independent(user_text: str) -> bool:
+    """추천 질문과 동일한 질문인지 확인합니다 (세션 문맥과 무관하게 답변이 같은 질문)."""
+    return get_recommendation_catalog().contains_question(user_text)
+
+
+# ===== 비동기 API 호출 =====
+# 폴링 주기(초): 응답 대기 중 로딩 영역만 이 주기로 다시 그리며 완료 여부를 확인합니다.
+API_POLL_INTERVAL = float(os.getenv("API_POLL_INTERVAL", "0.5"))
+
+
+@st.cache_resource
+def get_api_executor() -> ThreadPoolExecutor:
+    """API 호출용 백그라운드 실행기 (프로세스당 1개, 모든 세션이 공유)."""
+    return ThreadPoolExecutor(
+        max_workers=int(os.getenv("API_MAX_WORKERS", "8")),
+        thread_name_prefix="agent-api",
+    )
+
+
+def dispatch_api_request() -> None:
+    """마지막 사용자 메시지에 대한 API 호출을 백그라운드로 제출합니다.
+
+    세션당 진행 중인 요청은 하나뿐이며, 이미 제출된 메시지는 다시 제출하지 않습니다.
+    """
+    messages = st.session_state["messages"]
+    if not messages or messages[-1].get("role") != "user":
+        return
+    if st.session_state.get("api_future") is not None:
+        return
+    user_text = messages[-1]["content"]
+    args = (user_text, st.session_state["user_id"], st.session_state["session_id"])
+    # 공유 여부는 질문 텍스트로만 판단 (샘플 질문은 첫 메시지라 서버 세션이 없을 때도 공유 경로를 탐)
+    if is_session_independent(user_text):
+        future = get_api_executor().submit(call_api_shared, *args, get_shared_response_cache())
+    else:
+        future = get_api_executor().submit(call_api, *args)
+    st.session_state["api_future"] = future
+    st.session_state["api_message"] = messages[-1]
+
+
+def cancel_api_request() -> None:
+    """진행 중인 API 요청을 취소합니다. 이미 실행 중이면 결과만 버려집니다."""
+    future: Optional[Future] = st.session_state.get("api_future")
+    if future is not None:
+        future.cancel()
+    st.session_state["api_future"] = None
+    st.session_state["api_message"] = None
+
+
+def collect_api_response() -> bool:
+    """완료된 API 응답을 대화 기록과 상태에 반영합니다. 반영했으면 True."""
+    future: Optional[Future] = st.session_state.get("api_future")
+    if future is None or not future.done():
+        return False
+
+    request_message = st.session_state.get("api_message")
+    st.session_state["api_future"] = None
+    st.session_state["api_message"] = None
+    st.session_state["is_loading"] = False
+    if future.cancelled():
+        return False
+
+    # 요청 이후 대화가 초기화되었다면 늦게 도착한 응답은 버립니다.
+    messages = st.session_state["messages"]
+    if request_message is None or not messages or messages[-1] is not request_message:
+        return False
+
+    api_response = future.result()
+    if api_response.get("_error"):
+        st.error(api_response["_error"])
+
+    # API 응답에서 user_id와 session_id 업데이트
+    if api_response.get("user_id"):
+        st.session_state["user_id"] = api_response["user_id"]
+    if api_response.get("session_id"):
+        st.session_state["session_id"] = api_response["session_id"]
+
+    # 봇 응답 추가 (refUrl 포함)
+    response = api_response.get("response", "죄송합니다. 응답을 받지 못했습니다.")
+
+    if isinstance(response, str) and response.strip().startswith(('{', '[')):
+      response = "상담원 연결 링크를 안내드리겠습니다. https://www.ddangyo.com/"
+
+    messages.append({
+        "role": "assistant",
+        "content": response,
+        "refUrl": api_response.get("refUrl", [])  # refUrl을 메시지에 포함
+    })
+
+    # 상태 업데이트
+    st.session_state["last_guardrail"] = api_response.get("guardrail_result", "")
+    st.session_state["last_intent"] = api_response.get("intent", "")
+    st.session_state["last_sentiment"] = api_response.get("sentiment", "NEUTRAL")
+    return True
+
+
+@st.fragment(run_every=API_POLL_INTERVAL)
+def render_pending_reply(bot_uri: str) -> None:
+    """응답 대기 중 로딩 스켈레톤을 표시하고, 완료되면 전체 화면을 갱신합니다."""
+    future: Optional[Future] = st.session_state.get("api_future")
+    if future is None or future.done():
+        st.rerun()
+    render_loading_skeleton(bot_uri)
+
+
 def render_loading_skeleton(bot_uri: str) -> None:
     """답변 대기 중 로딩 스켈레톤을 렌더링합니다."""
     st.markdown(
@@ -682,8 +896,8 @@ def render_header_buttons() -> None:
 
 
 def render_sample_questions() -> None:
-    """샘플 질문 5개를 렌더링합니다."""
-    recommendations = load_recommendations()
+    """샘플 질문(기본 5개, 카테고리별 추출)을 렌더링합니다."""
+    recommendations = get_session_samples()
     
     if not recommendations:
         return
@@ -714,27 +928,9 @@ def render_sample_questions() -> None:
 
 
 def _get_button_text_for_url(url: str) -> str:
-    """URL 패턴에 따라 적절한 버튼 텍스트를 반환합니다."""
+    """URL 패턴에 따라 적절한 버튼 텍스트를 반환합니다. (button_labels.json의 link_prefixes)"""
     try:
-        if not url:
-            return "링크"
-
-        # 특정 URL 패턴에 따른 버튼 텍스트 매핑
-        url_patterns = {
-            "https://sendmessage-sh-9224.twil.io/send-sms": "사장님께 문자하기",
-            "https://sendmessage-sh-9224.twil.io/make-call": "사장님께 전화하기",
-            "https://support.example.com/call": "고객센터 연결하기",
-            "https://www.ddangyo.com": "고객센터 전화하기"
-        }
-
-        # 정확한 패턴 매칭 (startswith 사용)
-        for pattern_url, button_text in url_patterns.items():
-            if url.startswith(pattern_url):
-                return button_text
-
-        # 기본 버튼 텍스트
-        return "링크 열기"
-
+        return get_resolver().label_for_link(url)
     except Exception:
         return "링크 열기"
 
@@ -745,102 +941,16 @@ def _convert_links_to_buttons(text: str) -> str:
         return ""
 
     try:
-        # 전체 텍스트를 먼저 이스케이프
-        escaped = html_lib.escape(text)
-
-        # URL 패턴 (http/https 및 커스텀 스킴)
-        url_pattern = re.compile(r"(https?://[^\s]+|[a-zA-Z][a-zA-Z0-9+.-]*://[^\s]+)")
-
-        def repl(match: re.Match) -> str:
-            try:
-                url = match.group(0)
-                # URL 패턴에 따른 버튼 텍스트 결정
-                button_text = _get_button_text_for_url(url)
-                # URL을 안전하게 이스케이프
-                safe_url = html_lib.escape(url)
-                return f'<a class="deeplink-btn" href="{safe_url}" target="_blank" rel="noopener noreferrer">{button_text}</a>'
-            except Exception:
-                return "링크 열기"
-
-        converted = url_pattern.sub(repl, escaped)
-        return converted
-
-    except Exception as e:
+        return convert_links_to_buttons(text)
+    except Exception:
         # 변환 실패 시 원본 텍스트를 안전하게 반환
         return html_lib.escape(text)
 
 
 def get_button_text_from_url(url: str) -> str:
-    """URL 패턴에 따라 버튼 텍스트를 결정합니다."""
+    """URL 패턴에 따라 버튼 텍스트를 결정합니다. (button_labels.json의 ref_keywords/ref_schemes)"""
     try:
-        if not url or not isinstance(url, str):
-            return "링크"
-
-        # URL 패턴별 버튼 텍스트 매핑 규칙
-        url_patterns = {
-            # 고객 지원 관련
-            "support": "1:1 고객문의",
-            "help": "도움말",
-            "faq": "자주묻는 질문",
-            "contact": "연락처",
-            "call": "전화상담",
-
-            # 서비스 관련
-            "service": "서비스 안내",
-            "guide": "이용가이드",
-            "manual": "매뉴얼",
-            "tutorial": "튜토리얼",
-
-            # 주문/결제 관련
-            "order": "주문조회",
-            "payment": "결제관리",
-            "billing": "청구서",
-            "invoice": "영수증",
-
-            # 계정 관련
-            "account": "계정관리",
-            "profile": "프로필",
-            "settings": "설정",
-            "preferences": "환경설정",
-
-            # 앱 관련
-            "app": "앱 다운로드",
-            "download": "다운로드",
-            "install": "설치",
-
-            # 기타
-            "terms": "이용약관",
-            "privacy": "개인정보처리방침",
-            "notice": "공지사항",
-            "news": "뉴스",
-            "blog": "블로그"
-        }
-
-        # URL을 소문자로 변환하여 패턴 매칭
-        url_lower = url.lower()
-
-        # 패턴 매칭 (가장 구체적인 패턴부터 검사)
-        for pattern, button_text in url_patterns.items():
-            if pattern in url_lower:
-                return button_text
-
-        # tel: 스킴 처리 (상담원 전화 연결)
-        if url_lower.startswith('tel:'):
-            return "상담원 연결하기"
-
-        # 패턴이 매칭되지 않으면 도메인 기반 텍스트 생성
-        try:
-            parsed_url = urlparse(url)
-            if parsed_url.scheme and parsed_url.netloc:
-                domain = parsed_url.netloc
-                if domain.startswith('www.'):
-                    domain = domain[4:]
-                return domain
-            else:
-                return "링크"
-        except Exception:
-            return "링크"
-
+        return get_resolver().label_for_ref_url(url)
     except Exception:
         return "링크"
 
@@ -891,6 +1001,13 @@ def render_url_buttons(ref_urls: List[str]) -> str:
         return ""
 
 
+def render_history_loader(history: ChatHistory) -> None:
+    """보관된 이전 대화가 있으면 '이전 대화 더보기' 버튼을 표시합니다."""
+    if history.has_older() and st.button("이전 대화 더보기", key="load_older_history"):
+        history.load_older()
+        st.rerun()
+
+
 def render_messages(messages: List[Dict[str, str]], user_uri: str, bot_uri: str) -> None:
     """대화 메시지 목록을 렌더링합니다."""
     
@@ -969,9 +1086,9 @@ def main() -> None:
     if "session_id" not in st.session_state:
         st.session_state["session_id"] = ""  # API에서 받을 예정
     if "messages" not in st.session_state:
-        st.session_state["messages"] = [
+        st.session_state["messages"] = ChatHistory([
             {"role": "assistant", "content": "안녕하세요! 땡겨요 AI 에이전트입니다. 무엇을 도와드릴까요?"}
-        ]
+        ])
     if "last_guardrail" not in st.session_state:
         st.session_state["last_guardrail"] = ""
     if "last_intent" not in st.session_state:
@@ -986,8 +1103,15 @@ def main() -> None:
         st.session_state["pending_question"] = None
     if "show_toast" not in st.session_state:
         st.session_state["show_toast"] = False
-    if "api_processing" not in st.session_state:
-        st.session_state["api_processing"] = False
+    if "api_future" not in st.session_state:
+        st.session_state["api_future"] = None
+    if "api_message" not in st.session_state:
+        st.session_state["api_message"] = None
+
+    # 백그라운드 API 호출 상태 동기화 (완료된 응답 반영 또는 대기 중인 요청 제출)
+    response_arrived = collect_api_response()
+    if st.session_state["is_loading"]:
+        dispatch_api_request()
 
     # 이미지 로드
     logo_path, user_path, bot_path = get_app_paths()
@@ -999,32 +1123,37 @@ def main() -> None:
     render_global_css(logo_uri, user_uri, bot_uri)
     render_header(logo_uri)
     render_header_buttons()
+    render_history_loader(st.session_state["messages"])
     render_messages(st.session_state["messages"], user_uri, bot_uri)
     
     # 처음 진입 시에만 샘플 질문 표시
     if st.session_state["show_samples"] and len(st.session_state["messages"]) == 1:
         render_sample_questions()
     
-    # 로딩 중일 때 스켈레톤 표시
+    # 로딩 중일 때 스켈레톤 표시 (완료될 때까지 이 영역만 주기적으로 갱신)
     if st.session_state["is_loading"]:
-        render_loading_skeleton(bot_uri)
+        render_pending_reply(bot_uri)
     
     # 상담 종료 버튼 (대화가 시작된 후에만 표시)
     if len(st.session_state["messages"]) > 1:  # 초기 인사말 외에 메시지가 있을 때만 표시
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
             if st.button("◀ 상담 종료하기", key="end_chat", help="대화를 종료하고 새로운 상담을 시작합니다", type="secondary"):
+                # 진행 중인 API 요청 취소
+                cancel_api_request()
+
                 # 세션 상태 초기화
                 st.session_state["user_id"] = ""
                 st.session_state["session_id"] = ""
-                st.session_state["messages"] = [
+                st.session_state["messages"] = ChatHistory([
                     {"role": "assistant", "content": "안녕하세요! 땡겨요 AI 에이전트입니다. 무엇을 도와드릴까요?"}
-                ]
+                ])
                 st.session_state["last_guardrail"] = ""
                 st.session_state["last_intent"] = ""
                 st.session_state["last_sentiment"] = ""
                 st.session_state["is_loading"] = False
                 st.session_state["show_samples"] = True  # 샘플 질문 다시 표시
+                st.session_state["sample_questions"] = None  # 새 상담에서는 샘플을 다시 추출
                 st.session_state["pending_question"] = None
                 
                 # 세션 상태에 토스트 메시지 플래그 설정
@@ -1064,18 +1193,19 @@ def main() -> None:
         st.session_state["last_sentiment"]
     )
 
-    # 사용자 입력 처리
-    user_text = st.chat_input("메시지를 입력하세요")
+    # 사용자 입력 처리 (응답 대기 중에는 중복 요청을 막기 위해 입력 비활성화)
+    user_text = st.chat_input("메시지를 입력하세요", disabled=st.session_state["is_loading"])
     
     # Handle pending question from sample buttons
     if st.session_state.get("pending_question"):
         user_text = st.session_state["pending_question"]
         st.session_state["pending_question"] = None  # Clear pending question
     
-    if user_text:
-        # 1단계: 즉시 사용자 메시지 표시하고 로딩 상태로 전환
+    if user_text and not st.session_state["is_loading"]:
+        # 사용자 메시지 표시, 로딩 상태 전환 후 백그라운드로 API 호출 제출
         st.session_state["messages"].append({"role": "user", "content": user_text})
         st.session_state["is_loading"] = True
+        dispatch_api_request()
         
         # 샘플 질문 숨기기 (첫 번째 사용자 메시지 후)
         if st.session_state["show_samples"]:
@@ -1083,79 +1213,27 @@ def main() -> None:
         
         # 즉시 화면 업데이트 (사용자 메시지와 로딩 표시)
         st.rerun()
-    
-    # 2단계: 로딩 상태에서 API 호출 처리
-    if st.session_state["is_loading"] and len(st.session_state["messages"]) > 0:
-        last_message = st.session_state["messages"][-1]
-        if last_message["role"] == "user" and not st.session_state.get("api_processing", False):
-            # API 처리 시작 플래그 설정 (중복 호출 방지)
-            st.session_state["api_processing"] = True
-            
-            # 로딩 스켈레톤을 먼저 보여주기 위해 잠시 대기
-            import time
-            time.sleep(0.1)  # 100ms 대기로 로딩 스켈레톤 표시 보장
-            
-            # API 호출
-            api_response = call_api(
-                last_message["content"], 
-                st.session_state["user_id"], 
-                st.session_state["session_id"]
-            )
-            
-            # API 응답에서 user_id와 session_id 업데이트
-            if api_response.get("user_id"):
-                st.session_state["user_id"] = api_response["user_id"]
-            if api_response.get("session_id"):
-                st.session_state["session_id"] = api_response["session_id"]
-            
-            # 봇 응답 추가 (refUrl 포함)
-            response = api_response.get("response", "죄송합니다. 응답을 받지 못했습니다.")
 
-            if isinstance(response, str) and response.strip().startswith(('{', '[')):
-              response = "상담원 연결 링크를 안내드리겠습니다. https://www.ddangyo.com/"
-            
-            bot_reply = response
-            ref_urls = api_response.get("refUrl", [])  # refUrl 필드 추가
-            
-            st.session_state["messages"].append({
-                "role": "assistant", 
-                "content": bot_reply,
-                "refUrl": ref_urls  # refUrl을 메시지에 포함
-            })
-            
-            # 상태 업데이트
-            st.session_state["last_guardrail"] = api_response.get("guardrail_result", "")
-            st.session_state["last_intent"] = api_response.get("intent", "")
-            st.session_state["last_sentiment"] = api_response.get("sentiment", "NEUTRAL")
-            
-            # 로딩 상태 및 API 처리 플래그 해제
-            st.session_state["is_loading"] = False
-            st.session_state["api_processing"] = False
-            
-            # 자동 스크롤을 위한 JavaScript 추가
-            st.markdown(
-                """
-                <script>
-                setTimeout(function() {
-                    var messagesContainer = document.getElementById('messages-container');
-                    if (messagesContainer) {
-                        messagesContainer.scrollIntoView({ behavior: 'smooth', block: 'end' });
-                    } else {
-                        window.scrollTo({
-                            top: document.body.scrollHeight,
-                            behavior: 'smooth'
-                        });
-                    }
-                }, 100);
-                </script>
-                """,
-                unsafe_allow_html=True
-            )
-            
-            # 봇 응답 완료 후 화면 업데이트
-            st.rerun()
-    
-    # 이제 API 호출이 사용자 입력 시 즉시 처리되므로 이 블록은 불필요
+    if response_arrived:
+        # 자동 스크롤을 위한 JavaScript 추가
+        st.markdown(
+            """
+            <script>
+            setTimeout(function() {
+                var messagesContainer = document.getElementById('messages-container');
+                if (messagesContainer) {
+                    messagesContainer.scrollIntoView({ behavior: 'smooth', block: 'end' });
+                } else {
+                    window.scrollTo({
+                        top: document.body.scrollHeight,
+                        behavior: 'smooth'
+                    });
+                }
+            }, 100);
+            </script>
+            """,
+            unsafe_allow_html=True
+        )
 
 
 if __name__ == "__main__":
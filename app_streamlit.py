@@ -6,8 +6,8 @@ from dotenv import load_dotenv
 from PIL import Image
 
 # LangGraph 그래프 로딩
-from src.graph import build_graph
-from src.safety import moderate_or_block
+from src.warmup import get_graph, start_warmup
+from src.chat_history import ChatHistory
 
 
 def get_project_root() -> Path:
@@ -26,10 +26,10 @@ def get_asset_path(relative: str) -> Path:
 
 
 def init_app_state() -> None:
-    if "graph" not in st.session_state:
-        st.session_state.graph = build_graph()
+    # 그래프 준비는 프로세스당 1회, 백그라운드에서 진행 (첫 질문 시 완료를 기다림)
+    start_warmup()
     if "messages" not in st.session_state:
-        st.session_state.messages = []
+        st.session_state.messages = ChatHistory()
 
 
 def render_header(logo_path: Path) -> None:
@@ -56,6 +56,14 @@ def render_header(logo_path: Path) -> None:
     # 헤더와 채팅 영역 구분 장식 제거 (요청 반영)
 
 
+def render_history_loader() -> None:
+    """보관된 이전 대화가 있으면 '이전 대화 더보기' 버튼을 표시합니다."""
+    history = st.session_state.messages
+    if history.has_older() and st.button("이전 대화 더보기", key="load_older_history"):
+        history.load_older()
+        st.rerun()
+
+
 def render_messages(user_avatar: Path, bot_avatar: Path) -> None:
     for message in st.session_state.messages:
         role = message.get("role", "assistant")
@@ -106,13 +114,10 @@ def _render_bubble_with_avatar(text: str, avatar_path: Path, align: str = "left"
 
 
 def invoke_agent(user_text: str) -> str:
-    # 안전 필터링
-    blocked, safe_text, stats = moderate_or_block(user_text)
-    if blocked:
+    # 안전 필터링은 그래프의 moderate 노드에서 수행
+    result = get_graph().invoke({"user_input": user_text, "channel": "web"})
+    if result.get("blocked"):
         return "부적절한 표현이 감지되어 요청이 차단되었습니다."
-
-    state = {"user_input": safe_text, "_safety_stats": stats}
-    result = st.session_state.graph.invoke(state)
     return (
         result.get("final_text")
         or result.get("response")
@@ -220,6 +225,7 @@ def main() -> None:
     if b3:
         st.toast("기업구매문의", icon="✅")
 
+    render_history_loader()
     render_messages(user_avatar, bot_avatar)
 
     if prompt := st.chat_input("메시지를 입력하세요…"):
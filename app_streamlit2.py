@@ -35,13 +35,17 @@
 import base64
 import os
 import re
+import uuid
 import html as html_lib
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import streamlit as st
 from dotenv import load_dotenv
-from src.safety import moderate_or_block
+from src.chat_history import ChatHistory
+from src.session_store import get_default_store, record_turn
+from src.warmup import start_warmup
+from src.url_buttons import URL_RE
 
 
 def load_image_safe(path: Path) -> Optional[bytes]:
@@ -79,15 +83,14 @@ def to_b64_data_uri(img_bytes: Optional[bytes], mime: str = "image/png") -> str:
 
 
 def init_graph() -> Any:
-    """앱에서 사용하는 그래프(에이전트 파이프라인)를 세션에 1회 생성/캐싱합니다.
+    """앱에서 사용하는 그래프(에이전트 파이프라인)를 반환합니다.
 
-    내부적으로 `src.graph.build_graph()`를 호출합니다.
+    그래프와 RAG 인덱스는 프로세스당 1회 백그라운드에서 준비되며(`src.warmup`),
+    준비가 끝나지 않았으면 완료될 때까지 기다립니다.
     """
-    if "graph" not in st.session_state or st.session_state.get("graph") is None:
-        from src.graph import build_graph
+    from src.warmup import get_graph
 
-        st.session_state["graph"] = build_graph()
-    return st.session_state["graph"]
+    return get_graph()
 
 
 def get_app_paths() -> Tuple[Path, Path, Path]:
@@ -336,9 +339,7 @@ def _convert_links_to_buttons(text: str) -> str:
     # 1) 전체를 escape 해서 안전하게 만든 후, URL만 버튼으로 대체
     escaped = html_lib.escape(text)
 
-    # 2) URL 정규식 (http/https 및 커스텀 스킴 모두 포괄)
-    url_pattern = re.compile(r"(https?://[^\s]+|[a-zA-Z][a-zA-Z0-9+.-]*://[^\s]+)")
-
+    # 2) URL 정규식 (http/https 및 커스텀 스킴 모두 포괄) - src.url_buttons에 미리 컴파일됨
     def repl(match: re.Match) -> str:
         url = match.group(0)
         safe_url = html_lib.escape(url)
@@ -346,7 +347,7 @@ def _convert_links_to_buttons(text: str) -> str:
             f'<a class="deeplink-btn" href="{safe_url}" target="_blank" rel="noopener noreferrer">{button_label}</a>'
         )
 
-    converted = url_pattern.sub(repl, escaped)
+    converted = URL_RE.sub(repl, escaped)
     return converted
 
  
@@ -364,13 +365,16 @@ def call_graph(user_text: str) -> str:
     """
     graph = init_graph()
     try:
-        # 입력 안전 필터링
-        blocked, safe_text, stats = moderate_or_block(user_text)
-        if blocked:
-            return "부적절한 표현이 감지되어 요청이 차단되었습니다."
-
-        result: Dict[str, Any] = graph.invoke({"user_input": safe_text, "_safety_stats": stats})
+        # 세션 상태(최근 턴 요약)는 로컬 SQLite 체크포인트에서 읽고 턴마다 저장
+        store = get_default_store()
+        session_id = st.session_state.setdefault("session_id", f"web-{uuid.uuid4().hex}")
+        context = store.load(session_id)
+        # 입력 안전 필터링은 그래프의 moderate 노드에서 수행
+        result: Dict[str, Any] = graph.invoke({"user_input": user_text, "session": context, "channel": "web"})
         if isinstance(result, dict):
+            store.save(session_id, record_turn(context, result))
+            if result.get("blocked"):
+                return "부적절한 표현이 감지되어 요청이 차단되었습니다."
             if "final_text" in result and isinstance(result["final_text"], str):
                 return result["final_text"].strip()
             if "response" in result and isinstance(result["response"], str):
@@ -380,6 +384,17 @@ def call_graph(user_text: str) -> str:
         return f"오류가 발생했습니다: {exc}"
 
 
+def render_history_loader(history: ChatHistory) -> None:
+    """보관된 이전 대화가 있으면 '이전 대화 더보기' 버튼을 표시합니다.
+
+    대화가 `CHAT_HISTORY_MAX_MESSAGES`(기본 60)건을 넘으면 오래된 메시지는 로컬 파일로 보관되고
+    요약 메시지 1건으로 대체됩니다. 버튼을 누를 때마다 `CHAT_HISTORY_PAGE_SIZE`건씩 다시 불러옵니다.
+    """
+    if history.has_older() and st.button("이전 대화 더보기", key="load_older_history"):
+        history.load_older()
+        st.rerun()
+
+
 def render_messages(messages: List[Dict[str, str]], user_uri: str, bot_uri: str) -> None:
     """대화 메시지 목록을 렌더링합니다.
 
@@ -432,6 +447,8 @@ def main() -> None:
     - 레이아웃: `layout="wide"` → 필요시 `"centered"`
     """
     load_dotenv()
+    # 그래프/RAG 인덱스 준비를 백그라운드에서 시작 (첫 화면은 기다리지 않음)
+    start_warmup()
     st.set_page_config(
         page_title="땡겨요 고객문의 에이전트",
         page_icon=str((Path(__file__).resolve().parent / "img" / "mainlogo.png")),
@@ -445,14 +462,15 @@ def main() -> None:
     bot_uri = to_b64_data_uri(load_image_safe(bot_path), mime="image/jpeg")
 
     if "messages" not in st.session_state:
-        st.session_state["messages"] = [
+        st.session_state["messages"] = ChatHistory([
             {"role": "assistant", "content": "안녕하세요! 무엇을 도와드릴까요?"}
-        ]
+        ])
 
     render_global_css(logo_uri, user_uri, bot_uri)
     render_header(logo_uri)
     render_header_buttons()
 
+    render_history_loader(st.session_state["messages"])
     render_messages(st.session_state["messages"], user_uri, bot_uri)
 
     user_text = st.chat_input("메시지를 입력하세요")
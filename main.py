@@ -1,19 +1,26 @@
 import os
+import uuid
 from rich.console import Console
 from dotenv import load_dotenv
 
-# LangGraph 그래프 로딩
-from src.graph import build_graph
-from src.safety import moderate_or_block
+# LangGraph 그래프 로딩은 백그라운드에서 진행 (프롬프트를 먼저 띄움)
+from src.session_store import get_default_store, record_turn
+from src.warmup import get_graph, start_warmup
 
 
 def main():
     """콘솔 인터랙티브 루프. 사용자의 문장을 받아 그래프 실행 후 결과 출력."""
     load_dotenv()
+    start_warmup()
     console = Console()
 
-    graph = build_graph()
+    # 세션 상태는 로컬 SQLite에 저장 (SESSION_ID를 지정하면 이전 대화를 이어감)
+    store = get_default_store()
+    session_id = os.getenv("SESSION_ID") or f"console-{uuid.uuid4().hex[:12]}"
     console.print("[bold green]고객응대 멀티-에이전트 챗봇 시작[/bold green]")
+    context = store.load(session_id)
+    if context.get("turns"):
+        console.print(f"세션 {session_id}: 이전 대화 {context['turns']}턴을 이어갑니다.")
     console.print("종료하려면 'exit' 또는 'quit'을 입력하세요.\n")
 
     while True:
@@ -22,15 +29,14 @@ def main():
             console.print("[bold]종료합니다.[/bold]")
             break
 
-        # 안전 필터링 적용
-        blocked, safe_input, stats = moderate_or_block(user_input)
-        if blocked:
+        # 그래프 실행: 상태는 dict로 주고받음 (안전 필터링은 그래프의 moderate 노드에서 수행)
+        result = get_graph().invoke({"user_input": user_input, "session": context, "channel": "console"})
+        context = record_turn(context, result)
+        store.save(session_id, context)
+        if result.get("blocked"):
             console.print("[bold red]요청이 차단되었습니다:[/bold red] 부적절한 표현이 감지되었습니다.")
             continue
 
-        # 그래프 실행: 상태는 dict로 주고받음
-        state = {"user_input": safe_input, "_safety_stats": stats}
-        result = graph.invoke(state)
         final_text = result.get("final_text") or result.get("response") or "(응답이 없습니다)"
         console.print(f"\n[bold cyan]봇>[/bold cyan] {final_text}\n")
 
@@ -0,0 +1,106 @@
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+# 프로젝트 루트 기준으로 실행 가정
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.batch import (  # noqa: E402
+    BATCH_CHUNK_SIZE, BATCH_PROCESSES, initial_state, open_writer, process_chunk, result_row, run_batch,
+)
+
+
+# 과거 발화 로그를 일괄 재처리해 JSONL/Parquet으로 기록
+# - 입력: JSONL(한 줄에 객체 또는 문자열) 또는 한 줄에 한 발화인 텍스트 파일
+# - 입력에 기대 intent가 있으면 라우팅 정확도를 함께 보고
+# - --verify N: 앞 N건을 graph.invoke 결과와 비교해 출력 레코드 전체가 같은지 확인
+#
+# 예:
+#   python scripts/batch_run.py data/loadtest/utterances.jsonl -o out.jsonl
+#   python scripts/batch_run.py logs.jsonl -o out.parquet --processes 8 --chunk-size 512 --verify 100
+
+
+def read_records(path: Path, text_field: str, id_field: str) -> Iterator[Dict[str, Any]]:
+    jsonl = path.suffix == ".jsonl"
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line) if jsonl else line
+            if isinstance(row, str):
+                row = {text_field: row}
+            yield {
+                "id": row.get(id_field, lineno),
+                "text": row.get(text_field, ""),
+                "intent": row.get("intent"),
+                "channel": row.get("channel"),
+                "tenant": row.get("tenant"),
+            }
+
+
+def verify(path: Path, text_field: str, id_field: str, limit: int) -> int:
+    """앞 limit건을 graph.invoke와 비교. 불일치 건수를 반환."""
+    from src.graph import build_graph
+
+    graph = build_graph()
+    records = list(islice(read_records(path, text_field, id_field), limit))
+    mismatches = 0
+    for record, row in zip(records, process_chunk(records)):
+        expected = result_row(record, graph.invoke(initial_state(record)))
+        if row != expected:
+            mismatches += 1
+            diff = [k for k in row if row[k] != expected[k]]
+            print(f"[MISMATCH] id={record['id']} fields={diff} batch={row['intent']} graph={expected['intent']}")
+    print(f"verify: {len(records) - mismatches}/{len(records)} 일치")
+    return mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="발화 로그 배치 재처리")
+    parser.add_argument("input", type=Path, help="입력 파일 (.jsonl 또는 텍스트)")
+    parser.add_argument("-o", "--output", required=True, help="출력 파일 (.jsonl 또는 .parquet)")
+    parser.add_argument("--text-field", default="text", help="JSONL 발화 필드명")
+    parser.add_argument("--id-field", default="id", help="JSONL ID 필드명 (없으면 줄 번호)")
+    parser.add_argument("--processes", type=int, default=BATCH_PROCESSES, help="워커 프로세스 수 (0: 현재 프로세스)")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE, help="청크당 발화 수")
+    parser.add_argument("--verify", type=int, default=0, help="앞 N건을 graph.invoke와 비교")
+    args = parser.parse_args()
+
+    if args.verify and verify(args.input, args.text_field, args.id_field, args.verify):
+        sys.exit(1)
+
+    records = read_records(args.input, args.text_field, args.id_field)
+    writer = open_writer(args.output)
+    total = blocked = labeled = correct = 0
+    intents: Counter = Counter()
+    t0 = time.perf_counter()
+    try:
+        for rows in run_batch(records, processes=args.processes, chunk_size=args.chunk_size):
+            writer.write(rows)
+            for row in rows:
+                total += 1
+                blocked += row["blocked"]
+                intents[row["intent"]] += 1
+                if row["expected_intent"]:
+                    labeled += 1
+                    correct += row["expected_intent"] == row["intent"]
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - t0
+
+    print(f"처리 {total}건 / {elapsed:.2f}s ({total / elapsed if elapsed else 0:.1f}건/s), 차단 {blocked}건")
+    print("intent 분포: " + ", ".join(f"{k}={v}" for k, v in intents.most_common()))
+    if labeled:
+        print(f"라우팅 정확도: {correct}/{labeled} ({correct / labeled:.1%})")
+    print(f"저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
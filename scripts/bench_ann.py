@@ -0,0 +1,86 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+# 프로젝트 루트 기준으로 실행 가정
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.agents.rag_ann import IVFIndex  # noqa: E402
+from src.agents.rag_dense import top_k_rows  # noqa: E402
+
+
+# ANN(IVF / IVF+PQ) 정확도-지연 벤치마크
+# - 군집 구조가 있는 합성 정규화 벡터(LSA 문서 벡터 흉내)에 대해 전수 내적 검색과 비교
+# - recall@k: 전수 검색 상위 k개 중 ANN 결과에 포함된 비율
+# - 지연: 질의 1건씩 검색했을 때의 평균 (대화 1턴 재현)
+#
+# 예:
+#   python scripts/bench_ann.py --n 200000 --dims 256 --probes 1,4,8,16,32
+#   python scripts/bench_ann.py --n 200000 --pq-m 32
+
+
+def synthetic_vectors(n: int, dims: int, clusters: int, noise: float, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dims)).astype(np.float32)
+    x = centers[rng.integers(0, clusters, size=n)] + noise * rng.standard_normal((n, dims)).astype(np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def recall(exact: List[List[Tuple[int, float]]], approx: List[List[Tuple[int, float]]], k: int) -> float:
+    hit = sum(len({i for i, _ in e} & {i for i, _ in a}) for e, a in zip(exact, approx))
+    return hit / (k * len(exact))
+
+
+def per_query_ms(search, queries: np.ndarray) -> float:
+    t0 = time.perf_counter()
+    for q in queries:
+        search(q[None, :])
+    return (time.perf_counter() - t0) / len(queries) * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="IVF/PQ 근사 검색 recall@k vs 지연 벤치마크")
+    parser.add_argument("--n", type=int, default=200000, help="문서 벡터 수")
+    parser.add_argument("--dims", type=int, default=256)
+    parser.add_argument("--clusters", type=int, default=500, help="합성 데이터 군집 수")
+    parser.add_argument("--noise", type=float, default=1.0, help="군집 중심 대비 잡음 크기 (클수록 어려움)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--lists", type=int, default=0, help="IVF 리스트 수 (0 = 4 * sqrt(n))")
+    parser.add_argument("--probes", default="1,4,8,16,32", help="n_probe 목록 (쉼표 구분)")
+    parser.add_argument("--pq-m", type=int, default=0, help="> 0 이면 IVF+PQ도 측정 (부분 공간 수)")
+    args = parser.parse_args()
+
+    x = synthetic_vectors(args.n + args.queries, args.dims, args.clusters, args.noise, seed=0)
+    docs, queries = x[:args.n], x[args.n:]
+    k = args.k
+
+    exact = top_k_rows(queries @ docs.T, k)
+    exact_ms = per_query_ms(lambda q: top_k_rows(q @ docs.T, k), queries)
+    print(f"=== ANN benchmark: n={args.n} dims={args.dims} queries={args.queries} k={k} ===")
+    print(f"{'index':<36}{'recall@k':>10}{'ms/query':>11}{'speedup':>9}{'MiB':>9}{'build_s':>9}")
+    print(f"{'exact':<36}{1.0:>10.3f}{exact_ms:>11.2f}{1.0:>8.1f}x{docs.nbytes / 2**20:>9.1f}{0.0:>9.1f}")
+
+    # ivfpq: PQ 코드만 보관(메모리 절감), ivfpq+rerank: 원본 벡터로 상위 후보 재점수화
+    variants = [("ivf", 0, True)]
+    if args.pq_m:
+        variants += [("ivfpq", args.pq_m, False), ("ivfpq+rerank", args.pq_m, True)]
+    for name, pq_m, keep_vectors in variants:
+        t0 = time.perf_counter()
+        index = IVFIndex.build(docs, n_lists=args.lists, pq_m=pq_m, keep_vectors=keep_vectors)
+        build_s = time.perf_counter() - t0
+        for probe in [int(p) for p in args.probes.split(",") if p.strip()]:
+            approx = index.search(queries, k, n_probe=probe)
+            ms = per_query_ms(lambda q: index.search(q, k, n_probe=probe), queries)
+            label = f"{name}[lists={index.n_lists},probe={probe}]"
+            print(f"{label:<36}{recall(exact, approx, k):>10.3f}{ms:>11.2f}{exact_ms / ms:>8.1f}x"
+                  f"{index.nbytes / 2**20:>9.1f}{build_s:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
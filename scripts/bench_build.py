@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 프로젝트 루트 기준으로 실행 가정
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from scripts.bench_utils import synthetic_documents  # noqa: E402
+from src.agents.rag_agent import SimpleRAG  # noqa: E402
+from src.agents.rag_parallel import same_index  # noqa: E402
+
+
+# KB 인덱스 병렬 적재(build_workers) 워커 수별 확장성 측정
+# - 합성 FAQ를 여러 파일로 나눠 임시 KB를 만들고 (stream: jsonl 파일 --files개, memory: 문서마다 txt 1개)
+#   순차 적재(build_workers=0)와 워커 수별 병렬 적재의 인덱스 생성 시간을 비교
+# - 병렬 결과가 순차 결과와 같은지(어휘, idf, TF-IDF 행렬 비트 단위) 함께 확인
+# - 워커 수가 CPU 코어 수보다 많으면 빨라지지 않음
+#
+# 예:
+#   python scripts/bench_build.py --docs 100000 --workers 1,2,4,8
+#   python scripts/bench_build.py --ingest memory --docs 20000
+
+
+def write_kb(kb: Path, docs, ingest: str, files: int) -> None:
+    if ingest == "memory":
+        for i, doc in enumerate(docs):
+            (kb / f"faq_{i:06d}.txt").write_text(doc, encoding="utf-8")
+        return
+    for f in range(files):
+        with open(kb / f"export_{f:04d}.jsonl", "w", encoding="utf-8") as out:
+            for doc in docs[f * len(docs) // files:(f + 1) * len(docs) // files]:
+                out.write(json.dumps({"text": doc}, ensure_ascii=False) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="KB 인덱스 병렬 적재 확장성 측정")
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--sentences", type=int, default=6, help="문서당 문장 수")
+    parser.add_argument("--ingest", choices=("stream", "memory"), default="stream")
+    parser.add_argument("--files", type=int, default=256, help="stream KB 파일 수")
+    parser.add_argument("--vectorizer", choices=("tfidf", "hashing"), default="tfidf")
+    parser.add_argument("--workers", default=None, help="쉼표로 구분한 워커 수 (기본 1,2,4,... CPU 수까지)")
+    parser.add_argument("--dedup", type=float, default=0.0, help="dedup_threshold (기본 0 = 끔, 적재 시간만 비교)")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    if args.workers:
+        workers = [int(w) for w in args.workers.split(",")]
+    else:
+        workers = sorted({min(2 ** i, cpus) for i in range(cpus.bit_length() + 1)})
+
+    kb = Path(tempfile.mkdtemp(prefix="kb_build_"))
+    write_kb(kb, synthetic_documents(args.docs, sentences=args.sentences), args.ingest, args.files)
+    size = sum(p.stat().st_size for p in kb.iterdir())
+    common = {"kb_dir": str(kb), "ingest": args.ingest, "vectorizer": args.vectorizer, "dedup_threshold": args.dedup}
+    SimpleRAG(documents=["워밍업 문서"], vectorizer=args.vectorizer)  # sklearn import를 측정에서 제외
+
+    print(f"=== KB build: {args.docs} docs in {len(list(kb.iterdir()))} files ({size / 2**20:.1f}MiB), "
+          f"ingest={args.ingest}, vectorizer={args.vectorizer}, {cpus} CPUs ===")
+    print(f"{'workers':<10}{'build_s':>9}{'speedup':>9}{'same index':>12}")
+    t0 = time.perf_counter()
+    serial = SimpleRAG(**common)
+    base = time.perf_counter() - t0
+    print(f"{'serial':<10}{base:>9.2f}{1.0:>8.2f}x{'-':>12}")
+    for n in workers:
+        t0 = time.perf_counter()
+        rag = SimpleRAG(build_workers=n, **common)
+        elapsed = time.perf_counter() - t0
+        print(f"{n:<10}{elapsed:>9.2f}{base / elapsed:>8.2f}x{'yes' if same_index(serial, rag) else 'NO':>12}")
+        del rag
+
+
+if __name__ == "__main__":
+    main()
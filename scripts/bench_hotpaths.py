@@ -0,0 +1,131 @@
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+# 프로젝트 루트 기준으로 실행 가정
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from bench_utils import (  # noqa: E402
+    check_baseline,
+    measure,
+    print_results,
+    save_baseline,
+    synthetic_documents,
+    synthetic_queries,
+)
+from src.agents.rag_agent import SimpleRAG  # noqa: E402
+from src.router import classify_intent  # noqa: E402
+from src.safety import moderate_or_block, sanitize_user_input  # noqa: E402
+from src.style_agent import apply_style  # noqa: E402
+
+
+# 라우터/안전 필터/RAG/화법/그래프 전체의 핫패스 마이크로 벤치마크
+#
+# 예:
+#   python scripts/bench_hotpaths.py                    # 측정만
+#   python scripts/bench_hotpaths.py --check            # scripts/baselines/hotpaths.json 대비 회귀 확인
+#   python scripts/bench_hotpaths.py --save             # 기준값 갱신
+#   python scripts/bench_hotpaths.py --sizes 10,1000 --only rag
+
+DEFAULT_SIZES = "10,100,1000,10000,100000"
+
+ROUTER_INPUTS = [
+    "배송 문의 있습니다",
+    "전화 연결 부탁",
+    "앱에서 버튼으로 열어줘",
+    "상담사 연결해 주세요",
+    "할인 혜택은 어떻게 받을 수 있나요? 가맹점 등록 방법도 궁금합니다",
+]
+SAFETY_INPUTS = [
+    "배송 문의 있습니다",
+    "제 번호는 010-1234-5678 이고 메일은 user@example.com 입니다",
+    "카드 1234-5678-9012-3456 결제가 안돼요 씨발",
+    "fuck shit bitch 환불해줘",
+]
+
+
+def bench_router() -> Dict[str, Dict[str, float]]:
+    return {"router.classify_intent": measure(lambda: [classify_intent(t) for t in ROUTER_INPUTS])}
+
+
+def bench_safety() -> Dict[str, Dict[str, float]]:
+    return {
+        "safety.sanitize_user_input": measure(lambda: [sanitize_user_input(t) for t in SAFETY_INPUTS]),
+        "safety.moderate_or_block": measure(lambda: [moderate_or_block(t) for t in SAFETY_INPUTS]),
+    }
+
+
+def bench_style() -> Dict[str, Dict[str, float]]:
+    state = {"response": "교환/반품은 수령 후 7일 이내에 신청 가능합니다.", "intent": "rag"}
+    return {"style.apply_style": measure(lambda: apply_style(dict(state)))}
+
+
+def bench_rag(sizes: List[int], modes: List[str]) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    queries = synthetic_queries(20)
+    for mode in modes:
+        # 기본(tfidf) 모드는 기존 기준값 이름을 유지
+        prefix = "rag" if mode == "tfidf" else f"rag.{mode}"
+        for n in sizes:
+            docs = synthetic_documents(n)
+            big = n >= 10_000
+            results[f"{prefix}.build[{n}]"] = measure(
+                lambda: SimpleRAG(documents=docs, mode=mode), rounds=3 if big else 5, min_time=0.0 if big else 0.1
+            )
+            rag = SimpleRAG(documents=docs, mode=mode)
+            results[f"{prefix}.retrieve[{n}]"] = measure(lambda: [rag.retrieve(q) for q in queries], rounds=3 if big else 5)
+            results[f"{prefix}.answer[{n}]"] = measure(lambda: [rag.answer(q) for q in queries], rounds=3 if big else 5)
+    return results
+
+
+def bench_graph() -> Dict[str, Dict[str, float]]:
+    from src.graph import build_graph
+    from src.response_cache import ResponseCache
+
+    inputs = ROUTER_INPUTS + SAFETY_INPUTS
+    graph = build_graph(cache=ResponseCache())
+    uncached = build_graph(cache=ResponseCache(ttl=0))  # 항상 미적중: 전체 경로
+    return {
+        "graph.invoke": measure(lambda: [graph.invoke({"user_input": t}) for t in inputs], rounds=5),
+        "graph.invoke[nocache]": measure(lambda: [uncached.invoke({"user_input": t}) for t in inputs], rounds=5),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="핫패스 마이크로 벤치마크")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="RAG 합성 KB 크기 목록 (쉼표 구분)")
+    parser.add_argument("--modes", default="tfidf", help="RAG 모드 목록 (쉼표 구분, 예: tfidf,lsa,hybrid)")
+    parser.add_argument("--only", default="", help="router,safety,style,rag,graph 중 일부만 실행 (쉼표 구분)")
+    parser.add_argument("--save", action="store_true", help="결과를 기준값으로 저장")
+    parser.add_argument("--check", action="store_true", help="기준값 대비 회귀 확인 (회귀 시 종료 코드 1)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="회귀 판정 비율 (기본 25%%)")
+    parser.add_argument("--baseline", type=Path, default=None, help="기준값 파일 경로")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    only = {s.strip() for s in args.only.split(",") if s.strip()}
+    suites = {
+        "router": bench_router,
+        "safety": bench_safety,
+        "style": bench_style,
+        "rag": lambda: bench_rag(sizes, [m.strip() for m in args.modes.split(",") if m.strip()]),
+        "graph": bench_graph,
+    }
+    results: Dict[str, Dict[str, float]] = {}
+    for name, suite in suites.items():
+        if not only or name in only:
+            results.update(suite())
+
+    print_results("Hot path benchmarks (router/safety/graph: 입력 목록 1회, rag.retrieve/answer: 질의 20건)", results)
+    if args.save:
+        path = save_baseline("hotpaths", results, args.baseline)
+        print(f"\n기준값 저장: {path}")
+    if args.check:
+        if check_baseline("hotpaths", results, args.threshold, args.baseline):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
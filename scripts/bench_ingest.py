@@ -0,0 +1,106 @@
+import argparse
+import csv
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# 프로젝트 루트 기준으로 실행 가정
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from scripts.bench_utils import synthetic_documents, synthetic_queries  # noqa: E402
+from src.agents.rag_agent import SimpleRAG  # noqa: E402
+from src.agents.rag_ingest import record_text  # noqa: E402
+
+
+# KB 적재 방식별 메모리/시간 비교
+# - 합성 FAQ 내보내기 파일(jsonl + csv + 빈 줄로 구분한 txt)을 임시 디렉터리에 만들고
+#   memory(원문 목록 보관) / stream(오프셋만 보관) / stream + hashing 으로 인덱스를 만들어 비교
+#   (txt는 문단별 문서이므로 stream은 txt_split="paragraph")
+# - stream 방식은 기본 설정(중복 정리 dedup_threshold=0.9 포함)으로 재고, 중복 정리를 끈 경우를 따로 비교
+#   (memory는 documents로 직접 넘기므로 중복 정리를 하지 않음)
+# - 메모리는 tracemalloc 기준 적재 중 최대치(peak)와 적재 후 남은 양(retained)
+# - stream(tfidf)의 검색 결과가 memory와 같은지 확인
+#
+# 예:
+#   python scripts/bench_ingest.py --docs 100000
+
+
+def write_exports(kb: Path, docs) -> None:
+    third = len(docs) // 3
+    with open(kb / "export.jsonl", "w", encoding="utf-8") as f:
+        for i, doc in enumerate(docs[:third]):
+            f.write(json.dumps({"id": i, "text": doc}, ensure_ascii=False) + "\n")
+    with open(kb / "export.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "question", "answer"])
+        for i, doc in enumerate(docs[third:2 * third]):
+            question, _, answer = doc.partition(". ")
+            writer.writerow([i, question, answer.replace(". ", ".\n")])  # 따옴표 안 줄바꿈 포함
+    with open(kb / "export.txt", "w", encoding="utf-8") as f:
+        f.write("\n\n".join(docs[2 * third:]) + "\n")
+
+
+def load_all_texts(kb: Path):
+    """memory 기준선: 내보내기 파일 원문을 전부 읽어 목록으로 보관."""
+    texts = []  # stream 적재와 같은 파일명 순서
+    with open(kb / "export.csv", encoding="utf-8", newline="") as f:
+        texts += [record_text(row) for row in csv.DictReader(f)]
+    with open(kb / "export.jsonl", encoding="utf-8") as f:
+        texts += [json.loads(line)["text"] for line in f if line.strip()]
+    texts += (kb / "export.txt").read_text(encoding="utf-8").strip().split("\n\n")
+    return texts
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    rag = build()
+    elapsed = time.perf_counter() - t0
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rag, elapsed, retained, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="KB 적재 방식별 메모리/시간 비교")
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--sentences", type=int, default=6, help="문서당 문장 수")
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    kb = Path(tempfile.mkdtemp(prefix="kb_ingest_"))
+    write_exports(kb, synthetic_documents(args.docs, sentences=args.sentences))
+    size = sum(p.stat().st_size for p in kb.iterdir())
+    queries = synthetic_queries(args.queries)
+    common = {"top_k": 3}
+    stream = {"kb_dir": str(kb), "ingest": "stream", "txt_split": "paragraph", **common}
+
+    variants = {
+        "memory": lambda: SimpleRAG(documents=load_all_texts(kb), **common),
+        "stream": lambda: SimpleRAG(**stream),
+        "stream+hashing": lambda: SimpleRAG(vectorizer="hashing", **stream),
+        "stream, no dedup": lambda: SimpleRAG(dedup_threshold=0, **stream),
+    }
+    print(f"=== KB ingest: {args.docs} docs, {size / 2**20:.1f}MiB of exports ===")
+    print(f"{'ingest':<18}{'docs':>9}{'build_s':>9}{'peak MiB':>10}{'retained MiB':>14}{'same top-k':>12}")
+    # sklearn 등 지연 import가 첫 측정에 섞이지 않도록 미리 한 번씩 생성
+    SimpleRAG(documents=["워밍업 문서"], **common)
+    SimpleRAG(documents=["워밍업 문서"], vectorizer="hashing", **common)
+    reference = None
+    for name, build in variants.items():
+        rag, elapsed, retained, peak = measure(build)
+        hits = [[doc for doc, _ in h] for h in rag.retrieve_batch(queries)]
+        reference = reference or hits
+        same = sum(h == r for h, r in zip(hits, reference)) / len(queries)
+        print(f"{name:<18}{len(rag.documents):>9}{elapsed:>9.1f}{peak / 2**20:>10.1f}{retained / 2**20:>14.1f}{same:>11.0%}")
+        del rag
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Tuple
+
+# 프로젝트 루트 기준으로 실행 가정
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from scripts.bench_utils import synthetic_documents, synthetic_queries  # noqa: E402
+from src.agents.rag_agent import SimpleRAG  # noqa: E402
+
+
+# 인덱스 저장 정밀도(float64/float32/float16/int8)별 메모리/지연/순위 충실도 리포트
+# - 같은 모드/ANN 설정의 float64 인덱스를 기준으로 top-k 문서 겹침 비율(overlap)을 계산
+# - 메모리는 SimpleRAG.index_nbytes (어휘 사전 제외, ANN을 켜면 IVF 인덱스 포함)
+# - --ann을 주면 lsa/hybrid 모드는 ANN 없이 + 지정한 ANN 종류별로 각각 측정
+#
+# 예:
+#   python scripts/bench_quant.py --docs 20000 --modes tfidf,lsa,hybrid
+#   python scripts/bench_quant.py --docs 20000 --modes lsa --ann ivf,ivfpq
+#   python scripts/bench_quant.py --kb data/kb
+
+
+def top_docs(rag: SimpleRAG, queries: List[str]) -> List[List[str]]:
+    return [[doc for doc, _ in hits] for hits in rag.retrieve_batch(queries)]
+
+
+def overlap(ref: List[List[str]], got: List[List[str]]) -> float:
+    # 합성 코퍼스에는 같은 문장 문서가 있을 수 있어 문서 텍스트 기준 다중집합으로 비교
+    total = sum(len(r) for r in ref)
+    return sum(sum((Counter(r) & Counter(g)).values()) for r, g in zip(ref, got)) / total if total else 1.0
+
+
+def timed(fn) -> Tuple[float, object]:
+    t0 = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t0, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="인덱스 정밀도별 메모리/순위 충실도 리포트")
+    parser.add_argument("--docs", type=int, default=20000, help="합성 문서 수 (--kb 미지정 시)")
+    parser.add_argument("--kb", default=None, help="합성 문서 대신 사용할 KB 디렉터리")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--modes", default="tfidf,lsa", help="RAG 모드 목록 (쉼표 구분)")
+    parser.add_argument("--precisions", default="float64,float32,float16,int8")
+    parser.add_argument("--ann", default="", help="lsa/hybrid 모드에 추가로 측정할 ANN 종류 (쉼표 구분, 예: ivf,ivfpq)")
+    args = parser.parse_args()
+
+    docs = None if args.kb else synthetic_documents(args.docs)
+    queries = synthetic_queries(args.queries)
+    source = args.kb or f"synthetic {args.docs} docs"
+    print(f"=== Index precision report: {source}, {args.queries} queries, top_k={args.top_k} ===")
+    ann_kinds = [a.strip() for a in args.ann.split(",") if a.strip()]
+    print(f"{'mode':<8}{'ann':<7}{'precision':<10}{'index MiB':>11}{'saved':>8}{'retrieve ms':>13}{'overlap@k':>11}")
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        for ann in [""] + (ann_kinds if mode in ("lsa", "hybrid") else []):
+            ref_docs = ref_bytes = None
+            for precision in [p.strip() for p in args.precisions.split(",") if p.strip()]:
+                kwargs = {"kb_dir": args.kb} if args.kb else {"documents": docs}
+                rag = SimpleRAG(top_k=args.top_k, mode=mode, precision=precision, ann=ann, **kwargs)
+                rag.retrieve_batch(queries[:4])  # 지연 import 등 워밍업
+                elapsed, docs_hit = timed(lambda: top_docs(rag, queries))
+                if ref_docs is None:
+                    ref_docs, ref_bytes = docs_hit, rag.index_nbytes
+                saved = 1 - rag.index_nbytes / ref_bytes if ref_bytes else 0.0
+                print(f"{mode:<8}{ann or '-':<7}{precision:<10}{rag.index_nbytes / 2**20:>11.2f}{saved:>7.0%} "
+                      f"{elapsed / len(queries) * 1e3:>12.3f}{overlap(ref_docs, docs_hit):>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
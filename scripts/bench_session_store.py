@@ -0,0 +1,102 @@
+import argparse
+import math
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# 프로젝트 루트 기준으로 실행 가정
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.session_store import SessionStore, record_turn  # noqa: E402
+
+
+# 세션 체크포인트 저장소의 동시 세션 부하 벤치마크
+# - 세션마다 스레드 1개가 load → record_turn → save 를 반복 (대화 턴 재현)
+# - 일괄 기록(기본 설정)과 저장마다 즉시 기록(--batch-size 1 --flush-interval 0)을 비교할 수 있음
+#
+# 예:
+#   python scripts/bench_session_store.py --sessions 64 --turns 50
+#   python scripts/bench_session_store.py --sessions 64 --turns 50 --sync
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+def report(name: str, values: List[float]) -> None:
+    s = sorted(values)
+    print(
+        f"{name:<8} n={len(s):<7} p50={percentile(s, 50) * 1e6:9.1f}us "
+        f"p95={percentile(s, 95) * 1e6:9.1f}us p99={percentile(s, 99) * 1e6:9.1f}us max={s[-1] * 1e6:9.1f}us"
+    )
+
+
+def run(store: SessionStore, sessions: int, turns: int, sync: bool) -> Dict[str, List[float]]:
+    loads: List[float] = []
+    saves: List[float] = []
+    lock = threading.Lock()
+    answer = "다음 정보를 찾았습니다:\n- 배송 관련 문의는 일반적으로 2~3 영업일 내 처리됩니다. " * 3
+
+    def worker(idx: int) -> None:
+        sid = f"bench-{idx}"
+        my_loads, my_saves = [], []
+        for turn in range(turns):
+            t0 = time.perf_counter()
+            context = store.load(sid)
+            t1 = time.perf_counter()
+            context = record_turn(context, {"user_input": f"질문 {turn}", "intent": "rag", "final_text": answer})
+            t2 = time.perf_counter()
+            store.save(sid, context)
+            if sync:
+                store.flush()
+            t3 = time.perf_counter()
+            my_loads.append(t1 - t0)
+            my_saves.append(t3 - t2)
+        with lock:
+            loads.extend(my_loads)
+            saves.extend(my_saves)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return {"load": loads, "save": saves}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="세션 저장소 동시 부하 벤치마크")
+    parser.add_argument("--sessions", type=int, default=32, help="동시 세션(스레드) 수")
+    parser.add_argument("--turns", type=int, default=50, help="세션당 턴 수")
+    parser.add_argument("--flush-interval", type=float, default=0.05)
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--sync", action="store_true", help="저장마다 즉시 기록(일괄 기록 비교용)")
+    parser.add_argument("--db", default=None, help="DB 경로 (기본 임시 디렉터리)")
+    args = parser.parse_args()
+
+    db = args.db or str(Path(tempfile.mkdtemp()) / "sessions.db")
+    store = SessionStore(db, flush_interval=args.flush_interval, batch_size=args.batch_size)
+    t0 = time.perf_counter()
+    result = run(store, args.sessions, args.turns, args.sync)
+    elapsed = time.perf_counter() - t0
+    store.close()
+
+    total = args.sessions * args.turns
+    db_size = sum(p.stat().st_size for p in Path(db).parent.glob(Path(db).name + "*"))
+    mode = "sync" if args.sync else f"batched(interval={args.flush_interval}s, size={args.batch_size})"
+    print(f"=== SessionStore {mode}: {args.sessions} sessions x {args.turns} turns ===")
+    report("load", result["load"])
+    report("save", result["save"])
+    print(f"turns/s={total / elapsed:.0f} flushes={store.stats['flushes']} rows_written={store.stats['rows_written']} "
+          f"rows={store.count()} db={db_size / 1024:.0f}KiB")
+
+
+if __name__ == "__main__":
+    main()
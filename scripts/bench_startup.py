@@ -0,0 +1,145 @@
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# 프로젝트 루트 기준으로 실행 가정
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from bench_utils import BASELINE_DIR, check_baseline, print_results, save_baseline  # noqa: E402
+
+
+# 시작 시간 벤치마크
+# - import.*: `python -X importtime -c "import <모듈>"`의 누적 import 시간
+# - main.first_prompt: `python main.py` 실행부터 첫 프롬프트("사용자> ")가 뜰 때까지
+# - main.first_answer: 첫 프롬프트 이후 질문 1건의 응답이 출력될 때까지 (백그라운드 준비 대기 포함)
+# - --save 시 기준값(scripts/baselines/startup.json)과 import 프로파일(scripts/baselines/importtime.txt)을 저장
+#
+# 예:
+#   python scripts/bench_startup.py
+#   python scripts/bench_startup.py --check
+#   python scripts/bench_startup.py --save
+
+IMPORT_TARGETS = ["main", "src.graph", "src.agents.rag_agent", "src.server"]
+# 첫 응답까지 필요한 import 전체 (프로파일 저장용)
+PROFILE_CODE = "import main; from src.warmup import get_graph; get_graph()"
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def run_importtime(code: str) -> List[Tuple[int, int, int, str]]:
+    """(self_us, cumulative_us, depth, module) 목록."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, env=_env(), check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = IMPORTTIME_RE.match(line)
+        if m:
+            rows.append((int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2, m.group(4)))
+    return rows
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(ROOT)
+    env.setdefault("SESSION_DB_PATH", str(Path(tempfile.gettempdir()) / "bench_startup" / "sessions.db"))
+    env["PYTHONIOENCODING"] = "utf-8"
+    return env
+
+
+def import_seconds(module: str) -> float:
+    rows = run_importtime(f"import {module}")
+    top = [r for r in rows if r[3] == module]
+    return top[-1][1] / 1e6 if top else 0.0
+
+
+def _read_until(proc: subprocess.Popen, marker: bytes, buf: bytearray) -> None:
+    while marker not in buf:
+        chunk = os.read(proc.stdout.fileno(), 4096)
+        if not chunk:
+            raise RuntimeError(f"출력이 끝났지만 {marker!r}를 찾지 못했습니다: {buf[-200:]!r}")
+        buf.extend(chunk)
+
+
+def main_startup() -> Tuple[float, float]:
+    """(첫 프롬프트까지, 첫 응답까지) 초."""
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "main.py"], cwd=ROOT, env=_env(),
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    try:
+        buf = bytearray()
+        _read_until(proc, "사용자> ".encode("utf-8"), buf)
+        first_prompt = time.perf_counter() - t0
+        buf.clear()
+        t1 = time.perf_counter()
+        proc.stdin.write("배송 문의 있습니다\n".encode("utf-8"))
+        proc.stdin.flush()
+        _read_until(proc, "사용자> ".encode("utf-8"), buf)
+        first_answer = time.perf_counter() - t1
+        proc.stdin.write(b"exit\n")
+        proc.stdin.flush()
+        proc.wait(timeout=30)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+    return first_prompt, first_answer
+
+
+def _stats(values: List[float]) -> Dict[str, float]:
+    return {"median_s": statistics.median(values), "min_s": min(values), "loops": 1, "rounds": len(values)}
+
+
+def write_profile(path: Path, top: int = 30) -> None:
+    rows = run_importtime(PROFILE_CODE)
+    total = sum(r[0] for r in rows)
+    lines = [
+        f"# python -X importtime -c \"{PROFILE_CODE}\"",
+        f"# 전체 import 시간(self 합계): {total / 1e3:.1f} ms, 상위 {top}개 최상위 모듈(누적 기준)",
+        f"{'cumulative_ms':>14} {'self_ms':>9}  module",
+    ]
+    # 최상위(depth 0) import만 누적 시간 순으로 정렬
+    for self_us, cum_us, depth, name in sorted((r for r in rows if r[2] == 0), key=lambda r: -r[1])[:top]:
+        lines.append(f"{cum_us / 1e3:>14.1f} {self_us / 1e3:>9.1f}  {name}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="시작 시간/import 시간 벤치마크")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--save", action="store_true", help="결과를 기준값으로 저장 (import 프로파일 포함)")
+    parser.add_argument("--check", action="store_true", help="기준값 대비 회귀 확인 (회귀 시 종료 코드 1)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="회귀 판정 비율 (기본 25%%)")
+    args = parser.parse_args()
+
+    samples: Dict[str, List[float]] = {}
+    for _ in range(args.rounds):
+        for module in IMPORT_TARGETS:
+            samples.setdefault(f"import.{module}", []).append(import_seconds(module))
+        first_prompt, first_answer = main_startup()
+        samples.setdefault("main.first_prompt", []).append(first_prompt)
+        samples.setdefault("main.first_answer", []).append(first_answer)
+    results = {name: _stats(values) for name, values in samples.items()}
+
+    print_results("Startup benchmarks", results)
+    if args.save:
+        path = save_baseline("startup", results)
+        write_profile(BASELINE_DIR / "importtime.txt")
+        print(f"\n기준값 저장: {path}, {BASELINE_DIR / 'importtime.txt'}")
+    if args.check:
+        if check_baseline("startup", results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
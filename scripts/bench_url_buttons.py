@@ -0,0 +1,151 @@
+import argparse
+import html as html_lib
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+# 프로젝트 루트 기준으로 실행 가정
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.url_buttons import ButtonLabelResolver, convert_links_to_buttons  # noqa: E402
+
+
+# ===== 기존 구현(비교 기준): 호출마다 패턴 dict/정규식을 새로 만들고 선형 탐색 =====
+
+def legacy_link_label(url: str) -> str:
+    if not url:
+        return "링크"
+    url_patterns = {
+        "https://sendmessage-sh-9224.twil.io/send-sms": "사장님께 문자하기",
+        "https://sendmessage-sh-9224.twil.io/make-call": "사장님께 전화하기",
+        "https://support.example.com/call": "고객센터 연결하기",
+        "https://www.ddangyo.com": "고객센터 전화하기",
+    }
+    for pattern_url, button_text in url_patterns.items():
+        if url.startswith(pattern_url):
+            return button_text
+    return "링크 열기"
+
+
+def legacy_ref_label(url: str) -> str:
+    if not url or not isinstance(url, str):
+        return "링크"
+    url_patterns = {
+        "support": "1:1 고객문의", "help": "도움말", "faq": "자주묻는 질문", "contact": "연락처",
+        "call": "전화상담", "service": "서비스 안내", "guide": "이용가이드", "manual": "매뉴얼",
+        "tutorial": "튜토리얼", "order": "주문조회", "payment": "결제관리", "billing": "청구서",
+        "invoice": "영수증", "account": "계정관리", "profile": "프로필", "settings": "설정",
+        "preferences": "환경설정", "app": "앱 다운로드", "download": "다운로드", "install": "설치",
+        "terms": "이용약관", "privacy": "개인정보처리방침", "notice": "공지사항", "news": "뉴스",
+        "blog": "블로그",
+    }
+    url_lower = url.lower()
+    for pattern, button_text in url_patterns.items():
+        if pattern in url_lower:
+            return button_text
+    if url_lower.startswith("tel:"):
+        return "상담원 연결하기"
+    parsed_url = urlparse(url)
+    if parsed_url.scheme and parsed_url.netloc:
+        domain = parsed_url.netloc
+        if domain.startswith("www."):
+            domain = domain[4:]
+        return domain
+    return "링크"
+
+
+def legacy_convert(text: str) -> str:
+    if not text:
+        return ""
+    escaped = html_lib.escape(text)
+    url_pattern = re.compile(r"(https?://[^\s]+|[a-zA-Z][a-zA-Z0-9+.-]*://[^\s]+)")
+
+    def repl(match: re.Match) -> str:
+        url = match.group(0)
+        button_text = legacy_link_label(url)
+        safe_url = html_lib.escape(url)
+        return f'<a class="deeplink-btn" href="{safe_url}" target="_blank" rel="noopener noreferrer">{button_text}</a>'
+
+    return url_pattern.sub(repl, escaped)
+
+
+# ===== 합성 데이터 =====
+
+SAMPLE_URLS = [
+    "https://sendmessage-sh-9224.twil.io/send-sms?to=010",
+    "https://sendmessage-sh-9224.twil.io/make-call",
+    "https://support.example.com/call",
+    "https://www.ddangyo.com/event/123",
+    "https://www.ddanggyeo.com/faq",
+    "https://help.ddanggyeo.com/guide",
+    "https://www.ddanggyeo.com/order",
+    "https://app.ddanggyeo.com/download",
+    "https://shop.example.org/item/{n}",
+    "myapp://action/open?q={n}",
+    "tel:1588-0000",
+]
+
+
+def make_messages(n_messages: int, urls_per_message: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    messages = []
+    for i in range(n_messages):
+        parts = ["안내드립니다."]
+        for _ in range(urls_per_message):
+            parts.append(rng.choice(SAMPLE_URLS).replace("{n}", str(rng.randint(0, 999))))
+            parts.append("참고해 주세요.")
+        messages.append(" ".join(parts))
+    return messages
+
+
+def _timeit(fn, items, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for it in items:
+            fn(it)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="URL 버튼 라벨 리졸버 벤치마크")
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--urls-per-message", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages, args.urls_per_message)
+    urls = [u for m in messages for u in m.split() if "://" in u or u.startswith("tel:")]
+
+    resolver = ButtonLabelResolver.from_config()
+    # 결과 동일성 확인
+    for u in urls:
+        assert resolver.label_for_link(u) == legacy_link_label(u), u
+        assert resolver.label_for_ref_url(u) == legacy_ref_label(u), u
+    for m in messages[:50]:
+        assert convert_links_to_buttons(m, resolver) == legacy_convert(m)
+
+    # 캐시 효과와 순수 매칭 비용을 분리해서 측정
+    uncached = ButtonLabelResolver.from_config()
+    rows = [
+        ("link label (legacy)", _timeit(legacy_link_label, urls, args.repeat), len(urls)),
+        ("link label (index)", _timeit(uncached._label_for_link, urls, args.repeat), len(urls)),
+        ("link label (index+cache)", _timeit(resolver.label_for_link, urls, args.repeat), len(urls)),
+        ("ref label (legacy)", _timeit(legacy_ref_label, urls, args.repeat), len(urls)),
+        ("ref label (keywords)", _timeit(uncached._label_for_ref_url, urls, args.repeat), len(urls)),
+        ("ref label (keywords+cache)", _timeit(resolver.label_for_ref_url, urls, args.repeat), len(urls)),
+        ("convert message (legacy)", _timeit(legacy_convert, messages, args.repeat), len(messages)),
+        ("convert message (new)", _timeit(lambda m: convert_links_to_buttons(m, resolver), messages, args.repeat), len(messages)),
+    ]
+    print(f"=== URL button bench: {args.messages} messages x {args.urls_per_message} urls ===")
+    for name, sec, n in rows:
+        print(f"{name:<28} {sec * 1e3:9.2f} ms total  {sec / n * 1e6:8.2f} us/item")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import json
+import platform
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+# 벤치마크 스크립트 공용 유틸리티 (합성 KB 생성, 측정, 기준값 저장/비교)
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+_TOPICS = [
+    "배송", "배달", "수수료", "배달비", "환불", "교환", "반품", "결제", "쿠폰", "할인", "포인트", "적립",
+    "가맹점", "등록", "정산", "주문", "취소", "리뷰", "회원", "탈퇴", "계정", "로그인", "비밀번호",
+    "고객센터", "운영시간", "영업시간", "최소주문", "지역", "이벤트", "혜택", "앱", "알림", "메뉴",
+]
+_VERBS = ["확인", "신청", "변경", "처리", "안내", "조회", "적용", "문의", "등록", "해지"]
+_ENDINGS = ["가능합니다.", "됩니다.", "필요합니다.", "진행됩니다.", "완료됩니다.", "제공됩니다."]
+
+
+def synthetic_sentence(rng: random.Random) -> str:
+    topic = rng.sample(_TOPICS, 2)
+    return (
+        f"{topic[0]} {rng.choice(_VERBS)}은 {topic[1]} 기준으로 "
+        f"{rng.randint(1, 30)}일 이내 {rng.choice(_ENDINGS)}"
+    )
+
+
+def synthetic_documents(n: int, sentences: int = 3, seed: int = 0) -> List[str]:
+    """FAQ 형태의 합성 문서 n건. 실제 KB처럼 문장 사이에 리터럴 '\\n'을 넣습니다."""
+    rng = random.Random(seed)
+    return [
+        "\\n".join(synthetic_sentence(rng) for _ in range(rng.randint(1, sentences)))
+        for _ in range(n)
+    ]
+
+
+def synthetic_queries(n: int, seed: int = 1) -> List[str]:
+    rng = random.Random(seed)
+    return [f"{rng.choice(_TOPICS)} {rng.choice(_VERBS)} 어떻게 하나요?" for _ in range(n)]
+
+
+def measure(fn: Callable[[], Any], rounds: int = 5, min_time: float = 0.1, max_loops: int = 1_000_000) -> Dict[str, float]:
+    """fn 1회 호출의 시간(초)을 라운드별로 측정해 중앙값/최소값을 반환합니다.
+
+    라운드마다 최소 min_time 동안 반복하므로 짧은 함수도 안정적으로 측정됩니다.
+    """
+    loops = 1
+    while loops < max_loops:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - t0 >= min_time:
+            break
+        loops *= 10
+    per_call = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        per_call.append((time.perf_counter() - t0) / loops)
+    return {"median_s": statistics.median(per_call), "min_s": min(per_call), "loops": loops, "rounds": rounds}
+
+
+def machine_info() -> Dict[str, str]:
+    return {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system()}
+
+
+def save_baseline(name: str, results: Dict[str, Dict[str, float]], path: Optional[Path] = None) -> Path:
+    path = path or BASELINE_DIR / f"{name}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"machine": machine_info(), "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    return path
+
+
+def check_baseline(name: str, results: Dict[str, Dict[str, float]], threshold: float, path: Optional[Path] = None) -> List[str]:
+    """기준값 대비 threshold 비율 이상 느려진 벤치마크 이름 목록을 반환합니다.
+
+    공유 머신의 잡음에 덜 민감하도록 라운드 최소값(min_s)끼리 비교합니다.
+    """
+    path = path or BASELINE_DIR / f"{name}.json"
+    baseline = json.loads(path.read_text(encoding="utf-8"))["results"]
+    regressions = []
+    print(f"\n=== Compare with {path.name} (threshold +{threshold:.0%}) ===")
+    for bench, res in results.items():
+        base = baseline.get(bench)
+        if not base:
+            print(f"{bench:<36} (기준값 없음)")
+            continue
+        ratio = res["min_s"] / base["min_s"] if base["min_s"] else 1.0
+        mark = "REGRESSION" if ratio > 1 + threshold else "ok"
+        print(f"{bench:<36} base={_fmt(base['min_s']):>10} cur={_fmt(res['min_s']):>10} ({ratio - 1:+.1%}) {mark}")
+        if ratio > 1 + threshold:
+            regressions.append(bench)
+    return regressions
+
+
+def _fmt(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f}s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds * 1e6:.2f}us"
+
+
+def print_results(title: str, results: Dict[str, Dict[str, float]]) -> None:
+    print(f"=== {title} ===")
+    print(f"{'benchmark':<36}{'median':>12}{'min':>12}{'loops':>9}")
+    for bench, res in results.items():
+        print(f"{bench:<36}{_fmt(res['median_s']):>12}{_fmt(res['min_s']):>12}{res['loops']:>9}")
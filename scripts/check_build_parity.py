@@ -0,0 +1,34 @@
+import sys
+import tempfile
+from pathlib import Path
+
+# 프로젝트 루트 기준으로 실행 가정
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from scripts.bench_build import write_kb  # noqa: E402
+from scripts.bench_utils import synthetic_documents  # noqa: E402
+from src.agents.rag_agent import SimpleRAG  # noqa: E402
+from src.agents.rag_parallel import same_index  # noqa: E402
+
+
+# 병렬 인덱스 적재(build_workers) 확인
+# - data/kb(memory)와 합성 stream KB(jsonl 8개)에서 build_workers=2 인덱스가
+#   순차 적재와 같은 어휘/idf/TF-IDF 행렬을 만드는지 비교
+# - 워커를 spawn으로 띄우므로 수 초~수십 초 걸림 (smoke_faq에서 분리)
+#
+# 예:
+#   python scripts/check_build_parity.py
+
+
+def main() -> None:
+    kb = Path(tempfile.mkdtemp(prefix="kb_parity_"))
+    write_kb(kb, synthetic_documents(400), "stream", 8)
+    for kwargs in ({"kb_dir": "data/kb"}, {"kb_dir": str(kb), "ingest": "stream"}):
+        if not same_index(SimpleRAG(build_workers=0, **kwargs), SimpleRAG(build_workers=2, **kwargs)):
+            raise SystemExit(f"[FAIL] build_workers=2 인덱스가 순차 적재와 다릅니다: {kwargs}")
+    print("build parity: OK")
+
+
+if __name__ == "__main__":
+    main()
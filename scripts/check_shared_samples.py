@@ -0,0 +1,59 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 프로젝트 루트 기준으로 실행 가정
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import app_api_streamlit as app  # noqa: E402
+
+
+# 샘플 질문 공유 경로 확인 (upstream API 없이 실행)
+# - 서로 다른 두 세션(서버 세션이 아직 없는 첫 클릭 포함)이 같은 샘플 질문을 동시에 보내면
+#   upstream 호출은 1번만 일어나고, 각 세션은 자기 user_id/session_id를 유지해야 함
+#
+# 예:
+#   python scripts/check_shared_samples.py
+
+
+def main() -> None:
+    samples = app.get_recommendation_catalog().items()
+    if not samples:
+        raise SystemExit("[FAIL] recommendations.json에 샘플 질문이 없습니다.")
+    question = samples[0]["question"]
+    if not app.is_session_independent(question):
+        raise SystemExit(f"[FAIL] 샘플 질문이 공유 대상으로 판단되지 않습니다: {question}")
+
+    calls = []
+
+    def fake_call_api(user_text, user_id, session_id):
+        calls.append((user_text, user_id, session_id))
+        time.sleep(0.2)  # 두 요청이 겹치도록 upstream 지연 흉내
+        return {"user_id": "upstream-user", "session_id": "upstream-session", "response": "답변", "intent": "QNA"}
+
+    app.call_api = fake_call_api
+    cache = app.SharedResponseCache(ttl=60, max_entries=16)
+    callers = [("", ""), ("user-2", "session-2")]  # 첫 클릭(서버 세션 없음) / 이미 세션이 있는 사용자
+    results = [None] * len(callers)
+
+    def click(i):
+        results[i] = app.call_api_shared(question, *callers[i], cache)
+
+    threads = [threading.Thread(target=click, args=(i,)) for i in range(len(callers))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    if len(calls) != 1:
+        raise SystemExit(f"[FAIL] upstream 호출 {len(calls)}회 (기대 1회)")
+    for (user_id, session_id), result in zip(callers, results):
+        if result["response"] != "답변" or (result["user_id"], result["session_id"]) != (user_id, session_id):
+            raise SystemExit(f"[FAIL] 공유 응답의 세션 정보가 호출자와 다릅니다: {result}")
+    print(f"shared samples: OK (upstream calls=1, stats={cache.stats})")
+
+
+if __name__ == "__main__":
+    main()
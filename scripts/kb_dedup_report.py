@@ -0,0 +1,66 @@
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트 기준으로 실행 가정
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.agents.rag_agent import INGEST_MODES, kb_paths, read_kb_documents  # noqa: E402
+from src.agents.rag_dedup import find_near_duplicates  # noqa: E402
+from src.agents.rag_ingest import TXT_SPLITS  # noqa: E402
+
+
+# KB 중복 문서 리포트
+# - SimpleRAG가 적재 시 합치는 것과 같은 기준(rag_dedup.find_near_duplicates)으로 그룹을 출력
+# - 문서는 SimpleRAG와 같은 방식으로 읽음 (rag_agent.kb_paths/read_kb_documents, 기본값은 RAG_INGEST/RAG_TXT_SPLIT)
+# - 대표 문서(파일명 순 첫 문서) 아래에 합쳐질 문서와 대표와의 Jaccard 유사도를 표시
+#   (stream 적재에서 파일 하나에 문서가 여럿이면 파일명 뒤에 바이트 오프셋을 붙임)
+#
+# 예:
+#   python scripts/kb_dedup_report.py
+#   python scripts/kb_dedup_report.py --kb data/kb --threshold 0.8
+#   python scripts/kb_dedup_report.py --kb exports --ingest stream --txt-split paragraph
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="KB 거의 같은 문서(near-duplicate) 리포트")
+    parser.add_argument("--kb", default="data/kb", help="KB 디렉터리")
+    parser.add_argument("--threshold", type=float, default=float(os.getenv("RAG_DEDUP_THRESHOLD", "0.9")),
+                        help="같은 문서로 볼 Jaccard 유사도")
+    parser.add_argument("--ingest", choices=INGEST_MODES, default=os.getenv("RAG_INGEST", "memory"),
+                        help="memory(*.txt) | stream(*.txt/*.jsonl/*.csv)")
+    parser.add_argument("--txt-split", choices=TXT_SPLITS, default=os.getenv("RAG_TXT_SPLIT", "file"),
+                        help="stream 적재의 .txt 문서 단위")
+    args = parser.parse_args()
+
+    texts, paths = read_kb_documents(kb_paths(args.kb, args.ingest), args.ingest, args.txt_split)
+    offsets = getattr(texts, "offsets", None)  # stream(DocStore)이면 문서별 파일 안 시작 위치
+
+    def label(i: int) -> str:
+        if offsets is None:
+            return paths[i].name
+        return f"{paths[i].name}@{int(offsets[i])}"
+
+    t0 = time.perf_counter()
+    groups, pairs = find_near_duplicates(texts, threshold=args.threshold)
+    elapsed = time.perf_counter() - t0
+    sims = {(i, j): sim for i, j, sim in pairs}
+
+    dup_groups = [g for g in groups if len(g) > 1]
+    removed = sum(len(g) - 1 for g in dup_groups)
+    saved = sum(len(texts[i].encode("utf-8")) for g in dup_groups for i in g[1:])
+    print(f"=== KB dedup report: {args.kb} (threshold={args.threshold}) ===")
+    print(f"문서 {len(texts)}건 → 인덱싱 {len(groups)}건 (중복 {removed}건, {saved / 1024:.1f}KiB 절감), {elapsed * 1e3:.1f}ms")
+    for g in dup_groups:
+        print(f"\n[대표] {label(g[0])}")
+        for i in g[1:]:
+            sim = sims.get((g[0], i))
+            sim_label = f"{sim:.3f}" if sim is not None else "간접"  # 다른 별칭을 거쳐 묶인 경우
+            print(f"  - {label(i)} (유사도 {sim_label})")
+
+
+if __name__ == "__main__":
+    main()
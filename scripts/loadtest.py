@@ -0,0 +1,375 @@
+import argparse
+import json
+import math
+import queue
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 프로젝트 루트 기준으로 실행 가정
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.router import style_decision_stats  # noqa: E402
+
+
+# 대화 발화 코퍼스(JSONL)를 파이프라인에 재생하는 부하 생성기
+# - 대상: 프로세스 내 그래프(inproc) 또는 HTTP `/agent/` 엔드포인트
+# - 동시성(--concurrency)과 도착률(--rate, 초당 요청; 0이면 closed-loop) 설정
+# - 처리량, intent/노드별 p50/p95/p99 지연, 오류율을 보고하고 JSON으로 저장
+# - --compare 로 이전 결과와 비교해 회귀 여부 판정
+#
+# 예:
+#   python scripts/loadtest.py --requests 500 --concurrency 8
+#   python scripts/loadtest.py --target http://127.0.0.1:8000/agent/ --rate 50 --duration 30
+#   python scripts/loadtest.py --compare loadtest_results/baseline.json
+
+DEFAULT_CORPUS = ROOT / "data" / "loadtest" / "utterances.jsonl"
+DEFAULT_OUT_DIR = ROOT / "loadtest_results"
+
+Sample = Dict[str, Any]
+
+
+def load_corpus(path: Path) -> List[Dict[str, Any]]:
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            if isinstance(row, str):
+                row = {"text": row}
+            rows.append(row)
+    if not rows:
+        raise SystemExit(f"코퍼스가 비어 있습니다: {path}")
+    return rows
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    s = sorted(values)
+    return {
+        "count": len(s),
+        "mean_ms": round(sum(s) / len(s) * 1e3, 3) if s else 0.0,
+        "p50_ms": round(percentile(s, 50) * 1e3, 3),
+        "p95_ms": round(percentile(s, 95) * 1e3, 3),
+        "p99_ms": round(percentile(s, 99) * 1e3, 3),
+        "max_ms": round(s[-1] * 1e3, 3) if s else 0.0,
+    }
+
+
+# ===== 대상별 실행기 =====
+
+def make_inproc_runner(
+    tracer: Any = None, use_cache: bool = True, channel: str = "web"
+) -> Callable[[str], Tuple[str, Dict[str, float]]]:
+    """그래프를 직접 실행. stream(updates)로 노드 완료 시점을 받아 노드별 시간을 계산.
+
+    tracer(NodeTracer)를 넘기면 노드 함수 자체의 wall/CPU 시간도 별도로 기록됩니다.
+    use_cache=False 이면 응답 캐시가 항상 미적중하도록 구성해 전체 경로를 측정합니다.
+    """
+    from src.graph import build_graph
+    from src.response_cache import ResponseCache
+
+    graph = build_graph(tracer=tracer, cache=ResponseCache() if use_cache else ResponseCache(ttl=0))
+
+    def run(text: str) -> Tuple[str, Dict[str, float]]:
+        nodes: Dict[str, float] = {}
+        final: Dict[str, Any] = {}
+        prev = time.perf_counter()
+        for chunk in graph.stream({"user_input": text, "channel": channel}, stream_mode="updates"):
+            now = time.perf_counter()
+            for node, update in chunk.items():
+                nodes[node] = nodes.get(node, 0.0) + (now - prev)
+                if isinstance(update, dict):
+                    final = update
+            prev = now
+        return str(final.get("intent", "unknown")), nodes
+
+    return run
+
+
+def make_http_runner(url: str, timeout: float) -> Callable[[str], Tuple[str, Dict[str, float]]]:
+    import requests
+
+    local = threading.local()
+
+    def run(text: str) -> Tuple[str, Dict[str, float]]:
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        resp = session.post(url, json={"user_id": "", "session_id": "", "human": text}, timeout=timeout)
+        resp.raise_for_status()
+        body = resp.json()
+        return str(body.get("intent", "unknown")), {}
+
+    return run
+
+
+# ===== 부하 생성 =====
+
+def run_load(
+    runner: Callable[[str], Tuple[str, Dict[str, float]]],
+    corpus: List[Dict[str, Any]],
+    concurrency: int,
+    rate: float,
+    total_requests: Optional[int],
+    duration: Optional[float],
+    seed: int,
+) -> Tuple[List[Sample], float]:
+    """요청을 스케줄하고 결과 샘플 목록과 실제 소요 시간을 반환.
+
+    open-loop(rate>0)에서는 예정 도착 시각부터 지연을 재므로 대기열 지연이 포함됩니다.
+    """
+    rng = random.Random(seed)
+    jobs: "queue.Queue[Optional[Tuple[float, Dict[str, Any]]]]" = queue.Queue()
+    samples: List[Sample] = []
+    lock = threading.Lock()
+    slots = threading.Semaphore(concurrency)  # closed-loop 동시 요청 수 제한
+
+    def worker() -> None:
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            scheduled, row = job
+            start = time.perf_counter()
+            sample: Sample = {"text": row["text"], "expected": row.get("intent"), "queue_s": max(0.0, start - scheduled)}
+            try:
+                intent, nodes = runner(row["text"])
+                sample.update(intent=intent, nodes=nodes, ok=True)
+            except Exception as exc:
+                sample.update(intent="error", nodes={}, ok=False, error=f"{type(exc).__name__}: {exc}")
+            end = time.perf_counter()
+            sample["latency_s"] = end - scheduled
+            sample["service_s"] = end - start
+            with lock:
+                samples.append(sample)
+            if rate <= 0:
+                slots.release()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+
+    t0 = time.perf_counter()
+    deadline = t0 + duration if duration else None
+    next_at = t0
+    sent = 0
+    while True:
+        if total_requests is not None and sent >= total_requests:
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        row = rng.choice(corpus)
+        if rate > 0:
+            next_at += rng.expovariate(rate)
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            jobs.put((next_at, row))
+        else:
+            # closed-loop: 진행 중인 요청이 concurrency개 미만일 때만 다음 요청 투입
+            slots.acquire()
+            jobs.put((time.perf_counter(), row))
+        sent += 1
+
+    for _ in threads:
+        jobs.put(None)
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - t0
+
+
+def build_report(samples: List[Sample], elapsed: float, config: Dict[str, Any]) -> Dict[str, Any]:
+    ok = [s for s in samples if s["ok"]]
+    by_intent: Dict[str, List[float]] = {}
+    by_node: Dict[str, List[float]] = {}
+    for s in ok:
+        by_intent.setdefault(s["intent"], []).append(s["latency_s"])
+        for node, sec in s["nodes"].items():
+            by_node.setdefault(node, []).append(sec)
+    errors: Dict[str, int] = {}
+    for s in samples:
+        if not s["ok"]:
+            errors[s["error"]] = errors.get(s["error"], 0) + 1
+    # 라우팅 일치 여부는 그래프 intent를 그대로 받는 inproc 대상에서만 의미가 있음
+    mismatched = None
+    if config["target"] == "inproc":
+        mismatched = sum(1 for s in ok if s.get("expected") and s["intent"] not in (s["expected"], "blocked"))
+    return {
+        "config": config,
+        "requests": len(samples),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(1 - len(ok) / len(samples), 4) if samples else 0.0,
+        "errors": errors,
+        "routing_mismatch": mismatched,
+        "latency": summarize([s["latency_s"] for s in ok]),
+        "queue_wait": summarize([s["queue_s"] for s in ok]),
+        "per_intent": {k: summarize(v) for k, v in sorted(by_intent.items())},
+        "per_node": {k: summarize(v) for k, v in sorted(by_node.items())},
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"=== Load test: {report['config']['target']} ===")
+    print(
+        f"requests={report['requests']} elapsed={report['elapsed_s']}s "
+        f"throughput={report['throughput_rps']} rps error_rate={report['error_rate']:.2%}"
+    )
+    header = f"{'':<16}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  (ms)"
+
+    def rows(title: str, table: Dict[str, Dict[str, float]]) -> None:
+        if not table:
+            return
+        print(f"\n[{title}]\n{header}")
+        for name, st in table.items():
+            print(f"{name:<16}{st['count']:>7}{st['p50_ms']:>10.2f}{st['p95_ms']:>10.2f}{st['p99_ms']:>10.2f}{st['max_ms']:>10.2f}")
+
+    rows("overall", {"all": report["latency"], "queue wait": report["queue_wait"]})
+    rows("per intent", report["per_intent"])
+    rows("per node", report["per_node"])
+    if report.get("node_trace"):
+        print(f"\n[per node (traced)]\n{'':<16}{'count':>7}{'wall p50':>10}{'wall p95':>10}{'cpu avg':>10}  (ms)")
+        for name, st in report["node_trace"].items():
+            cpu_avg = st["cpu_sum_s"] / st["count"] * 1e3 if st["count"] else 0.0
+            print(f"{name:<16}{st['count']:>7}{st['wall_p50_s'] * 1e3:>10.2f}{st['wall_p95_s'] * 1e3:>10.2f}{cpu_avg:>10.2f}")
+    if report.get("style_decisions"):
+        decisions = report["style_decisions"]
+        total = sum(decisions.values())
+        skipped = sum(v for k, v in decisions.items() if not k.startswith("apply"))
+        print(f"\n[style decisions] skipped {skipped}/{total} ({skipped / total:.1%})")
+        for reason, n in decisions.items():
+            print(f"{reason:<16}{n:>7}")
+    if report["errors"]:
+        print("\n[errors]")
+        for msg, n in report["errors"].items():
+            print(f"{n:>6}  {msg}")
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """기준 결과 대비 p95 지연/처리량/오류율이 threshold 비율 이상 나빠진 항목을 반환."""
+    regressions = []
+
+    def check(name: str, cur: float, base: float, higher_is_worse: bool = True) -> None:
+        if base <= 0:
+            return
+        ratio = cur / base
+        worse = ratio > 1 + threshold if higher_is_worse else ratio < 1 - threshold
+        mark = "REGRESSION" if worse else "ok"
+        print(f"{name:<32} base={base:>10.2f} cur={cur:>10.2f} ({ratio - 1:+.1%}) {mark}")
+        if worse:
+            regressions.append(name)
+
+    print("\n=== Compare with baseline ===")
+    # open-loop에서는 처리량이 도착률로 정해지므로 같은 설정끼리만 비교
+    if report["config"].get("rate") == baseline.get("config", {}).get("rate"):
+        check("throughput_rps", report["throughput_rps"], baseline["throughput_rps"], higher_is_worse=False)
+    check("latency.p95_ms", report["latency"]["p95_ms"], baseline["latency"]["p95_ms"])
+    for section in ("per_intent", "per_node"):
+        for name, st in report[section].items():
+            if name in baseline.get(section, {}):
+                check(f"{section}.{name}.p95_ms", st["p95_ms"], baseline[section][name]["p95_ms"])
+    if report["error_rate"] > baseline.get("error_rate", 0.0):
+        print(f"error_rate base={baseline.get('error_rate', 0.0):.2%} cur={report['error_rate']:.2%} REGRESSION")
+        regressions.append("error_rate")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="대화 코퍼스 재생 부하 테스트")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--target", default="inproc", help="'inproc' 또는 HTTP 엔드포인트 URL")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=0.0, help="초당 도착률(포아송). 0이면 closed-loop")
+    parser.add_argument("--requests", type=int, default=None, help="총 요청 수 (기본 200, --duration과 택1)")
+    parser.add_argument("--duration", type=float, default=None, help="실행 시간(초)")
+    parser.add_argument("--warmup", type=int, default=5, help="측정 전 워밍업 요청 수")
+    parser.add_argument("--timeout", type=float, default=10.0, help="HTTP 타임아웃(초)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace", action="store_true", help="inproc 대상에서 노드 계측(NodeTracer) 결과도 보고")
+    parser.add_argument("--no-cache", action="store_true", help="inproc 대상에서 응답 캐시 적중 없이 측정")
+    parser.add_argument("--channel", default="web", help="inproc 대상 채널 (web/api/mobile/console)")
+    parser.add_argument("--out", type=Path, default=None, help="결과 JSON 경로 (기본 loadtest_results/<시각>.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="회귀 판정 비율 (기본 20%%)")
+    parser.add_argument("--min-style-skip", type=float, default=0.0,
+                        help="inproc 대상에서 화법 생략 비율이 이 값보다 낮으면 실패 (예: 0.1)")
+    args = parser.parse_args()
+
+    if args.requests is None and args.duration is None:
+        args.requests = 200
+
+    corpus = load_corpus(args.corpus)
+    tracer = None
+    if args.target == "inproc":
+        if args.trace:
+            from src.tracing import NodeTracer
+
+            tracer = NodeTracer(capacity=1_000_000)
+        runner = make_inproc_runner(tracer, use_cache=not args.no_cache, channel=args.channel)
+    else:
+        runner = make_http_runner(args.target, args.timeout)
+
+    for row in corpus[: args.warmup]:
+        runner(row["text"])
+    if tracer is not None:
+        tracer.clear()
+    style_before = style_decision_stats()
+
+    samples, elapsed = run_load(
+        runner, corpus, args.concurrency, args.rate, args.requests, args.duration, args.seed
+    )
+    config = {
+        "target": args.target,
+        "corpus": str(args.corpus),
+        "concurrency": args.concurrency,
+        "rate": args.rate,
+        "requests": args.requests,
+        "duration": args.duration,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    report = build_report(samples, elapsed, config)
+    if tracer is not None:
+        report["node_trace"] = tracer.summary()
+    if args.target == "inproc":
+        style_after = style_decision_stats()
+        report["style_decisions"] = {
+            k: style_after[k] - style_before.get(k, 0)
+            for k in sorted(style_after)
+            if style_after[k] != style_before.get(k, 0)
+        }
+    print_report(report)
+
+    out = args.out or DEFAULT_OUT_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n결과 저장: {out}")
+
+    if args.min_style_skip > 0 and args.target == "inproc":
+        decisions = report.get("style_decisions") or {}
+        total = sum(decisions.values())
+        skipped = sum(v for k, v in decisions.items() if not k.startswith("apply"))
+        if not total or skipped / total < args.min_style_skip:
+            print(f"[FAIL] 화법 생략 비율 {skipped}/{total} < {args.min_style_skip:.0%}")
+            sys.exit(1)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
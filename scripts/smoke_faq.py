@@ -5,6 +5,7 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
+from src.batch import initial_state, process_chunk, result_row  # noqa: E402
 from src.graph import build_graph  # noqa: E402
 
 
@@ -14,6 +15,7 @@ CASES = [
     "전화 연결 부탁",
     "앱에서 버튼으로 열어줘",
     "환불 문제로 분쟁이 있습니다",
+    "환불 문제로 전화 연결",
 ]
 
 
@@ -24,6 +26,13 @@ def main() -> None:
         result = g.invoke({"user_input": text})
         out = result.get("final_text") or result.get("response") or "(no response)"
         print(f"\n[INPUT] {text}\n[OUTPUT]\n{out}\n")
+
+    # 배치 실행기(src/batch.py)가 graph.invoke와 같은 결과를 내는지 확인
+    records = [{"id": i, "text": text} for i, text in enumerate(CASES)]
+    expected = [result_row(r, g.invoke(initial_state(r))) for r in records]
+    if process_chunk(records) != expected:
+        raise SystemExit("[FAIL] batch process_chunk 결과가 graph.invoke와 다릅니다.")
+    print("batch parity: OK")
     print("=== Done ===")
 
 
@@ -1,55 +1,396 @@
-from typing import Dict, List, Tuple
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
 from pathlib import Path
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+
+# scikit-learn은 import 비용이 커서(약 1초) 인덱스를 만들거나 검색할 때 불러옴
+#
+# 환경변수 (공용 인스턴스 get_shared_rag 설정):
+#   RAG_MODE                tfidf(기본) | lsa | hybrid
+#   RAG_LSA_DIMS            lsa/hybrid 모드의 잠재 차원 수 (기본 256)
+#   RAG_HYBRID_FUSION       hybrid 점수 융합 방식 rrf(기본) | weighted
+#   RAG_HYBRID_WEIGHT       weighted 융합의 밀집 점수 가중치 (기본 0.5)
+#   RAG_HYBRID_CANDIDATES   hybrid 모드에서 엔진별로 뽑는 후보 수 (기본 50)
+#   RAG_ANN                 lsa/hybrid 밀집 검색을 근사 검색으로: 없음(기본, 전수 내적) | ivf | ivfpq
+#   RAG_ANN_LISTS           IVF 리스트 수 (기본 0 = 4 * sqrt(문서 수))
+#   RAG_ANN_PROBE           질의마다 살펴볼 IVF 리스트 수 (기본 8)
+#   RAG_PRECISION           인덱스 저장 정밀도 float64(기본) | float32 | float16 | int8
+#   RAG_ANSWER_MODE         답변 형식 extractive(기본, 질문과 가까운 문장만) | snippet(문서 앞 300자)
+#   RAG_ANSWER_SENTENCES    extractive 답변에 넣을 최대 문장 수 (기본 2)
+#   RAG_DEDUP_THRESHOLD     KB 적재 시 이 Jaccard 유사도 이상인 문서를 하나로 합침 (기본 0.9, 0이면 끔)
+#   RAG_INGEST              KB 적재 방식 memory(기본, *.txt 원문 보관) | stream(*.txt/*.jsonl/*.csv, 오프셋만 보관)
+#   RAG_TXT_SPLIT           stream 적재의 .txt 문서 단위 file(기본, 파일 1개 = 문서 1개) | paragraph(빈 줄로 구분한 문단)
+#   RAG_VECTORIZER          tfidf(기본) | hashing (어휘 사전 없는 해시 벡터화)
+#   RAG_HASH_FEATURES       hashing 벡터 차원 (기본 262144, 클수록 충돌이 줄지만 최대 메모리가 늘어남)
+#   RAG_BUILD_WORKERS       KB 인덱스를 만들 때 파일 읽기/토큰화를 나눠 맡을 프로세스 수 (기본 0 = 현재 프로세스에서 순차)
+
+RAG_MODES = ("tfidf", "lsa", "hybrid")
+ANSWER_MODES = ("extractive", "snippet")
+INGEST_MODES = ("memory", "stream")
+VECTORIZERS = ("tfidf", "hashing")
+
+# 문장 경계: 줄바꿈, KB 파일에 문자 그대로 들어 있는 "\n", 문장부호 뒤 공백
+_SENTENCE_SPLIT = re.compile(r"\\n|\n|(?<=[.!?。])\s+")
+
+# 문서별 (문장 목록, 문장 TF-IDF 행렬) 캐시 크기 (extractive 답변용)
+_SENTENCE_CACHE_SIZE = 4096
+
+NO_ANSWER_TEXT = "지식베이스에 관련 정보가 없습니다. 상담사 연결 또는 다른 요청을 시도해주세요."
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text) if s.strip()]
+
+
+def read_kb_texts(paths: Sequence[Path]) -> Tuple[List[str], List[Path]]:
+    """KB *.txt 파일 → (비어 있지 않은 문서 텍스트, 해당 파일 경로). 파일 1개 = 문서 1개."""
+    documents: List[str] = []
+    doc_paths: List[Path] = []
+    for p in paths:
+        try:
+            text = p.read_text(encoding="utf-8").strip()
+        except UnicodeDecodeError:
+            text = p.read_text(errors="ignore").strip()
+        if text:
+            documents.append(text)
+            doc_paths.append(p)
+    return documents, doc_paths
+
+
+def kb_paths(kb_dir: str, ingest: str = "memory") -> List[Path]:
+    """적재 방식별 KB 파일 목록 (파일명 순). memory는 *.txt, stream은 txt/jsonl/csv."""
+    kb_path = Path(kb_dir)
+    if not kb_path.exists():
+        kb_path.mkdir(parents=True, exist_ok=True)
+    if ingest == "stream":
+        from src.agents.rag_ingest import STREAM_SUFFIXES
+
+        return sorted(p for p in kb_path.iterdir() if p.suffix in STREAM_SUFFIXES)
+    return sorted(kb_path.glob("*.txt"))
+
+
+def read_kb_documents(paths: Sequence[Path], ingest: str = "memory", txt_split: str = "file") -> Tuple[Sequence[str], Sequence[Path]]:
+    """KB 파일 → (문서, 문서별 원본 경로). stream이면 rag_ingest.DocStore/DocPaths (SimpleRAG 순차 적재와 같음)."""
+    if ingest == "stream":
+        from src.agents.rag_ingest import DocPaths, DocStore
+
+        store = DocStore.scan(paths, txt_split=txt_split)
+        return store, DocPaths(store)
+    return read_kb_texts(paths)
 
 
 class SimpleRAG:
     """아주 간단한 TF-IDF 기반 RAG 구현.
     - 프로젝트의 data/kb/*.txt 를 로드하여 문서 코퍼스를 구성
     - 쿼리와 코퍼스의 코사인 유사도를 계산하여 Top-K를 반환
+    - documents를 직접 넘기면 파일 대신 해당 문서 목록으로 인덱스를 구성(벤치마크/배치용)
+    - mode="lsa": TF-IDF 행렬 위에 LSA 밀집 인덱스(rag_dense.LSAIndex)를 만들어 의미 기반으로 검색
+      (코퍼스가 너무 작아 잠재 공간을 만들 수 없으면 TF-IDF로 검색)
+    - mode="hybrid": TF-IDF와 LSA 후보를 합쳐 점수 융합(rag_hybrid.HybridSearcher)으로 순위를 매김
+    - precision: float64가 아니면 TF-IDF 행렬을 저정밀도 역색인(rag_quant.TermPostings)으로,
+      LSA 문서 벡터를 저정밀도로 바꿔 보관 (원래 float64 행렬은 버림, lsa 모드는 역색인 없이 LSA 벡터만 보관)
+    - answer_mode="extractive": 상위 문서를 문장으로 나눠 같은 벡터라이저로 질의와 다시 점수화하고
+      가장 가까운 문장 answer_sentences개만 답변에 사용
+    - kb_dir 적재 시 거의 같은 문서(rag_dedup, Jaccard >= dedup_threshold)는 하나만 인덱싱하고
+      나머지 파일은 doc_aliases에 별칭으로 남김
+    - ingest="stream": kb_dir의 txt/jsonl/csv를 스트리밍으로 읽고 문서 오프셋만 보관
+      (documents는 mmap으로 필요할 때 읽는 rag_ingest.DocStore, txt_split="paragraph"면 .txt를 문단별 문서로)
+    - vectorizer="hashing": 어휘 사전 없이 해시 벡터화(rag_ingest.HashingTfidfVectorizer)
+    - build_workers > 0: kb_dir 파일을 프로세스 풀에 나눠 읽기/토큰화/단어 빈도 집계를 하고 합쳐서
+      순차 적재와 같은 인덱스를 만듦(rag_parallel)
     """
 
-    def __init__(self, kb_dir: str = "data/kb", top_k: int = 2):
+    def __init__(
+        self,
+        kb_dir: str = "data/kb",
+        top_k: int = 2,
+        documents: Optional[Sequence[str]] = None,
+        mode: str = "tfidf",
+        lsa_dims: int = 256,
+        fusion: str = "rrf",
+        hybrid_weight: float = 0.5,
+        hybrid_candidates: int = 50,
+        ann: Optional[str] = None,
+        ann_lists: int = 0,
+        ann_probe: int = 8,
+        precision: str = "float64",
+        answer_mode: str = "extractive",
+        answer_sentences: int = 2,
+        dedup_threshold: float = 0.9,
+        ingest: str = "memory",
+        txt_split: str = "file",
+        vectorizer: str = "tfidf",
+        hash_features: int = 2 ** 18,
+        build_workers: int = 0,
+    ):
+        if mode not in RAG_MODES:
+            raise ValueError(f"지원하지 않는 RAG 모드: {mode} (가능: {', '.join(RAG_MODES)})")
+        if mode == "hybrid":
+            from src.agents.rag_hybrid import FUSIONS
+
+            if fusion not in FUSIONS:
+                raise ValueError(f"지원하지 않는 융합 방식: {fusion} (가능: {', '.join(FUSIONS)})")
+        if answer_mode not in ANSWER_MODES:
+            raise ValueError(f"지원하지 않는 답변 형식: {answer_mode} (가능: {', '.join(ANSWER_MODES)})")
+        if ingest not in INGEST_MODES:
+            raise ValueError(f"지원하지 않는 적재 방식: {ingest} (가능: {', '.join(INGEST_MODES)})")
+        if ingest == "stream":
+            from src.agents.rag_ingest import TXT_SPLITS
+
+            if txt_split not in TXT_SPLITS:
+                raise ValueError(f"지원하지 않는 txt 분할 방식: {txt_split} (가능: {', '.join(TXT_SPLITS)})")
+        if vectorizer not in VECTORIZERS:
+            raise ValueError(f"지원하지 않는 벡터라이저: {vectorizer} (가능: {', '.join(VECTORIZERS)})")
+        if precision != "float64":
+            from src.agents.rag_quant import PRECISIONS
+
+            if precision not in PRECISIONS:
+                raise ValueError(f"지원하지 않는 정밀도: {precision} (가능: {', '.join(PRECISIONS)})")
         self.kb_dir = kb_dir
         self.top_k = top_k
-        self.documents: List[str] = []
-        self.doc_paths: List[Path] = []
-        self.vectorizer = TfidfVectorizer()
+        self.mode = mode
+        self.lsa_dims = lsa_dims
+        self.fusion = fusion
+        self.hybrid_weight = hybrid_weight
+        self.hybrid_candidates = hybrid_candidates
+        self.ann = ann or None
+        self.ann_lists = ann_lists
+        self.ann_probe = ann_probe
+        self.precision = precision
+        self.postings = None
+        self.answer_mode = answer_mode
+        self.answer_sentences = answer_sentences
+        self._sentence_cache: "OrderedDict[int, Tuple[List[str], object]]" = OrderedDict()
+        self._sentence_lock = threading.Lock()
+        self.dedup_threshold = dedup_threshold
+        self.doc_aliases: Dict[int, List[Path]] = {}  # 문서 번호 → 합쳐진 중복 파일 경로 (kb_dir 적재 시)
+        self.ingest = ingest
+        self.txt_split = txt_split
+        self.build_workers = build_workers
+        self.dense = None
+        self.hybrid = None
+        self.documents: Sequence[str] = []
+        self.doc_paths: Sequence[Path] = []
+        if vectorizer == "hashing":
+            from src.agents.rag_ingest import HashingTfidfVectorizer
+
+            self.vectorizer = HashingTfidfVectorizer(n_features=hash_features)
+        else:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+
+            self.vectorizer = TfidfVectorizer()
         self.doc_matrix = None
-        self._load_corpus()
+        if documents is not None:
+            self.documents = [d.strip() for d in documents if d and d.strip()]
+            self._build_index()
+        else:
+            self._load_corpus()
 
     def _load_corpus(self) -> None:
-        kb_path = Path(self.kb_dir)
-        if not kb_path.exists():
-            kb_path.mkdir(parents=True, exist_ok=True)
-        for p in kb_path.glob("*.txt"):
-            try:
-                text = p.read_text(encoding="utf-8").strip()
-            except UnicodeDecodeError:
-                text = p.read_text(errors="ignore").strip()
-            if text:
-                self.documents.append(text)
-                self.doc_paths.append(p)
+        paths = kb_paths(self.kb_dir, self.ingest)
+        if self.build_workers > 0 and paths:
+            from src.agents.rag_parallel import count_corpus, select_rows
+
+            self.documents, self.doc_paths, terms, counts = count_corpus(
+                paths, self.ingest, self.vectorizer, self.build_workers, self.txt_split
+            )
+            keep = self._collapse_duplicates() if self.dedup_threshold > 0 and len(self.documents) > 1 else None
+            if keep is not None:
+                terms, counts = select_rows(terms, counts, keep)
+            self._build_index((terms, counts))
+            return
+        self.documents, self.doc_paths = read_kb_documents(paths, self.ingest, self.txt_split)
+        if self.dedup_threshold > 0 and len(self.documents) > 1:
+            self._collapse_duplicates()
+        self._build_index()
+
+    def _collapse_duplicates(self) -> Optional[List[int]]:
+        """거의 같은 문서 그룹마다 대표(파일명 순 첫 문서)만 남기고 나머지는 별칭으로.
+        남긴 문서의 원래 번호 목록을 반환 (합칠 문서가 없으면 None).
+        """
+        from src.agents.rag_dedup import find_near_duplicates
+
+        groups, _ = find_near_duplicates(self.documents, threshold=self.dedup_threshold)
+        if len(groups) == len(self.documents):
+            return None
+        self.doc_aliases = {n: [self.doc_paths[i] for i in g[1:]] for n, g in enumerate(groups) if len(g) > 1}
+        keep = [g[0] for g in groups]
+        if hasattr(self.documents, "select"):
+            from src.agents.rag_ingest import DocPaths
+
+            self.documents = self.documents.select(keep)
+            self.doc_paths = DocPaths(self.documents)
+        else:
+            self.documents = [self.documents[i] for i in keep]
+            self.doc_paths = [self.doc_paths[i] for i in keep]
+        return keep
+
+    def _build_index(self, counts: Optional[Tuple] = None) -> None:
+        """counts: 병렬 적재에서 미리 집계한 (어휘, 단어 빈도 행렬). 없으면 documents로 벡터라이저를 학습."""
         if self.documents:
-            self.doc_matrix = self.vectorizer.fit_transform(self.documents)
+            if counts is None:
+                self.doc_matrix = self.vectorizer.fit_transform(self.documents)
+            else:
+                from src.agents.rag_parallel import fit_counts
+
+                self.doc_matrix = fit_counts(self.vectorizer, *counts)
+            dense = None
+            if self.mode in ("lsa", "hybrid"):
+                from src.agents.rag_dense import LSAIndex
+
+                dense = LSAIndex.build(self.doc_matrix, dims=self.lsa_dims)
+                # IVF 중심점은 float32 벡터로 학습하고(int8 복원 벡터로 학습하면 재현율이 떨어짐),
+                # quantize가 LSA 문서 벡터와 IVF 재배열 벡터를 함께 줄임
+                if dense is not None and self.ann:
+                    dense.enable_ann(self.ann, n_lists=self.ann_lists, n_probe=self.ann_probe)
+                if dense is not None:
+                    dense.quantize(self.precision)
+            # 포스팅은 TF-IDF 검색(tfidf, hybrid의 sparse 쪽, LSA를 못 만들었을 때의 대체 경로)에서만 읽음
+            if self.precision != "float64" and (self.mode != "lsa" or dense is None):
+                from src.agents.rag_quant import TermPostings
+
+                self.postings = TermPostings(self.doc_matrix, self.precision)
+            if dense is not None:
+                if self.mode == "lsa":
+                    self.dense = dense
+                else:
+                    from src.agents.rag_hybrid import HybridSearcher
+
+                    self.hybrid = HybridSearcher(
+                        self.doc_matrix,
+                        dense,
+                        fusion=self.fusion,
+                        alpha=self.hybrid_weight,
+                        candidates=self.hybrid_candidates,
+                        postings=self.postings,
+                    )
+            # LSA 전용 검색은 TF-IDF 행렬도 읽지 않음
+            if self.postings is not None or self.dense is not None:
+                self.doc_matrix = None
+
+    def _search(self, query_vecs) -> List[List[Tuple[int, float]]]:
+        """TF-IDF 질의 행렬에 대해 행별 상위 top_k (문서 인덱스, 점수)."""
+        if self.hybrid is not None:
+            return self.hybrid.search(query_vecs, self.top_k)
+        if self.dense is not None:
+            return self.dense.search(query_vecs, self.top_k)
+        if self.postings is not None:
+            from src.agents.rag_dense import top_k_rows
+
+            return top_k_rows(self.postings.scores(query_vecs), self.top_k)
+        from sklearn.metrics.pairwise import cosine_similarity
+
+        sims = cosine_similarity(query_vecs, self.doc_matrix)
+        results = []
+        for row in sims:
+            top_indices = row.argsort()[::-1][: self.top_k]
+            results.append([(int(idx), float(row[idx])) for idx in top_indices])
+        return results
+
+    @property
+    def index_nbytes(self) -> int:
+        """검색 인덱스(TF-IDF 행렬 또는 포스팅 + 밀집 인덱스)의 메모리 사용량 (어휘 사전 제외)."""
+        total = 0
+        if self.postings is not None:
+            total += self.postings.nbytes
+        elif self.doc_matrix is not None:
+            m = self.doc_matrix
+            total += m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+        dense = self.dense or (self.hybrid.dense if self.hybrid is not None else None)
+        if dense is not None:
+            total += dense.nbytes
+        if self.hybrid is not None and self.hybrid.doc_matrix_t is not None:
+            m = self.hybrid.doc_matrix_t
+            total += m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+        return total
 
     def retrieve(self, query: str) -> List[Tuple[str, float]]:
         if not self.documents:
             return []
-        query_vec = self.vectorizer.transform([query])
-        sims = cosine_similarity(query_vec, self.doc_matrix).flatten()
-        top_indices = sims.argsort()[::-1][: self.top_k]
-        results: List[Tuple[str, float]] = []
-        for idx in top_indices:
-            results.append((self.documents[idx], float(sims[idx])))
+        hits = self._search(self.vectorizer.transform([query]))[0]
+        return [(self.documents[idx], score) for idx, score in hits]
+
+    def retrieve_batch(self, queries: Sequence[str], chunk_size: int = 256) -> List[List[Tuple[str, float]]]:
+        """여러 쿼리를 한 번에 검색. 벡터화/유사도 계산을 행렬 단위로 수행(결과는 retrieve와 동일).
+        - chunk_size 단위로 나눠 (쿼리 수 x 문서 수) 유사도 행렬의 메모리를 제한
+        """
+        if not self.documents:
+            return [[] for _ in queries]
+        results: List[List[Tuple[str, float]]] = []
+        for start in range(0, len(queries), chunk_size):
+            query_vecs = self.vectorizer.transform(list(queries[start:start + chunk_size]))
+            for hits in self._search(query_vecs):
+                results.append([(self.documents[idx], score) for idx, score in hits])
         return results
 
     def answer(self, query: str) -> str:
         """Top-K 문서에서 간단 요약/결합 응답 생성(규칙 기반)."""
-        hits = self.retrieve(query)
+        if self.answer_mode == "snippet":
+            return self._format_answer(self.retrieve(query))
+        if not self.documents:
+            return NO_ANSWER_TEXT
+        query_vecs = self.vectorizer.transform([query])
+        return self._extract_answer(query_vecs, self._search(query_vecs)[0])
+
+    def answer_batch(self, queries: Sequence[str], chunk_size: int = 256) -> List[str]:
+        """answer의 배치 버전 (오프라인 평가/백필용)."""
+        if self.answer_mode == "snippet":
+            return [self._format_answer(hits) for hits in self.retrieve_batch(queries, chunk_size)]
+        if not self.documents:
+            return [NO_ANSWER_TEXT for _ in queries]
+        answers: List[str] = []
+        for start in range(0, len(queries), chunk_size):
+            query_vecs = self.vectorizer.transform(list(queries[start:start + chunk_size]))
+            for row, hits in enumerate(self._search(query_vecs)):
+                answers.append(self._extract_answer(query_vecs[row], hits))
+        return answers
+
+    def _extract_answer(self, query_vec, hits: List[Tuple[int, float]]) -> str:
+        """상위 문서의 문장 중 질의와 가장 가까운 문장으로 답변 (2단계 점수화)."""
+        sentences: List[str] = []
+        scores: List[float] = []
+        seen = set()
+        for idx, _ in hits:
+            doc_sentences, matrix = self._doc_sentences(idx)
+            if not doc_sentences:
+                continue
+            doc_scores = (matrix @ query_vec.T).toarray().ravel()
+            for sentence, score in zip(doc_sentences, doc_scores):
+                if sentence not in seen:
+                    seen.add(sentence)
+                    sentences.append(sentence)  # 문서 순위 → 문장 순서대로
+                    scores.append(float(score))
+        if not sentences:
+            return NO_ANSWER_TEXT
+        # 점수 내림차순, 같으면 상위 문서/앞 문장 우선 (겹치는 단어가 없으면 최상위 문서 첫 문장)
+        # 조사/어미 같은 흔한 단어만 겹친 문장이 붙지 않도록 최고 점수의 절반 이상만 포함
+        ranked = sorted(range(len(sentences)), key=lambda i: (-scores[i], i))
+        best = scores[ranked[0]]
+        picked = [i for i in ranked[: self.answer_sentences] if scores[i] > 0 and scores[i] >= 0.5 * best] or [0]
+        lines = "\n".join(f"- {sentences[i]}" for i in picked)
+        return f"다음 정보를 찾았습니다:\n{lines}"
+
+    def _doc_sentences(self, idx: int):
+        """문서의 (문장 목록, 문장 TF-IDF 행렬). 자주 나오는 문서는 다시 나누거나 벡터화하지 않도록 캐시."""
+        with self._sentence_lock:
+            cached = self._sentence_cache.get(idx)
+            if cached is not None:
+                self._sentence_cache.move_to_end(idx)
+                return cached
+        sentences = split_sentences(self.documents[idx])
+        entry = (sentences, self.vectorizer.transform(sentences) if sentences else None)
+        with self._sentence_lock:
+            self._sentence_cache[idx] = entry
+            while len(self._sentence_cache) > _SENTENCE_CACHE_SIZE:
+                self._sentence_cache.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def _format_answer(hits: List[Tuple[str, float]]) -> str:
         if not hits:
-            return "지식베이스에 관련 정보가 없습니다. 상담사 연결 또는 다른 요청을 시도해주세요."
+            return NO_ANSWER_TEXT
         snippets = []
         for doc, score in hits:
             # 너무 길면 앞부분만 발췌
@@ -59,10 +400,82 @@ class SimpleRAG:
         return f"다음 정보를 찾았습니다:\n{joined}\n\n질문에 대한 핵심 정보를 위에서 발췌했습니다. 추가 질문이 있다면 말씀해주세요."
 
 
-def run_rag_agent(state: Dict) -> Dict:
-    """RAG 에이전트 진입점. state['user_input']를 받아 답변 텍스트를 생성."""
+def rag_from_env(kb_dir: str = "data/kb") -> SimpleRAG:
+    """환경변수(RAG_MODE 등) 설정대로 SimpleRAG를 생성."""
+    return SimpleRAG(
+        kb_dir=kb_dir,
+        mode=os.getenv("RAG_MODE", "tfidf"),
+        lsa_dims=int(os.getenv("RAG_LSA_DIMS", "256")),
+        fusion=os.getenv("RAG_HYBRID_FUSION", "rrf"),
+        hybrid_weight=float(os.getenv("RAG_HYBRID_WEIGHT", "0.5")),
+        hybrid_candidates=int(os.getenv("RAG_HYBRID_CANDIDATES", "50")),
+        ann=os.getenv("RAG_ANN") or None,
+        ann_lists=int(os.getenv("RAG_ANN_LISTS", "0")),
+        ann_probe=int(os.getenv("RAG_ANN_PROBE", "8")),
+        precision=os.getenv("RAG_PRECISION", "float64"),
+        answer_mode=os.getenv("RAG_ANSWER_MODE", "extractive"),
+        answer_sentences=int(os.getenv("RAG_ANSWER_SENTENCES", "2")),
+        dedup_threshold=float(os.getenv("RAG_DEDUP_THRESHOLD", "0.9")),
+        ingest=os.getenv("RAG_INGEST", "memory"),
+        txt_split=os.getenv("RAG_TXT_SPLIT", "file"),
+        vectorizer=os.getenv("RAG_VECTORIZER", "tfidf"),
+        hash_features=int(os.getenv("RAG_HASH_FEATURES", str(2 ** 18))),
+        build_workers=int(os.getenv("RAG_BUILD_WORKERS", "0")),
+    )
+
+
+_shared_rag: Optional[SimpleRAG] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_rag() -> SimpleRAG:
+    """프로세스 공용 SimpleRAG (data/kb 기준, RAG_MODE 설정, 최초 호출 시 1회 생성)."""
+    global _shared_rag
+    if _shared_rag is None:
+        with _shared_lock:
+            if _shared_rag is None:
+                _shared_rag = rag_from_env()
+    return _shared_rag
+
+
+def rag_for_state(state: Dict) -> SimpleRAG:
+    """state['_rag_instance']가 있으면 그 인스턴스를, state['tenant']가 있으면 테넌트 KB(rag_tenants)를,
+    둘 다 없으면 프로세스 공용 인스턴스를 반환.
+    """
+    rag: Optional[SimpleRAG] = state.get("_rag_instance")
+    if rag is None and state.get("tenant"):
+        from src.agents.rag_tenants import get_tenant_registry
+
+        rag = get_tenant_registry().get(state["tenant"])
+    return rag or get_shared_rag()
+
+
+def rag_query(state: Dict) -> str:
+    """검색 질의. 세션의 후속 발화("그럼 기간은요?")는 직전 rag 질문을 앞에 붙여 검색."""
+    from src.router import is_follow_up, previous_turn
+
     user_input: str = state.get("user_input", "")
-    rag: SimpleRAG = state.setdefault("_rag_instance", SimpleRAG())
-    response_text = rag.answer(user_input)
+    if is_follow_up(state):
+        turn = previous_turn(state)
+        if turn.get("intent") == "rag":
+            return f"{turn['user']} {user_input}"
+    return user_input
+
+
+def run_rag_agent(state: Dict) -> Dict:
+    """RAG 에이전트 진입점. state['user_input']를 받아 답변 텍스트를 생성 (KB 선택은 rag_for_state)."""
+    response_text = rag_for_state(state).answer(rag_query(state))
     state["response"] = response_text
     return state
+
+
+def run_rag_agent_batch(states: Sequence[Dict]) -> List[Dict]:
+    """여러 state에 run_rag_agent를 적용. 같은 KB를 쓰는 질의는 answer_batch 한 번으로 검색 (배치 실행기용)."""
+    groups: Dict[int, Tuple[SimpleRAG, List[Dict]]] = {}
+    for state in states:
+        rag = rag_for_state(state)
+        groups.setdefault(id(rag), (rag, []))[1].append(state)
+    for rag, group in groups.values():
+        for state, text in zip(group, rag.answer_batch([rag_query(s) for s in group])):
+            state["response"] = text
+    return list(states)
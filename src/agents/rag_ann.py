@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import math
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.agents.rag_dense import top_k_rows
+from src.agents.rag_quant import QuantizedVectors
+
+
+# 밀집 벡터용 근사 최근접 이웃(ANN) 인덱스 (NumPy만 사용)
+# - IVF: k-means로 만든 중심점(coarse quantizer)별 역색인 리스트에 문서를 나눠 담고,
+#   질의와 가까운 n_probe개 리스트만 내적으로 점수화
+# - PQ(선택): 리스트 중심점과의 잔차(벡터 - 중심점)를 pq_m개 부분 공간으로 나눠 부분 공간별
+#   256개 중심점 코드(uint8)로 저장. 점수 = 질의·리스트 중심점 + 질의-코드 내적 표(LUT)의 합 (IVFADC)
+#   원본 벡터가 있으면 근사 점수 상위 후보만 정확히 재점수화
+# - 리스트는 문서를 리스트 순서로 재배열한 연속 배열 + 오프셋으로 보관 (슬라이스로 복사 없이 접근)
+# - 재배열한 벡터는 precision(float16/int8)으로 줄여 보관할 수 있음 (rag_quant.QuantizedVectors, 점수 계산 시 복원)
+#
+# 정확도/속도는 n_probe로 조절합니다 (scripts/bench_ann.py 참고).
+
+_ASSIGN_CHUNK = 65536
+
+
+def _assign(x: np.ndarray, centroids: np.ndarray, spherical: bool) -> np.ndarray:
+    """각 행에 가장 가까운 중심점 번호. spherical이면 내적, 아니면 유클리드 거리 기준."""
+    bias = None if spherical else 0.5 * np.einsum("ij,ij->i", centroids, centroids)
+    labels = np.empty(x.shape[0], dtype=np.int64)
+    for start in range(0, x.shape[0], _ASSIGN_CHUNK):
+        sims = x[start:start + _ASSIGN_CHUNK] @ centroids.T
+        if bias is not None:
+            sims -= bias  # argmin ||x - c||^2 == argmax (x·c - ||c||^2 / 2)
+        labels[start:start + _ASSIGN_CHUNK] = sims.argmax(axis=1)
+    return labels
+
+
+def kmeans(
+    x: np.ndarray,
+    k: int,
+    iters: int = 10,
+    seed: int = 0,
+    spherical: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Lloyd k-means. (중심점 (k, 차원), 각 행의 클러스터 번호)를 반환.
+
+    spherical=True 이면 중심점을 L2 정규화하고 내적으로 할당합니다 (정규화된 문서 벡터용).
+    빈 클러스터는 임의의 점으로 다시 초기화합니다.
+    """
+    rng = np.random.default_rng(seed)
+    n = x.shape[0]
+    k = min(k, n)
+    centroids = x[rng.choice(n, size=k, replace=False)].astype(np.float32, copy=True)
+    labels = np.zeros(n, dtype=np.int64)
+    for _ in range(iters):
+        labels = _assign(x, centroids, spherical)
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=k)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        nonempty = counts > 0
+        sums = np.add.reduceat(x[order], starts[nonempty], axis=0)
+        centroids[nonempty] = sums / counts[nonempty, None]
+        empty = np.flatnonzero(~nonempty)
+        if len(empty):
+            centroids[empty] = x[rng.choice(n, size=len(empty), replace=False)]
+        if spherical:
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids /= norms
+    return centroids, _assign(x, centroids, spherical)
+
+
+class ProductQuantizer:
+    """부분 공간별 256-중심점 코드북. 내적 근사(ADC)용."""
+
+    def __init__(self, codebooks: np.ndarray):
+        self.codebooks = np.ascontiguousarray(codebooks, dtype=np.float32)  # (m, 256, 부분 차원)
+
+    @property
+    def m(self) -> int:
+        return self.codebooks.shape[0]
+
+    @classmethod
+    def train(cls, x: np.ndarray, m: int, iters: int = 10, seed: int = 0) -> "ProductQuantizer":
+        dims = x.shape[1]
+        if dims % m:
+            raise ValueError(f"차원({dims})이 pq_m({m})으로 나누어떨어지지 않습니다.")
+        sub = dims // m
+        ksub = min(256, x.shape[0])
+        codebooks = np.zeros((m, 256, sub), dtype=np.float32)
+        for j in range(m):
+            centroids, _ = kmeans(x[:, j * sub:(j + 1) * sub], ksub, iters=iters, seed=seed + j)
+            codebooks[j, :ksub] = centroids
+        return cls(codebooks)
+
+    def encode(self, x: np.ndarray) -> np.ndarray:
+        sub = self.codebooks.shape[2]
+        codes = np.empty((x.shape[0], self.m), dtype=np.uint8)
+        for j in range(self.m):
+            codes[:, j] = _assign(x[:, j * sub:(j + 1) * sub], self.codebooks[j], spherical=False)
+        return codes
+
+    def lookup_table(self, query: np.ndarray) -> np.ndarray:
+        """질의 1건의 (m, 256) 부분 내적 표."""
+        sub = self.codebooks.shape[2]
+        return np.einsum("jks,js->jk", self.codebooks, query.reshape(self.m, sub))
+
+
+class IVFIndex:
+    """IVF(역색인 파일) ANN 인덱스. 입력 벡터는 L2 정규화돼 있다고 가정 (점수 = 내적)."""
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        order: np.ndarray,
+        offsets: np.ndarray,
+        vectors: Optional[Union[np.ndarray, QuantizedVectors]],
+        pq: Optional[ProductQuantizer] = None,
+        codes: Optional[np.ndarray] = None,
+        n_probe: int = 8,
+        rerank: int = 256,
+    ):
+        self.centroids = centroids  # (리스트 수, 차원)
+        self.order = order  # 재배열된 위치 → 원래 문서 번호
+        self.offsets = offsets  # 리스트 l의 범위: offsets[l]:offsets[l + 1]
+        self.vectors = vectors  # 리스트 순서로 재배열된 벡터 (float32 또는 QuantizedVectors, PQ만 쓸 때는 None)
+        self.pq = pq
+        self.codes = codes  # 리스트 순서로 재배열된 PQ 코드
+        self.n_probe = n_probe
+        self.rerank = rerank
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        n_lists: int = 0,
+        n_probe: int = 8,
+        pq_m: int = 0,
+        keep_vectors: bool = True,
+        rerank: int = 256,
+        train_size: int = 65536,
+        seed: int = 0,
+        precision: str = "float32",
+    ) -> "IVFIndex":
+        """n_lists=0 이면 4 * sqrt(문서 수)개 리스트. pq_m > 0 이면 PQ 코드도 생성.
+        precision: 보관할 재배열 벡터의 정밀도 (float64/float32는 float32 그대로).
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        n = vectors.shape[0]
+        n_lists = min(n_lists or max(1, int(4 * math.sqrt(n))), n)
+        rng = np.random.default_rng(seed)
+        train = vectors if n <= train_size else vectors[rng.choice(n, size=train_size, replace=False)]
+        centroids, train_labels = kmeans(train, n_lists, seed=seed, spherical=True)
+        labels = _assign(vectors, centroids, spherical=True)
+        order = np.argsort(labels, kind="stable")
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(labels, minlength=n_lists)))).astype(np.int64)
+        sorted_vectors = vectors[order]
+        pq = codes = None
+        if pq_m:
+            pq = ProductQuantizer.train(train - centroids[train_labels], pq_m, seed=seed)
+            codes = pq.encode(sorted_vectors - centroids[labels[order]])
+        index = cls(
+            centroids,
+            order,
+            offsets,
+            sorted_vectors if keep_vectors or pq is None else None,
+            pq=pq,
+            codes=codes,
+            n_probe=n_probe,
+            rerank=rerank,
+        )
+        index.quantize(precision)
+        return index
+
+    def quantize(self, precision: str) -> None:
+        """재배열 벡터를 지정한 정밀도로 저장 (float32는 그대로, 이미 줄였으면 무시)."""
+        if precision in ("float64", "float32") or not isinstance(self.vectors, np.ndarray):
+            return
+        self.vectors = QuantizedVectors(self.vectors, precision)
+
+    def _rows(self, idx) -> np.ndarray:
+        """재배열 벡터 일부를 float32로."""
+        if isinstance(self.vectors, QuantizedVectors):
+            return self.vectors.rows(idx)
+        return self.vectors[idx]
+
+    @property
+    def n_lists(self) -> int:
+        return self.centroids.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        total = self.centroids.nbytes + self.order.nbytes + self.offsets.nbytes
+        for arr in (self.vectors, self.codes):
+            if arr is not None:
+                total += arr.nbytes
+        if self.pq is not None:
+            total += self.pq.codebooks.nbytes
+        return total
+
+    def search(self, queries: np.ndarray, top_k: int, n_probe: Optional[int] = None) -> List[List[Tuple[int, float]]]:
+        """정규화된 질의 벡터 (질의 수, 차원)에 대해 행별 상위 top_k (문서 번호, 점수)."""
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        probes = top_k_rows(queries @ self.centroids.T, n_probe)
+        results = []
+        for query, lists in zip(queries, probes):
+            # lists: [(리스트 번호, 질의·중심점)]
+            ranges = [(self.offsets[l], self.offsets[l + 1]) for l, _ in lists]
+            positions = np.concatenate([np.arange(a, b) for a, b in ranges]) if ranges else np.empty(0, np.int64)
+            if self.pq is not None:
+                table = self.pq.lookup_table(query)
+                cols = np.arange(self.pq.m)
+                scores = np.concatenate([
+                    base + table[cols, self.codes[a:b]].sum(axis=1)
+                    for (a, b), (_, base) in zip(ranges, lists)
+                ])
+                if self.vectors is not None and len(positions):
+                    # 근사 점수 상위 후보만 원본 벡터로 정확히 재점수화
+                    keep = min(max(self.rerank, top_k), len(positions))
+                    top = np.argpartition(-scores, keep - 1)[:keep]
+                    positions = positions[top]
+                    scores = self._rows(positions) @ query
+            else:
+                scores = np.concatenate([self._rows(slice(a, b)) @ query for a, b in ranges])
+            k = min(top_k, len(positions))
+            if k == 0:
+                results.append([])
+                continue
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            results.append([(int(self.order[positions[i]]), float(scores[i])) for i in top])
+        return results
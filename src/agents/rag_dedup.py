@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import re
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Set, Tuple
+
+import numpy as np
+
+
+# KB 적재 시 거의 같은 문서(near-duplicate) 탐지
+# - 문서를 정규화(소문자, 문자 그대로의 "\n" 포함 공백 통일)한 뒤 글자 n-gram(shingle) 집합으로 표현
+# - MinHash 서명(num_perm개) + LSH 밴딩으로 후보 쌍만 추리고, 서명 일치율(추정 Jaccard)이
+#   threshold - 0.1 이상인 후보만 실제 Jaccard 유사도로 확인
+#   (전체 쌍 비교 O(n^2) 없이 문서 수에 거의 선형)
+# - threshold 이상인 쌍을 union-find로 묶어 그룹을 만들고, 그룹의 첫 문서(입력 순서)를 대표로 사용
+# - 메모리: 문서를 묶음(_DOC_CHUNK개) 단위로 읽어 서명만 남기고 shingle 집합은 버림.
+#   Jaccard 확인은 후보 쌍의 문서만 다시 읽어 계산 (texts가 rag_ingest.DocStore면 mmap에서 다시 읽음)
+#   → 코퍼스 전체의 shingle 집합을 동시에 들고 있지 않음 (서명 = 문서 수 x num_perm x 4바이트)
+# - LSH 후보 쌍은 밴드별로 만들어 바로 서명 일치율로 거르고, 통과한 쌍만 모음
+#   (비슷한 틀의 문서가 많으면 후보 쌍이 문서 수보다 훨씬 많아지므로 전체 후보를 쌓아 두지 않음)
+#
+# LSH 통과 확률은 유사도 s에 대해 1 - (1 - s^rows)^bands 이며,
+# 기본값(64 = 16 밴드 x 4행)은 s=0.8에서 약 0.999, s=0.5에서 약 0.64입니다 (후보는 다시 검증).
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_SIGNATURE_CHUNK = 1 << 13  # 한 번에 해시하는 shingle 수 (메모리 = 이 값 x num_perm x 8바이트)
+_DOC_CHUNK = 256  # 서명을 계산할 때 한 번에 shingle 집합을 만드는 문서 수
+_PAIR_CHUNK = 8192  # 서명 일치율을 한 번에 계산하는 후보 쌍 수
+_SET_CACHE = 256  # Jaccard 확인 시 다시 만든 shingle 집합을 보관할 문서 수
+_WS = re.compile(r"(?:\\n|\s)+")
+
+
+def normalize(text: str) -> str:
+    return _WS.sub(" ", text).strip().lower()
+
+
+def shingles(text: str, size: int = 5) -> Set[int]:
+    """정규화한 텍스트의 글자 size-gram 해시 집합 (짧은 문서는 전체를 하나로)."""
+    norm = normalize(text)
+    if len(norm) <= size:
+        return {zlib.crc32(norm.encode("utf-8"))} if norm else set()
+    return {zlib.crc32(norm[i:i + size].encode("utf-8")) for i in range(len(norm) - size + 1)}
+
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """(a * x + b) mod p 해시 num_perm개로 MinHash 서명을 계산."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    @property
+    def num_perm(self) -> int:
+        return len(self.a)
+
+    def signature(self, shingle_set: Set[int]) -> np.ndarray:
+        return self.signatures([shingle_set])[0]
+
+    def signatures(self, shingle_sets: Sequence[Set[int]]) -> np.ndarray:
+        """(문서 수, num_perm) 서명 행렬. 여러 문서의 shingle을 이어 붙여 청크 단위로 한꺼번에 해시."""
+        out = np.full((len(shingle_sets), self.num_perm), _MERSENNE_PRIME, dtype=np.uint64)
+        start = 0
+        while start < len(shingle_sets):
+            stop, total = start, 0
+            while stop < len(shingle_sets) and (stop == start or total + len(shingle_sets[stop]) <= _SIGNATURE_CHUNK):
+                total += len(shingle_sets[stop])
+                stop += 1
+            chunk = [s for s in shingle_sets[start:stop]]
+            lengths = np.array([len(s) for s in chunk])
+            if total:
+                x = np.fromiter((h for s in chunk for h in s), dtype=np.uint64, count=total) % _MERSENNE_PRIME
+                # x, a < 2^31 이므로 a * x + b 는 uint64 범위 안
+                hashed = np.outer(x, self.a)
+                hashed += self.b  # 제자리 연산으로 임시 배열을 하나만 사용
+                hashed %= _MERSENNE_PRIME
+                nonempty = lengths > 0
+                offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))[nonempty]
+                out[start + np.flatnonzero(nonempty)] = np.minimum.reduceat(hashed, offsets, axis=0)
+            start = stop
+        return out
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> None:
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            # 입력 순서가 빠른 문서가 대표가 되도록
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+def find_near_duplicates(
+    texts: Sequence[str],
+    threshold: float = 0.9,
+    num_perm: int = 64,
+    bands: int = 16,
+    shingle_size: int = 5,
+) -> Tuple[List[List[int]], List[Tuple[int, int, float]]]:
+    """(그룹 목록, 확인된 유사 쌍 목록)을 반환.
+
+    그룹은 입력 순서대로 정렬된 문서 번호 목록이며 첫 번호가 대표입니다 (중복이 없는 문서도 단독 그룹).
+    유사 쌍은 (i, j, Jaccard 유사도), i < j.
+    """
+    if num_perm % bands:
+        raise ValueError(f"num_perm({num_perm})이 bands({bands})로 나누어떨어지지 않습니다.")
+    rows = num_perm // bands
+    hasher = MinHasher(num_perm)
+    # 서명 값은 p = 2^31 - 1 미만이라 uint32로 보관
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+    chunk: List[Set[int]] = []
+    filled = 0
+    for text in texts:
+        chunk.append(shingles(text, shingle_size))
+        if len(chunk) >= _DOC_CHUNK:
+            signatures[filled:filled + len(chunk)] = hasher.signatures(chunk)
+            filled += len(chunk)
+            chunk = []
+    if chunk:
+        signatures[filled:filled + len(chunk)] = hasher.signatures(chunk)
+    del chunk
+
+    candidates: Set[Tuple[int, int]] = set()  # 서명 일치율을 통과한 후보 쌍
+    left: List[np.ndarray] = []
+    right: List[np.ndarray] = []
+    pending = 0
+
+    def check_pairs() -> None:
+        if not left:
+            return
+        i, j = np.concatenate(left), np.concatenate(right)
+        left.clear()
+        right.clear()
+        for start in range(0, len(i), _PAIR_CHUNK):
+            a, b = i[start:start + _PAIR_CHUNK], j[start:start + _PAIR_CHUNK]
+            passed = (signatures[a] == signatures[b]).mean(axis=1) >= threshold - 0.1
+            if passed.any():
+                candidates.update(zip(a[passed].tolist(), b[passed].tolist()))
+
+    for band in range(bands):
+        keys = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows]).view(f"V{rows * 4}").ravel()
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        bounds = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+        sizes = np.diff(np.concatenate(([0], bounds, [len(order)])))
+        for start, size in zip(np.concatenate(([0], bounds))[sizes > 1].tolist(), sizes[sizes > 1].tolist()):
+            members = order[start:start + size]  # 버킷 안에서는 입력 순서 (안정 정렬)
+            if size * (size - 1) // 2 <= _PAIR_CHUNK:
+                x, y = np.triu_indices(size, 1)
+                rows_of_pairs = [(members[x], members[y])]
+            else:
+                # 큰 버킷(같은 틀의 문서가 많음)은 한 행씩 만들어 쌍 배열이 버킷 크기^2로 커지지 않게
+                rows_of_pairs = ((members[k:k + 1].repeat(size - k - 1), members[k + 1:]) for k in range(size - 1))
+            for a, b in rows_of_pairs:
+                left.append(a)
+                right.append(b)
+                pending += len(a)
+                if pending >= _PAIR_CHUNK:
+                    check_pairs()
+                    pending = 0
+    check_pairs()
+
+    uf = _UnionFind(len(texts))
+    pairs = []
+    if not candidates:
+        return [[i] for i in range(len(texts))], pairs
+    cache: "OrderedDict[int, Set[int]]" = OrderedDict()
+
+    def shingle_set(i: int) -> Set[int]:
+        s = cache.get(i)
+        if s is None:
+            s = cache[i] = shingles(texts[i], shingle_size)
+            if len(cache) > _SET_CACHE:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(i)
+        return s
+
+    for i, j in sorted(candidates):
+        sim = jaccard(shingle_set(i), shingle_set(j))
+        if sim >= threshold:
+            pairs.append((i, j, sim))
+            uf.union(i, j)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(texts)):
+        groups.setdefault(uf.find(i), []).append(i)
+    return sorted(groups.values(), key=lambda g: g[0]), pairs
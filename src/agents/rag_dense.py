@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+# LSA(잠재 의미) 밀집 인덱스
+# - 이미 학습된 TF-IDF 행렬에 Truncated SVD를 적용해 문서를 수백 차원의 float32 벡터로 압축
+# - 문서 벡터는 L2 정규화된 연속(C-order) 배열로 보관하고 검색은 정규화 내적(=코사인)으로 수행
+# - 메모리: 문서 수 x 차원 x 4바이트 + 어휘 수 x 차원 x 4바이트(질의 투영용)
+#
+# 작은 코퍼스(문서 수가 차원보다 적음)에서는 차원을 문서 수 - 1 로 줄이며,
+# 2차원 미만이면 의미 있는 잠재 공간이 만들어지지 않으므로 build()가 None을 반환합니다.
+#
+# quantize()로 문서 벡터를 float16/int8로 줄일 수 있습니다 (rag_quant.QuantizedVectors, 질의 투영 행렬은 float32 유지).
+# 문서가 많으면 enable_ann()으로 IVF(+PQ) 근사 검색(rag_ann.IVFIndex)을 켤 수 있습니다.
+# IVF가 보관하는 재배열 벡터도 같은 정밀도로 저장합니다 (enable_ann 후 quantize 해도, 그 반대여도 같음).
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+    """(질의 수 x 문서 수) 점수 행렬에서 행별 상위 k개 (인덱스, 점수)를 내림차순으로 반환."""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return [[] for _ in range(scores.shape[0])]
+    if k < scores.shape[1]:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        part = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+    results = []
+    for row, cand in zip(scores, part):
+        order = cand[np.argsort(-row[cand], kind="stable")]
+        results.append([(int(i), float(row[i])) for i in order])
+    return results
+
+
+def _normalize_rows(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return x / norms
+
+
+class LSAIndex:
+    """TF-IDF 행렬 위의 LSA 인덱스."""
+
+    def __init__(self, components: np.ndarray, doc_vectors: np.ndarray):
+        self.components = np.ascontiguousarray(components, dtype=np.float32)  # (dims, 어휘 수)
+        self.doc_vectors = np.ascontiguousarray(doc_vectors, dtype=np.float32)  # (문서 수, dims)
+        self.quantized = None  # rag_quant.QuantizedVectors (quantize 후에는 doc_vectors 대신 사용)
+        self.ann = None  # rag_ann.IVFIndex (enable_ann)
+
+    @classmethod
+    def build(cls, doc_matrix, dims: int = 256, seed: int = 0) -> Optional["LSAIndex"]:
+        from sklearn.decomposition import TruncatedSVD
+
+        n_docs, n_terms = doc_matrix.shape
+        k = min(dims, n_docs - 1, n_terms - 1)
+        if k < 2:
+            return None
+        svd = TruncatedSVD(n_components=k, algorithm="randomized", random_state=seed)
+        doc_vectors = svd.fit_transform(doc_matrix)
+        return cls(svd.components_, _normalize_rows(doc_vectors))
+
+    @property
+    def dims(self) -> int:
+        return self.components.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        docs = self.quantized if self.quantized is not None else self.doc_vectors
+        total = self.components.nbytes + docs.nbytes
+        return total + (self.ann.nbytes if self.ann is not None else 0)
+
+    def enable_ann(self, kind: str = "ivf", n_lists: int = 0, n_probe: int = 8, pq_m: int = 16) -> None:
+        """근사 검색 사용. kind: "ivf" | "ivfpq" (PQ 근사 점수 후 상위 후보만 정확히 재점수화)."""
+        from src.agents.rag_ann import IVFIndex
+
+        if kind not in ("ivf", "ivfpq"):
+            raise ValueError(f"지원하지 않는 ANN 종류: {kind} (가능: ivf, ivfpq)")
+        if kind == "ivfpq" and self.dims % pq_m:
+            # 차원이 나누어떨어지지 않으면 IVF만 사용
+            pq_m = 0
+        self.ann = IVFIndex.build(
+            self.doc_rows(slice(None)),
+            n_lists=n_lists,
+            n_probe=n_probe,
+            pq_m=pq_m if kind == "ivfpq" else 0,
+            precision=self.quantized.precision if self.quantized is not None else "float32",
+        )
+
+    def embed(self, query_matrix) -> np.ndarray:
+        """TF-IDF 질의 행렬(sparse)을 정규화된 LSA 벡터로 투영."""
+        projected = np.asarray(query_matrix @ self.components.T, dtype=np.float32)
+        return _normalize_rows(projected)
+
+    def quantize(self, precision: str) -> None:
+        """문서 벡터(와 ANN 인덱스의 재배열 벡터)를 지정한 정밀도로 저장 (float32는 그대로)."""
+        if precision in ("float64", "float32"):
+            return
+        if self.ann is not None:
+            self.ann.quantize(precision)
+        if self.quantized is not None:
+            return
+        from src.agents.rag_quant import QuantizedVectors
+
+        self.quantized = QuantizedVectors(self.doc_vectors, precision)
+        self.doc_vectors = None
+
+    def doc_rows(self, idx) -> np.ndarray:
+        """문서 벡터 일부를 float32로."""
+        if self.quantized is not None:
+            return self.quantized.rows(idx)
+        return self.doc_vectors[idx]
+
+    def doc_scores(self, query_dense: np.ndarray) -> np.ndarray:
+        """정규화된 질의 벡터 (질의 수, dims)와 전체 문서의 내적."""
+        if self.quantized is not None:
+            return self.quantized.dot(query_dense)
+        return query_dense @ self.doc_vectors.T
+
+    def scores(self, query_matrix) -> np.ndarray:
+        return self.doc_scores(self.embed(query_matrix))
+
+    def search(self, query_matrix, top_k: int) -> List[List[Tuple[int, float]]]:
+        if self.ann is not None:
+            return self.ann.search(self.embed(query_matrix), top_k)
+        return top_k_rows(self.scores(query_matrix), top_k)
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.agents.rag_dense import LSAIndex
+
+
+# 희소(TF-IDF) + 밀집(LSA) 하이브리드 검색
+# - 두 엔진에서 각각 후보를 뽑고, 후보 합집합만 양쪽 점수로 다시 계산한 뒤 융합
+#   - 희소 후보: 질의와 단어가 겹치는 문서만 점수가 생기도록 미리 전치해 둔 행렬과 희소 곱
+#     (TfidfVectorizer 출력은 행별 L2 정규화돼 있어 내적 = 코사인)
+#     저정밀도 저장(rag_quant.TermPostings)을 넘기면 행렬 대신 역색인 포스팅으로 계산
+#   - 밀집 후보: LSAIndex 정규화 내적 상위 후보 (ANN이 켜져 있으면 IVF 검색 결과)
+# - 융합 방식
+#   - "rrf": 엔진별 순위의 역수 합 1/(rrf_k + rank) (점수 척도 차이에 강함)
+#     점수가 0 이하인 문서(희소: 질의와 겹치는 단어 없음)는 그 엔진의 순위에 넣지 않음
+#   - "weighted": alpha * 밀집 점수 + (1 - alpha) * 희소 점수
+
+FUSIONS = ("rrf", "weighted")
+
+
+class HybridSearcher:
+    def __init__(
+        self,
+        doc_matrix,
+        dense: LSAIndex,
+        fusion: str = "rrf",
+        alpha: float = 0.5,
+        candidates: int = 50,
+        rrf_k: int = 60,
+        postings=None,
+    ):
+        if fusion not in FUSIONS:
+            raise ValueError(f"지원하지 않는 융합 방식: {fusion} (가능: {', '.join(FUSIONS)})")
+        self.postings = postings
+        self.doc_matrix_t = None if postings is not None else doc_matrix.T.tocsr()  # (어휘 수, 문서 수)
+        self.dense = dense
+        self.fusion = fusion
+        self.alpha = alpha
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+
+    def search(self, query_vecs, top_k: int) -> List[List[Tuple[int, float]]]:
+        n_cand = max(self.candidates, top_k)
+        if self.postings is not None:
+            sparse_rows = self.postings.touched(query_vecs)
+        else:
+            sparse_scores = (query_vecs @ self.doc_matrix_t).tocsr()  # (질의 수, 문서 수), 겹치는 문서만 값 존재
+            sparse_rows = [(row.indices, row.data) for row in (sparse_scores.getrow(i) for i in range(query_vecs.shape[0]))]
+        query_dense = self.dense.embed(query_vecs)
+        if self.dense.ann is not None:
+            dense_hits = self.dense.ann.search(query_dense, n_cand)
+        else:
+            dense_hits = None
+            dense_scores = self.dense.doc_scores(query_dense)
+        results = []
+        for i in range(query_vecs.shape[0]):
+            row_docs, row_scores = sparse_rows[i]
+            sparse_map: Dict[int, float] = dict(zip(row_docs.tolist(), row_scores.tolist()))
+            if len(sparse_map) > n_cand:
+                cand_sparse = row_docs[np.argpartition(-row_scores, n_cand - 1)[:n_cand]]
+            else:
+                cand_sparse = row_docs
+            if dense_hits is not None:
+                cand_dense = np.array([idx for idx, _ in dense_hits[i]], dtype=np.int64)
+            elif dense_scores.shape[1] > n_cand:
+                cand_dense = np.argpartition(-dense_scores[i], n_cand - 1)[:n_cand]
+            else:
+                cand_dense = np.arange(dense_scores.shape[1])
+
+            # 후보 합집합만 양쪽 점수로 재계산
+            union = np.union1d(cand_sparse, cand_dense)
+            s = np.array([sparse_map.get(int(j), 0.0) for j in union], dtype=np.float32)
+            d = self.dense.doc_rows(union) @ query_dense[i]
+            fused = self._fuse(s, d)
+            order = np.argsort(-fused, kind="stable")[:top_k]
+            results.append([(int(union[j]), float(fused[j])) for j in order])
+        return results
+
+    def _fuse(self, sparse: np.ndarray, dense: np.ndarray) -> np.ndarray:
+        if self.fusion == "weighted":
+            return self.alpha * dense + (1 - self.alpha) * sparse
+        return _rrf(sparse, self.rrf_k) + _rrf(dense, self.rrf_k)
+
+
+def _rrf(scores: np.ndarray, k: int) -> np.ndarray:
+    """점수 내림차순 순위(1부터)에 대한 1/(k + rank). 점수가 0 이하인 문서는 순위 없이 0."""
+    order = np.argsort(-scores, kind="stable")
+    order = order[scores[order] > 0]
+    fused = np.zeros(len(scores), dtype=np.float32)
+    fused[order] = 1.0 / (k + np.arange(1, len(order) + 1, dtype=np.float32))
+    return fused
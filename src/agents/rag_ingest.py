@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import mmap
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# 대용량 KB 스트리밍 적재
+# - 파일을 줄 단위로 읽으며 문서 경계의 (파일 번호, 바이트 오프셋, 길이)만 기록하고 원문은 보관하지 않음
+#   - .txt   파일 1개 = 문서 1개 (memory 적재와 같음). txt_split="paragraph"면 빈 줄로 구분된 문단 1개 = 문서 1개
+#   - .jsonl 줄 1개 = 문서 1개 ("text" 필드, 없으면 "question" + "answer", 없으면 문자열 값 전체)
+#   - .csv   행 1개 = 문서 1개 (헤더 기준, 필드 선택은 jsonl과 같음. 따옴표 안 줄바꿈 지원)
+# - 문서 텍스트는 필요할 때 mmap으로 해당 구간만 읽어 디코딩 (DocStore는 문자열 시퀀스처럼 동작)
+# - HashingTfidfVectorizer: 어휘 사전 없이 해시로 단어를 열에 대응시키고 청크 단위로 벡터화
+#   (어휘 사전 메모리가 없고 문서를 한 번만 읽음, 해시 충돌로 점수가 약간 달라질 수 있음)
+#   idf 등 n_features 크기 배열을 여러 개 두므로 n_features가 크면 오히려 최대 메모리가 늘어남
+#   (기본 2^18이면 tfidf와 비슷, scripts/bench_ingest.py 참고)
+
+STREAM_SUFFIXES = (".txt", ".jsonl", ".csv")
+TXT_SPLITS = ("file", "paragraph")
+
+_TEXT_FIELDS = ("question", "answer")
+
+
+def record_text(row: Dict) -> str:
+    """jsonl/csv 레코드 → 문서 텍스트."""
+    if isinstance(row.get("text"), str):
+        return row["text"]
+    fields = [row[k] for k in _TEXT_FIELDS if isinstance(row.get(k), str)]
+    if not fields:
+        fields = [v for v in row.values() if isinstance(v, str)]
+    return "\n".join(f for f in fields if f.strip())
+
+
+def _scan_txt(f, paragraphs: bool = False) -> Iterator[Tuple[int, int]]:
+    """공백 줄을 뺀 문서 구간. paragraphs=False면 파일 전체가 한 구간, True면 빈 줄마다 나눔."""
+    start = end = None
+    offset = 0
+    for line in f:
+        if line.strip():
+            if start is None:
+                start = offset
+            end = offset + len(line)
+        elif paragraphs and start is not None:
+            yield start, end - start
+            start = None
+        offset += len(line)
+    if start is not None:
+        yield start, end - start
+
+
+def _scan_jsonl(f) -> Iterator[Tuple[int, int]]:
+    offset = 0
+    for line in f:
+        if line.strip():
+            row = json.loads(line)
+            if isinstance(row, dict) and record_text(row).strip():
+                yield offset, len(line)
+        offset += len(line)
+
+
+def _csv_records(f) -> Iterator[Tuple[int, bytes]]:
+    """(오프셋, 레코드 바이트). 따옴표가 닫히지 않은 줄은 다음 줄과 합쳐 레코드 1개로."""
+    offset = 0
+    start, parts = 0, []
+    for line in f:
+        if not parts:
+            start = offset
+        parts.append(line)
+        offset += len(line)
+        if sum(p.count(b'"') for p in parts) % 2 == 0:
+            yield start, b"".join(parts)
+            parts = []
+    if parts:
+        yield start, b"".join(parts)
+
+
+def _parse_csv(record: bytes, header: List[str]) -> Dict[str, str]:
+    values = next(csv.reader(io.StringIO(record.decode("utf-8", errors="ignore"))), [])
+    return dict(zip(header, values))
+
+
+class DocStore(Sequence[str]):
+    """오프셋만 보관하는 문서 시퀀스. store[i]는 원본 파일에서 mmap으로 읽어 디코딩."""
+
+    def __init__(
+        self,
+        sources: List[Path],
+        source_idx: np.ndarray,
+        offsets: np.ndarray,
+        lengths: np.ndarray,
+        headers: Optional[Dict[int, List[str]]] = None,
+    ):
+        self.sources = sources
+        self.source_idx = source_idx  # int32, 문서 → 파일 번호
+        self.offsets = offsets  # int64, 파일 안 시작 바이트
+        self.lengths = lengths  # int64, 바이트 길이
+        self.headers = headers or {}  # csv 파일 번호 → 헤더
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._files: Dict[int, object] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def scan(cls, paths: Iterable[Path], txt_split: str = "file") -> "DocStore":
+        """파일을 스트리밍으로 훑어 문서 경계만 기록 (원문은 메모리에 남기지 않음).
+        txt_split: .txt 문서 단위 "file"(파일 1개 = 문서 1개) | "paragraph"(빈 줄로 구분한 문단).
+        """
+        if txt_split not in TXT_SPLITS:
+            raise ValueError(f"지원하지 않는 txt 분할 방식: {txt_split} (가능: {', '.join(TXT_SPLITS)})")
+        sources: List[Path] = []
+        source_idx, offsets, lengths = array("i"), array("q"), array("q")
+        headers: Dict[int, List[str]] = {}
+        for path in paths:
+            if path.suffix not in STREAM_SUFFIXES or path.stat().st_size == 0:
+                continue
+            idx = len(sources)
+            sources.append(path)
+            with open(path, "rb") as f:
+                if path.suffix == ".txt":
+                    spans: Iterable[Tuple[int, int]] = _scan_txt(f, paragraphs=txt_split == "paragraph")
+                elif path.suffix == ".jsonl":
+                    spans = _scan_jsonl(f)
+                else:
+                    spans = cls._scan_csv(f, idx, headers)
+                for start, length in spans:
+                    source_idx.append(idx)
+                    offsets.append(start)
+                    lengths.append(length)
+        return cls(
+            sources,
+            np.frombuffer(source_idx, dtype=np.int32).copy(),
+            np.frombuffer(offsets, dtype=np.int64).copy(),
+            np.frombuffer(lengths, dtype=np.int64).copy(),
+            headers,
+        )
+
+    @staticmethod
+    def _scan_csv(f, idx: int, headers: Dict[int, List[str]]) -> Iterator[Tuple[int, int]]:
+        header = None
+        for start, record in _csv_records(f):
+            if not record.strip():
+                continue
+            if header is None:
+                header = next(csv.reader(io.StringIO(record.decode("utf-8-sig", errors="ignore"))), [])
+                headers[idx] = header
+                continue
+            if record_text(_parse_csv(record, header)).strip():
+                yield start, len(record)
+
+    @classmethod
+    def concat(cls, stores: Sequence["DocStore"]) -> "DocStore":
+        """여러 DocStore를 순서대로 이어 붙임 (병렬 적재에서 파일 묶음별 결과를 합칠 때)."""
+        sources: List[Path] = []
+        headers: Dict[int, List[str]] = {}
+        for store in stores:
+            headers.update({len(sources) + k: v for k, v in store.headers.items()})
+            sources.extend(store.sources)
+        base = np.cumsum([0] + [len(s.sources) for s in stores[:-1]])
+        return cls(
+            sources,
+            np.concatenate([s.source_idx + b for s, b in zip(stores, base)] or [np.empty(0, np.int32)]).astype(np.int32),
+            np.concatenate([s.offsets for s in stores] or [np.empty(0, np.int64)]),
+            np.concatenate([s.lengths for s in stores] or [np.empty(0, np.int64)]),
+            headers,
+        )
+
+    def select(self, indices: Sequence[int]) -> "DocStore":
+        """일부 문서만 남긴 DocStore (같은 원본 파일 사용)."""
+        idx = np.asarray(indices, dtype=np.int64)
+        return DocStore(self.sources, self.source_idx[idx], self.offsets[idx], self.lengths[idx], self.headers)
+
+    @property
+    def nbytes(self) -> int:
+        return self.source_idx.nbytes + self.offsets.nbytes + self.lengths.nbytes
+
+    def path(self, i: int) -> Path:
+        return self.sources[self.source_idx[i]]
+
+    def _map(self, source: int) -> mmap.mmap:
+        m = self._maps.get(source)
+        if m is None:
+            with self._lock:
+                m = self._maps.get(source)
+                if m is None:
+                    f = open(self.sources[source], "rb")
+                    m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    self._files[source] = f
+                    self._maps[source] = m
+        return m
+
+    def _text(self, i: int) -> str:
+        source = int(self.source_idx[i])
+        start = int(self.offsets[i])
+        raw = self._map(source)[start:start + int(self.lengths[i])]
+        suffix = self.sources[source].suffix
+        if suffix == ".jsonl":
+            return record_text(json.loads(raw)).strip()
+        if suffix == ".csv":
+            return record_text(_parse_csv(raw, self.headers[source])).strip()
+        return raw.decode("utf-8", errors="ignore").strip()
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._text(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._text(i)
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self._text(i)
+
+    def __getstate__(self) -> Dict:
+        # mmap/파일 핸들/잠금은 프로세스마다 새로 연다 (병렬 적재 워커에서 돌려받을 때)
+        state = self.__dict__.copy()
+        for key in ("_maps", "_files", "_lock"):
+            del state[key]
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._maps, self._files = {}, {}
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            for m in self._maps.values():
+                m.close()
+            for f in self._files.values():
+                f.close()
+            self._maps.clear()
+            self._files.clear()
+
+
+class HashingTfidfVectorizer:
+    """HashingVectorizer + TfidfTransformer. TfidfVectorizer처럼 fit_transform/transform을 제공."""
+
+    def __init__(self, n_features: int = 2 ** 18, chunk_size: int = 4096):
+        from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+
+        self.hasher = HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None)
+        self.tfidf = TfidfTransformer()
+        self.chunk_size = chunk_size
+
+    def count(self, documents: Iterable[str]):
+        """문서 → 해시 열 기준 단어 빈도 행렬 (청크 단위, 학습할 상태가 없어 문서 묶음별로 따로 계산 가능).
+
+        청크 행렬을 모았다가 합치지 않고 버퍼에 바로 이어 붙여, 최대 메모리가 결과 행렬 크기를 크게 넘지 않음.
+        """
+        import scipy.sparse as sp
+
+        data, indices, indptr = array("d"), array("i"), array("q", [0])
+
+        def append(batch: List[str]) -> None:
+            chunk = self.hasher.transform(batch)
+            data.frombytes(chunk.data.astype(np.float64, copy=False).tobytes())
+            indices.frombytes(chunk.indices.astype(np.int32, copy=False).tobytes())
+            indptr.frombytes((chunk.indptr[1:] + indptr[-1]).astype(np.int64).tobytes())
+
+        batch: List[str] = []
+        for doc in documents:
+            batch.append(doc)
+            if len(batch) >= self.chunk_size:
+                append(batch)
+                batch = []
+        if batch:
+            append(batch)
+        return sp.csr_matrix(
+            (np.frombuffer(data, dtype=np.float64), np.frombuffer(indices, dtype=np.int32), np.frombuffer(indptr, dtype=np.int64)),
+            shape=(len(indptr) - 1, self.hasher.n_features),
+        )
+
+    def fit_transform(self, documents: Iterable[str]):
+        return self.fit_counts(self.count(documents))
+
+    def fit_counts(self, counts):
+        """단어 빈도 행렬로 idf를 학습하고 TF-IDF 행렬을 반환 (counts를 그 자리에서 바꿔 복사본을 만들지 않음)."""
+        matrix = self.tfidf.fit(counts).transform(counts, copy=False)
+        # KB에 없는 단어(열)는 질의에서도 무시 (TfidfVectorizer가 어휘 밖 단어를 버리는 것과 같게)
+        idf = self.tfidf.idf_.copy()
+        idf[np.bincount(counts.indices, minlength=counts.shape[1]) == 0] = 0.0
+        self.tfidf.idf_ = idf
+        return matrix
+
+    def transform(self, texts: Iterable[str]):
+        return self.tfidf.transform(self.hasher.transform(texts))
+
+
+class DocPaths(Sequence[Path]):
+    """DocStore 문서별 원본 파일 경로 (SimpleRAG.doc_paths와 같은 용도, 목록을 만들지 않음)."""
+
+    def __init__(self, store: DocStore):
+        self.store = store
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.store.path(j) for j in range(*i.indices(len(self)))]
+        return self.store.path(i)
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import multiprocessing
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.agents.rag_agent import read_kb_texts
+from src.agents.rag_ingest import DocPaths, DocStore, HashingTfidfVectorizer
+
+
+# KB 인덱스 병렬 적재
+# - 파일명 순으로 정렬된 KB 파일을 바이트 크기가 비슷한 연속 구간(샤드)으로 나눠 프로세스 풀에 분배
+# - 워커는 샤드의 파일 읽기/디코딩(ingest=memory면 원문, stream이면 DocStore 오프셋)과
+#   토큰화/단어 빈도 집계(벡터라이저의 build_analyzer, hashing이면 HashingVectorizer)를 맡음
+# - 부모 프로세스는 샤드별 어휘를 정렬된 전체 어휘로 합치고 열 번호를 바꿔 빈도 행렬을 세로로 이어 붙인 뒤
+#   idf 학습과 TF-IDF 정규화만 수행
+# - 결과(어휘, idf, TF-IDF 행렬)는 순차 적재와 비트 단위로 같음
+#   - 샤드는 파일명 순서를 유지하는 연속 구간이라 문서 순서가 같음
+#   - 중복 문서 정리는 합친 뒤 부모에서 하고, 남은 문서에만 나오는 단어로 어휘를 다시 줄임
+#   - TfidfVectorizer는 행 안의 항목을 단어가 코퍼스에 처음 나온 순서로 두고 그 순서로 L2 노름을 더하므로
+#     워커는 문서 안 등장 순서로 기록하고, 부모가 전체 코퍼스 기준 첫 등장 순서로 다시 정렬
+#     (정렬하지 않으면 점수가 1e-16 수준으로 달라져 동점 문서의 순위가 바뀔 수 있음)
+# - TfidfVectorizer의 min_df/max_df/max_features는 기본값(단어를 거르지 않음)이라고 가정 (SimpleRAG 설정)
+#
+# - 워커는 spawn으로 시작 (적재는 백그라운드 준비 스레드 등 다른 스레드가 도는 프로세스에서도 일어나므로
+#   fork하면 다른 스레드가 잡고 있던 잠금이 자식에서 풀리지 않을 수 있음)
+#
+# 파일 1개가 대부분인 KB(대용량 jsonl 1개 등)는 샤드를 나눌 수 없어 빨라지지 않습니다.
+
+# 워커당 샤드 수 (파일 크기가 고르지 않아도 워커가 놀지 않도록 잘게 나눔)
+SHARDS_PER_WORKER = 4
+
+
+def shard_paths(paths: Sequence[Path], n_shards: int) -> List[List[Path]]:
+    """순서를 유지한 채 바이트 크기 합이 비슷한 연속 구간 최대 n_shards개로 나눔."""
+    if not paths:
+        return []
+    sizes = np.array([p.stat().st_size for p in paths], dtype=np.float64)
+    bounds = np.cumsum(sizes)
+    targets = bounds[-1] * np.arange(1, max(1, n_shards)) / max(1, n_shards)
+    cuts = np.unique(np.clip(np.searchsorted(bounds, targets) + 1, 1, len(paths) - 1)) if len(paths) > 1 else []
+    return [list(shard) for shard in np.split(np.array(paths, dtype=object), cuts) if len(shard)]
+
+
+def count_terms(vectorizer, documents: Sequence[str]) -> Tuple[Optional[np.ndarray], object]:
+    """문서 묶음 → (샤드 어휘 배열, 단어 빈도 CSR 행렬). hashing 벡터라이저면 어휘는 None.
+
+    어휘는 샤드에 처음 나온 순서, 행 안의 항목은 문서 안 등장 순서 (부모가 전체 기준으로 다시 정렬).
+    """
+    if isinstance(vectorizer, HashingTfidfVectorizer):
+        return None, vectorizer.count(documents)
+    import scipy.sparse as sp
+
+    # TfidfVectorizer와 같은 전처리/토큰화(lowercase, token_pattern 등)
+    analyze = vectorizer.build_analyzer()
+    vocab: Dict[str, int] = {}
+    indices, values, indptr = array("q"), array("q"), array("q", [0])
+    for doc in documents:
+        counter: Dict[int, int] = {}
+        for term in analyze(doc):
+            j = vocab.setdefault(term, len(vocab))
+            counter[j] = counter.get(j, 0) + 1
+        indices.extend(counter.keys())
+        values.extend(counter.values())
+        indptr.append(len(indices))
+    data = np.frombuffer(values, dtype=np.int64).astype(vectorizer.dtype)
+    counts = sp.csr_matrix(
+        (data, np.frombuffer(indices, dtype=np.int64), np.frombuffer(indptr, dtype=np.int64)),
+        shape=(len(indptr) - 1, len(vocab)),
+    )
+    return np.array(list(vocab), dtype=object), counts
+
+
+def count_shard(paths: Sequence[Path], ingest: str, vectorizer, txt_split: str = "file") -> Tuple:
+    """워커: 샤드 파일을 읽어 (문서, 경로, 어휘, 빈도 행렬). stream이면 문서는 DocStore, 경로는 None."""
+    if ingest == "stream":
+        store = DocStore.scan(paths, txt_split=txt_split)
+        try:
+            return (store, None) + count_terms(vectorizer, store)
+        finally:
+            store.close()
+    documents, doc_paths = read_kb_texts(paths)
+    return (documents, doc_paths) + count_terms(vectorizer, documents)
+
+
+def merge_counts(parts: Sequence[Tuple[Optional[np.ndarray], object]]) -> Tuple[Optional[np.ndarray], object]:
+    """샤드별 (어휘, 빈도 행렬) → 전체 (정렬된 어휘, 빈도 행렬). 행 안의 항목 순서는 그대로 유지."""
+    import scipy.sparse as sp
+
+    if not parts:
+        return np.empty(0, dtype=object), sp.csr_matrix((0, 0))
+    if parts[0][0] is None:
+        return None, sp.vstack([counts for _, counts in parts], format="csr")
+    terms = np.unique(np.concatenate([t for t, _ in parts]))
+    index_dtype = np.int32 if len(terms) < np.iinfo(np.int32).max else np.int64
+    blocks = []
+    for local_terms, counts in parts:
+        remap = np.searchsorted(terms, local_terms).astype(index_dtype)
+        blocks.append(sp.csr_matrix((counts.data, remap[counts.indices], counts.indptr), shape=(counts.shape[0], len(terms))))
+    return terms, sp.vstack(blocks, format="csr")
+
+
+def select_rows(terms: Optional[np.ndarray], counts, keep: Sequence[int]) -> Tuple[Optional[np.ndarray], object]:
+    """keep 행만 남기고, 남은 문서에 나오지 않는 단어는 어휘에서 뺌 (순차 적재가 남은 문서로만 학습하는 것과 같게)."""
+    import scipy.sparse as sp
+
+    counts = counts[np.asarray(keep, dtype=np.int64)]
+    if terms is None:
+        return terms, counts
+    used = np.bincount(counts.indices, minlength=counts.shape[1]) > 0
+    if used.all():
+        return terms, counts
+    remap = (np.cumsum(used) - 1).astype(counts.indices.dtype)
+    counts = sp.csr_matrix((counts.data, remap[counts.indices], counts.indptr), shape=(counts.shape[0], int(used.sum())))
+    return terms[used], counts
+
+
+def _first_seen_order(counts):
+    """행 안의 항목을 단어가 (행 순서대로 읽을 때) 코퍼스에 처음 나온 순서로 정렬.
+
+    입력 행 안의 항목이 문서 안 등장 순서여야 첫 등장 순서를 정확히 알 수 있음.
+    """
+    import scipy.sparse as sp
+
+    n_terms = counts.shape[1]
+    position = np.arange(counts.nnz, dtype=np.int64)
+    first = np.empty(n_terms, dtype=np.int64)
+    first[counts.indices[::-1]] = position[::-1]  # 같은 열이 여러 번이면 마지막 대입(= 가장 앞 위치)이 남음
+    rank = np.empty(n_terms, dtype=np.int64)
+    rank[np.argsort(first)] = np.arange(n_terms)
+    rows = np.repeat(np.arange(counts.shape[0], dtype=np.int64), np.diff(counts.indptr))
+    order = np.argsort(rows * n_terms + rank[counts.indices])
+    return sp.csr_matrix((counts.data[order], counts.indices[order], counts.indptr), shape=counts.shape)
+
+
+def fit_counts(vectorizer, terms: Optional[np.ndarray], counts):
+    """집계된 어휘/빈도로 벡터라이저 상태(vocabulary_, idf_)를 채우고 문서 TF-IDF 행렬을 반환."""
+    if terms is None:
+        return vectorizer.fit_counts(counts)
+    if not len(terms):
+        raise ValueError("empty vocabulary; perhaps the documents only contain stop words")
+    from sklearn.feature_extraction.text import TfidfTransformer
+
+    counts = _first_seen_order(counts)
+    tfidf = TfidfTransformer(
+        norm=vectorizer.norm,
+        use_idf=vectorizer.use_idf,
+        smooth_idf=vectorizer.smooth_idf,
+        sublinear_tf=vectorizer.sublinear_tf,
+    )
+    matrix = tfidf.fit_transform(counts)
+    vectorizer.vocabulary_ = {term: i for i, term in enumerate(terms.tolist())}
+    vectorizer.idf_ = tfidf.idf_
+    return matrix
+
+
+def count_corpus(paths: Sequence[Path], ingest: str, vectorizer, workers: int, txt_split: str = "file") -> Tuple:
+    """KB 파일을 워커 workers개에 나눠 집계 → (문서, 문서 경로, 어휘, 빈도 행렬)."""
+    shards = shard_paths(paths, workers * SHARDS_PER_WORKER)
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(shards)) or 1, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        parts = list(pool.map(count_shard, shards, repeat(ingest), repeat(vectorizer), repeat(txt_split)))
+    if ingest == "stream":
+        store = DocStore.concat([p[0] for p in parts])
+        documents, doc_paths = store, DocPaths(store)
+    else:
+        documents = [d for p in parts for d in p[0]]
+        doc_paths = [path for p in parts for path in p[1]]
+    terms, counts = merge_counts([(p[2], p[3]) for p in parts])
+    return documents, doc_paths, terms, counts
+
+
+def same_index(a, b) -> bool:
+    """두 SimpleRAG 인덱스가 같은지 (TF-IDF 행렬 비트 단위 + 어휘/idf). 병렬 적재 검증용."""
+    x, y = a.doc_matrix, b.doc_matrix
+    if x.shape != y.shape or not all(np.array_equal(getattr(x, k), getattr(y, k)) for k in ("indptr", "indices", "data")):
+        return False
+    va, vb = a.vectorizer, b.vectorizer
+    if hasattr(va, "vocabulary_"):
+        return va.vocabulary_ == vb.vocabulary_ and np.array_equal(va.idf_, vb.idf_)
+    return np.array_equal(va.tfidf.idf_, vb.tfidf.idf_)
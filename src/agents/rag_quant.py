@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import numpy as np
+
+
+# 검색 인덱스 저정밀도 저장 (float32 / float16 / int8)
+# - TermPostings: TF-IDF 문서 행렬을 단어별 역색인(CSC)으로 보관. 질의에 나온 단어의 포스팅만 읽어
+#   문서별 점수를 누적하므로 저장 dtype과 관계없이 필요한 부분만 float32로 변환해 계산
+# - QuantizedVectors: LSA 문서 벡터를 저정밀도로 보관하고 청크 단위로 복원해 내적
+# - int8은 문서(행)별 최댓값 기준 scale을 두고 값 / scale 을 [-127, 127]로 반올림 저장
+#   (점수 = 양자화 값의 내적 x 문서 scale)
+#
+# float64(기본)는 기존 경로(scikit-learn 행렬 그대로)를 사용하며 이 모듈을 쓰지 않습니다.
+
+PRECISIONS = ("float64", "float32", "float16", "int8")
+
+_SCORE_CHUNK = 65536
+
+
+def _row_scale(row_max: np.ndarray) -> np.ndarray:
+    """int8 행별 scale (행 최댓값 / 127, 전부 0인 행은 1)."""
+    return np.where(row_max > 0, row_max / 127.0, 1.0).astype(np.float32)
+
+
+class TermPostings:
+    """단어 → (문서 번호, 가중치) 포스팅 리스트 (TF-IDF 희소 점수용)."""
+
+    def __init__(self, doc_matrix, precision: str = "float32"):
+        if precision not in PRECISIONS:
+            raise ValueError(f"지원하지 않는 정밀도: {precision} (가능: {', '.join(PRECISIONS)})")
+        csr = doc_matrix.tocsr()
+        self.n_docs = csr.shape[0]
+        row_max = np.zeros(self.n_docs, dtype=np.float64)
+        nonempty = np.diff(csr.indptr) > 0
+        if csr.nnz:
+            row_max[nonempty] = np.maximum.reduceat(np.abs(csr.data), csr.indptr[:-1][nonempty])
+        csc = csr.tocsc()
+        csc.sort_indices()
+        self.indptr = csc.indptr
+        self.doc_ids = csc.indices
+        self.scale = None  # int8: 문서별 scale (점수 누적 후 곱함)
+        if precision == "int8":
+            self.scale = _row_scale(row_max)
+            self.data = np.round(csc.data / self.scale[csc.indices]).astype(np.int8)
+        else:
+            self.data = csc.data.astype(precision)
+        self.precision = precision
+
+    @property
+    def nbytes(self) -> int:
+        total = self.indptr.nbytes + self.doc_ids.nbytes + self.data.nbytes
+        return total + (self.scale.nbytes if self.scale is not None else 0)
+
+    def _postings(self, query_row) -> Tuple[np.ndarray, np.ndarray]:
+        """질의 1건의 단어 포스팅을 모은 (문서 번호, 가중치 x 질의 가중치)."""
+        docs, vals = [], []
+        for term, weight in zip(query_row.indices, query_row.data):
+            a, b = self.indptr[term], self.indptr[term + 1]
+            docs.append(self.doc_ids[a:b])
+            vals.append(self.data[a:b].astype(np.float32) * np.float32(weight))
+        if not docs:
+            return np.empty(0, np.int64), np.empty(0, np.float32)
+        return np.concatenate(docs), np.concatenate(vals)
+
+    def scores(self, query_vecs) -> np.ndarray:
+        """(질의 수, 문서 수) 점수 행렬. 질의 단어와 겹치지 않는 문서는 0."""
+        query_vecs = query_vecs.tocsr()
+        out = np.zeros((query_vecs.shape[0], self.n_docs), dtype=np.float32)
+        for i in range(query_vecs.shape[0]):
+            docs, vals = self._postings(query_vecs.getrow(i))
+            if len(docs):
+                out[i] = np.bincount(docs, weights=vals, minlength=self.n_docs)
+        if self.scale is not None:
+            out *= self.scale
+        return out
+
+    def touched(self, query_vecs) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """질의별로 점수가 있는 문서만 (문서 번호 배열, 점수 배열)로 반환 (하이브리드 후보용)."""
+        query_vecs = query_vecs.tocsr()
+        results = []
+        for i in range(query_vecs.shape[0]):
+            docs, vals = self._postings(query_vecs.getrow(i))
+            uniq, inverse = np.unique(docs, return_inverse=True)
+            scores = np.bincount(inverse, weights=vals, minlength=len(uniq)).astype(np.float32)
+            if self.scale is not None:
+                scores *= self.scale[uniq]
+            results.append((uniq, scores))
+        return results
+
+
+class QuantizedVectors:
+    """밀집 문서 벡터(문서 수, 차원)의 저정밀도 저장소."""
+
+    def __init__(self, vectors: np.ndarray, precision: str = "float16"):
+        if precision not in PRECISIONS:
+            raise ValueError(f"지원하지 않는 정밀도: {precision} (가능: {', '.join(PRECISIONS)})")
+        self.scale = None
+        if precision == "int8":
+            self.scale = _row_scale(np.abs(vectors).max(axis=1) if vectors.size else np.zeros(len(vectors)))
+            data = np.round(vectors / self.scale[:, None]).astype(np.int8)
+        else:
+            data = vectors.astype(precision)
+        self.data = np.ascontiguousarray(data)
+        self.precision = precision
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.data.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + (self.scale.nbytes if self.scale is not None else 0)
+
+    def rows(self, idx) -> np.ndarray:
+        """지정한 행을 float32로 복원."""
+        out = self.data[idx].astype(np.float32)
+        if self.scale is not None:
+            out *= self.scale[idx][..., None]
+        return out
+
+    def dot(self, queries: np.ndarray) -> np.ndarray:
+        """(질의 수, 문서 수) 내적. 청크 단위로 복원해 float32 BLAS로 계산."""
+        n = self.data.shape[0]
+        out = np.empty((queries.shape[0], n), dtype=np.float32)
+        for start in range(0, n, _SCORE_CHUNK):
+            stop = min(start + _SCORE_CHUNK, n)
+            out[:, start:stop] = queries @ self.rows(slice(start, stop)).T
+        return out
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from src.agents.rag_agent import SimpleRAG, get_shared_rag, rag_from_env
+
+
+# 테넌트(가맹점/브랜드)별 KB 네임스페이스
+# - 테넌트 KB는 {RAG_TENANTS_DIR}/{tenant}/*.txt, 처음 요청될 때 인덱스를 만들어 메모리에 보관
+# - 보관 중인 인덱스의 추정 메모리 합이 예산을 넘으면 가장 오래 쓰지 않은 테넌트부터 내림 (LRU)
+#   (방금 요청된 테넌트는 예산보다 커도 유지)
+# - tenant가 없으면 기본 KB(get_shared_rag, 예산과 별도)
+#   KB 디렉터리가 없거나 이름이 규칙에 맞지 않는 테넌트도 기본 KB를 사용 (stats["fallback"])
+#
+# 환경변수:
+#   RAG_TENANTS_DIR         테넌트 KB 상위 디렉터리 (기본 data/tenants)
+#   RAG_TENANT_MEMORY_MB    테넌트 인덱스 메모리 예산 (기본 512)
+
+# 경로 조작을 막기 위해 테넌트 이름은 영문/숫자/-/_ 만 허용
+TENANT_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+
+# 어휘 사전 항목 1개당 추정 바이트 (dict 항목 + 문자열 객체)
+_VOCAB_ENTRY_BYTES = 120
+
+
+def valid_tenant(tenant: str) -> bool:
+    return bool(TENANT_NAME.match(tenant))
+
+
+def estimate_nbytes(rag: SimpleRAG) -> int:
+    """SimpleRAG 1개가 차지하는 메모리 추정치 (인덱스 + 원문 + 어휘 사전)."""
+    vocab = getattr(rag.vectorizer, "vocabulary_", None) or {}
+    # 스트리밍 적재(rag_ingest.DocStore)는 원문 대신 오프셋만 보관
+    docs = rag.documents.nbytes if hasattr(rag.documents, "nbytes") else sum(sys.getsizeof(d) for d in rag.documents)
+    return rag.index_nbytes + docs + len(vocab) * _VOCAB_ENTRY_BYTES
+
+
+class TenantRegistry:
+    """tenant → SimpleRAG (지연 적재 + 메모리 예산 LRU)."""
+
+    def __init__(
+        self,
+        root: str = "data/tenants",
+        memory_budget: int = 512 * 1024 * 1024,
+        factory: Callable[[str], SimpleRAG] = rag_from_env,
+    ):
+        self.root = Path(root)
+        self.memory_budget = memory_budget
+        self.factory = factory
+        self.stats = {"hit": 0, "load": 0, "evict": 0, "fallback": 0}
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # tenant → (rag, 추정 바이트)
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def get(self, tenant: Optional[str]) -> SimpleRAG:
+        if not tenant:
+            return get_shared_rag()
+        kb_dir = self.root / tenant if valid_tenant(tenant) else None
+        with self._lock:
+            entry = self._entries.get(tenant)
+            if entry is not None:
+                self._entries.move_to_end(tenant)
+                self.stats["hit"] += 1
+                return entry[0]
+            if kb_dir is None or not kb_dir.is_dir():
+                self.stats["fallback"] += 1
+                return get_shared_rag()
+            load_lock = self._load_locks.setdefault(tenant, threading.Lock())
+        # 같은 테넌트를 동시에 두 번 만들지 않도록 테넌트별 잠금 (다른 테넌트 적재는 막지 않음)
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(tenant)
+                if entry is not None:
+                    self._entries.move_to_end(tenant)
+                    self.stats["hit"] += 1
+                    return entry[0]
+            rag = self.factory(str(kb_dir))
+            with self._lock:
+                self._entries[tenant] = (rag, estimate_nbytes(rag))
+                self.stats["load"] += 1
+                self._evict()
+            return rag
+
+    def _evict(self) -> None:
+        total = self.memory_nbytes
+        while total > self.memory_budget and len(self._entries) > 1:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            total -= nbytes
+            self.stats["evict"] += 1
+
+    @property
+    def memory_nbytes(self) -> int:
+        return sum(nbytes for _, nbytes in self._entries.values())
+
+    def loaded(self) -> Dict[str, int]:
+        """적재된 테넌트 → 추정 바이트 (오래 쓰지 않은 순)."""
+        with self._lock:
+            return {tenant: nbytes for tenant, (_, nbytes) in self._entries.items()}
+
+    def evict(self, tenant: str) -> bool:
+        """KB를 갱신한 테넌트를 내려 다음 요청 때 다시 적재."""
+        with self._lock:
+            return self._entries.pop(tenant, None) is not None
+
+
+_default_registry: Optional[TenantRegistry] = None
+_default_lock = threading.Lock()
+
+
+def get_tenant_registry() -> TenantRegistry:
+    """프로세스 공용 테넌트 레지스트리 (RAG_TENANTS_DIR, RAG_TENANT_MEMORY_MB 설정)."""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = TenantRegistry(
+                root=os.getenv("RAG_TENANTS_DIR", "data/tenants"),
+                memory_budget=int(float(os.getenv("RAG_TENANT_MEMORY_MB", "512")) * 1024 * 1024),
+            )
+        return _default_registry
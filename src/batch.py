@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional
+
+from src.agents.rag_agent import SimpleRAG, rag_from_env, run_rag_agent_batch
+from src.graph import END, Pipeline
+
+
+# 과거 로그 재채점/백필용 배치 실행기
+# - graph.invoke와 같은 노드/분기 표(graph.Pipeline)를 그대로 따라 실행하되 발화 단위가 아닌 청크 단위로 처리
+# - 청크의 모든 state를 rag 노드 직전까지 진행한 뒤, rag 질의만 KB별 SimpleRAG.answer_batch로 한 번에 검색하고
+#   rag 노드 다음 분기부터 이어서 실행 (그 밖의 노드/분기/병합/화법은 그래프와 같은 함수)
+# - 응답 캐시 노드는 쓰지 않음 (재처리는 항상 새로 계산), fanout 후보 에이전트는 워커 안에서 순차 실행
+# - 청크는 프로세스 풀에 분산(워커마다 SimpleRAG 1회 생성), 결과는 입력 순서대로 스트리밍 기록
+#   (워커는 spawn으로 시작: 호출 프로세스의 스레드가 잡고 있던 잠금을 fork로 물려받지 않도록)
+# - 레코드에 tenant가 있으면 그래프와 같이 테넌트 레지스트리(rag_tenants)에서 해당 KB로 검색
+#
+# 환경변수:
+#   BATCH_PROCESSES   워커 프로세스 수 (기본 CPU 수, 0 이면 현재 프로세스에서 실행)
+#   BATCH_CHUNK_SIZE  청크당 발화 수 (기본 256)
+
+BATCH_PROCESSES = int(os.getenv("BATCH_PROCESSES", str(os.cpu_count() or 1)))
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "256"))
+
+# 출력 레코드 필드 (Parquet 스키마와 동일한 순서)
+RESULT_FIELDS = ("id", "user_input", "blocked", "intent", "response", "final_text", "safety_stats", "expected_intent")
+
+_worker_rag: Optional[SimpleRAG] = None
+_pipeline: Optional[Pipeline] = None
+
+
+def _init_worker(kb_dir: str) -> None:
+    global _worker_rag
+    _worker_rag = rag_from_env(kb_dir)
+
+
+def get_pipeline() -> Pipeline:
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = Pipeline(parallel_fanout=False)
+    return _pipeline
+
+
+def initial_state(record: Dict[str, Any]) -> Dict[str, Any]:
+    """레코드 → graph.invoke 입력 state (API 서버와 같은 필드)."""
+    state: Dict[str, Any] = {"user_input": str(record.get("text", "")), "channel": record.get("channel")}
+    if record.get("tenant"):
+        state["tenant"] = record["tenant"]
+    return state
+
+
+def result_row(record: Dict[str, Any], state: Dict[str, Any]) -> Dict[str, Any]:
+    """레코드 + 최종 state → 출력 레코드 (graph.invoke 결과에도 같은 함수를 써서 비교)."""
+    blocked = bool(state.get("blocked"))
+    return {
+        "id": str(record.get("id", "")),
+        "user_input": str(record.get("text", "")),
+        "blocked": blocked,
+        "intent": state.get("intent", ""),
+        "response": state.get("final_text", "") if blocked else state.get("response", ""),
+        "final_text": state.get("final_text", ""),
+        "safety_stats": json.dumps(state.get("_safety_stats", {}), ensure_ascii=False, sort_keys=True),
+        "expected_intent": record.get("intent"),
+    }
+
+
+def process_chunk(records: List[Dict[str, Any]], rag: Optional[SimpleRAG] = None) -> List[Dict[str, Any]]:
+    """레코드 목록({"id", "text", ["intent", "channel", "tenant"]})을 graph.invoke와 같은 결과로 처리합니다."""
+    rag = rag or _worker_rag
+    if rag is None:
+        rag = rag_from_env()
+    pipeline = get_pipeline()
+
+    states = []
+    for record in records:
+        state = initial_state(record)
+        if not state.get("tenant"):
+            state["_rag_instance"] = rag  # 테넌트가 없으면 워커 KB (그래프의 공용 KB와 같은 kb_dir)
+        states.append(state)
+
+    # 1) rag 노드 직전까지 진행
+    stopped = [pipeline.run(state, stop_before=("rag",)) for state in states]
+    # 2) rag 노드: KB별로 한 번에 검색
+    waiting = [state for state, node in stopped if node == "rag"]
+    run_rag_agent_batch(waiting)
+    # 3) rag 다음 분기부터 끝까지
+    results = []
+    for record, (state, node) in zip(records, stopped):
+        if node != END:
+            state, _ = pipeline.resume_after(node, state)
+        results.append(result_row(record, state))
+    return results
+
+
+def _chunks(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_batch(
+    records: Iterable[Dict[str, Any]],
+    processes: int = BATCH_PROCESSES,
+    chunk_size: int = BATCH_CHUNK_SIZE,
+    kb_dir: str = "data/kb",
+    max_in_flight: Optional[int] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """레코드를 청크 단위로 처리해 결과 청크를 입력 순서대로 내보냅니다.
+
+    입력은 순회하면서 읽으므로 파일 전체를 메모리에 올리지 않습니다.
+    동시에 제출하는 청크 수는 max_in_flight(기본 processes * 2)로 제한합니다.
+    """
+    chunks = _chunks(records, chunk_size)
+    if processes <= 0:
+        rag = rag_from_env(kb_dir)
+        for chunk in chunks:
+            yield process_chunk(chunk, rag)
+        return
+
+    max_in_flight = max_in_flight or processes * 2
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(kb_dir,),
+    ) as pool:
+        for chunk in chunks:
+            pending.append(pool.submit(process_chunk, chunk))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# ===== 결과 기록 =====
+
+class JsonlWriter:
+    def __init__(self, path: str):
+        self._f = open(path, "w", encoding="utf-8")
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            self._f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class ParquetWriter:
+    """청크마다 row group 하나씩 기록 (pyarrow 필요)."""
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise RuntimeError("Parquet 출력에는 pyarrow가 필요합니다: pip install pyarrow") from exc
+        self._pa = pa
+        self._schema = pa.schema([
+            ("id", pa.string()),
+            ("user_input", pa.string()),
+            ("blocked", pa.bool_()),
+            ("intent", pa.string()),
+            ("response", pa.string()),
+            ("final_text", pa.string()),
+            ("safety_stats", pa.string()),
+            ("expected_intent", pa.string()),
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        columns = {name: [row.get(name) for row in rows] for name in RESULT_FIELDS}
+        self._writer.write_table(self._pa.Table.from_pydict(columns, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def open_writer(path: str):
+    """확장자(.parquet / 그 외 JSONL)에 맞는 기록기를 반환합니다."""
+    if path.endswith(".parquet"):
+        return ParquetWriter(path)
+    return JsonlWriter(path)
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+import weakref
+from collections.abc import MutableSequence
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+
+# 세션별 대화 기록 상한/보관(compaction) 및 메모리 사용량 집계
+# - 상한을 넘으면 오래된 메시지를 로컬 JSONL 파일로 보관하고 요약 메시지 1건으로 대체
+# - 보관된 메시지는 '이전 대화 더보기' 요청 시 페이지 단위로 다시 불러옴
+# - 프로세스 전체 메모리 예산을 넘으면 오래 쉬고 있는 세션부터 압축
+
+HISTORY_MAX_MESSAGES = int(os.getenv("CHAT_HISTORY_MAX_MESSAGES", "60"))
+HISTORY_KEEP_MESSAGES = int(os.getenv("CHAT_HISTORY_KEEP_MESSAGES", str(HISTORY_MAX_MESSAGES // 2)))
+HISTORY_PAGE_SIZE = int(os.getenv("CHAT_HISTORY_PAGE_SIZE", "20"))
+ARCHIVE_DIR = Path(os.getenv("CHAT_ARCHIVE_DIR", Path(__file__).resolve().parents[1] / ".chat_archive"))
+MEMORY_BUDGET_BYTES = int(float(os.getenv("CHAT_MEMORY_BUDGET_MB", "64")) * 1024 * 1024)
+IDLE_SECONDS = float(os.getenv("CHAT_IDLE_SECONDS", "600"))
+IDLE_KEEP_MESSAGES = 2
+
+
+def message_size(message: Dict[str, Any]) -> int:
+    """메시지 1건의 대략적인 메모리 사용량(bytes)."""
+    size = sys.getsizeof(message)
+    for key, value in message.items():
+        size += sys.getsizeof(key) + sys.getsizeof(value)
+        if isinstance(value, list):
+            size += sum(sys.getsizeof(v) for v in value)
+    return size
+
+
+def _remove_file(path: Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        pass
+
+
+class ChatHistory(MutableSequence):
+    """상한이 있는 세션 대화 기록 (list처럼 쓰는 시퀀스, 내부 list를 감쌈).
+
+    목록 구성: [요약 메시지] + [다시 불러온 보관 메시지] + [최근 메시지]
+    - append/extend/insert/+=/항목·슬라이스 대입/삭제 모두 메모리 집계(nbytes)를 갱신하고,
+      메시지가 추가되면 상한을 확인해 압축합니다.
+    - 같음 비교/해시는 객체 단위입니다 (레지스트리의 WeakSet 원소).
+    - 보관 파일은 세션 객체가 사라지면 함께 삭제됩니다.
+    """
+
+    def __init__(
+        self,
+        messages: Iterable[Dict[str, Any]] = (),
+        max_messages: int = HISTORY_MAX_MESSAGES,
+        keep_messages: int = HISTORY_KEEP_MESSAGES,
+        archive_dir: Path = ARCHIVE_DIR,
+        registry: Optional["HistoryRegistry"] = None,
+    ):
+        self._messages: List[Dict[str, Any]] = list(messages)
+        self.session_key = uuid.uuid4().hex
+        self.max_messages = max_messages
+        self.keep_messages = max(1, min(keep_messages, max_messages))
+        self.archive_path = Path(archive_dir) / f"{self.session_key}.jsonl"
+        self.archived_count = 0  # 보관 파일에 기록된 메시지 수
+        self.loaded_count = 0  # 보관 메시지 중 다시 불러와 목록에 있는 수
+        self.last_active = time.monotonic()
+        self.nbytes = sum(message_size(m) for m in self._messages)
+        self._offsets: List[int] = []  # 보관 파일 내 각 메시지의 시작 위치
+        self._lock = threading.RLock()
+        weakref.finalize(self, _remove_file, self.archive_path)
+        self._registry = registry if registry is not None else default_registry
+        self._registry.register(self)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __getitem__(self, index: Union[int, slice]):
+        return self._messages[index]
+
+    def __setitem__(self, index: Union[int, slice], value) -> None:
+        with self._lock:
+            removed = self._messages[index] if isinstance(index, slice) else [self._messages[index]]
+            added = list(value) if isinstance(index, slice) else [value]
+            self._messages[index] = added if isinstance(index, slice) else value
+            self._changed(added, removed)
+        self._registry.maybe_enforce_budget()
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        with self._lock:
+            removed = self._messages[index] if isinstance(index, slice) else [self._messages[index]]
+            del self._messages[index]
+            self._changed([], removed)
+
+    def insert(self, index: int, message: Dict[str, Any]) -> None:
+        # append/extend/+= 도 이 메서드를 거침 (MutableSequence)
+        with self._lock:
+            self._messages.insert(index, message)
+            self._changed([message], [])
+        self._registry.maybe_enforce_budget()
+
+    def _changed(self, added: List[Dict[str, Any]], removed: List[Dict[str, Any]]) -> None:
+        self.nbytes += sum(message_size(m) for m in added) - sum(message_size(m) for m in removed)
+        self.last_active = time.monotonic()
+        if added and self._live_count() > self.max_messages:
+            self.compact()
+
+    def __repr__(self) -> str:
+        return f"ChatHistory({self._messages!r})"
+
+    def _head_count(self) -> int:
+        """요약 메시지 + 다시 불러온 보관 메시지 수."""
+        return (1 if self.archived_count else 0) + self.loaded_count
+
+    def _live_count(self) -> int:
+        return len(self) - self._head_count()
+
+    def compact(self, keep: Optional[int] = None) -> int:
+        """최근 `keep`건만 남기고 나머지를 보관합니다. 보관한 메시지 수를 반환."""
+        keep = self.keep_messages if keep is None else keep
+        with self._lock:
+            head = self._head_count()
+            live = self._messages[head:]
+            if len(live) <= keep:
+                return 0
+            to_archive, tail = live[: len(live) - keep], live[len(live) - keep:]
+            self._write_archive(to_archive)
+            self.loaded_count = 0
+            self._messages = [self._summary_message(to_archive)] + tail
+            self.nbytes = sum(message_size(m) for m in self._messages)
+            return len(to_archive)
+
+    def _write_archive(self, messages: List[Dict[str, Any]]) -> None:
+        self.archive_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.archive_path, "ab") as f:
+            for m in messages:
+                self._offsets.append(f.tell())
+                f.write(json.dumps(m, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.archived_count += len(messages)
+
+    def _summary_message(self, newly_archived: List[Dict[str, Any]]) -> Dict[str, Any]:
+        recent_questions = [
+            str(m.get("content", ""))[:20] for m in newly_archived if m.get("role") == "user"
+        ][-3:]
+        content = f"이전 대화 {self.archived_count}건은 보관되었습니다."
+        if recent_questions:
+            content += " 최근 문의: " + ", ".join(recent_questions)
+        return {"role": "assistant", "content": content, "summary": True}
+
+    def has_older(self) -> bool:
+        return self.loaded_count < self.archived_count
+
+    def load_older(self, count: int = HISTORY_PAGE_SIZE) -> int:
+        """보관된 메시지 중 화면에 없는 가장 최근 `count`건을 요약 메시지 바로 뒤에 복원."""
+        with self._lock:
+            end = self.archived_count - self.loaded_count
+            start = max(0, end - count)
+            if start >= end:
+                return 0
+            with open(self.archive_path, "rb") as f:
+                f.seek(self._offsets[start])
+                restored = [json.loads(f.readline()) for _ in range(end - start)]
+            self._messages[1:1] = restored
+            self.loaded_count += len(restored)
+            self.nbytes += sum(message_size(m) for m in restored)
+            self.last_active = time.monotonic()
+            return len(restored)
+
+
+class HistoryRegistry:
+    """프로세스 내 모든 세션 대화 기록의 메모리 사용량을 집계하고 예산을 적용."""
+
+    def __init__(
+        self,
+        budget_bytes: int = MEMORY_BUDGET_BYTES,
+        idle_seconds: float = IDLE_SECONDS,
+        check_interval: float = 5.0,
+    ):
+        self.budget_bytes = budget_bytes
+        self.idle_seconds = idle_seconds
+        self.check_interval = check_interval
+        self._histories: "weakref.WeakSet[ChatHistory]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+
+    def register(self, history: ChatHistory) -> None:
+        with self._lock:
+            self._histories.add(history)
+
+    def usage(self) -> Dict[str, Any]:
+        """세션별/전체 메모리 사용량 보고."""
+        with self._lock:
+            histories = list(self._histories)
+        now = time.monotonic()
+        sessions = [
+            {
+                "session_key": h.session_key,
+                "messages": len(h),
+                "archived": h.archived_count,
+                "bytes": h.nbytes,
+                "idle_seconds": round(now - h.last_active, 1),
+            }
+            for h in histories
+        ]
+        return {
+            "sessions": len(sessions),
+            "total_bytes": sum(s["bytes"] for s in sessions),
+            "budget_bytes": self.budget_bytes,
+            "per_session": sessions,
+        }
+
+    def maybe_enforce_budget(self) -> None:
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        self.enforce_budget()
+
+    def enforce_budget(self) -> int:
+        """유휴 세션과 예산 초과분을 압축합니다. 압축한 세션 수를 반환."""
+        with self._lock:
+            histories = sorted(self._histories, key=lambda h: h.last_active)
+        now = time.monotonic()
+        total = sum(h.nbytes for h in histories)
+        compacted = 0
+        for h in histories:
+            idle = now - h.last_active >= self.idle_seconds
+            if not idle and total <= self.budget_bytes:
+                break
+            before = h.nbytes
+            if h.compact(keep=IDLE_KEEP_MESSAGES):
+                compacted += 1
+                total -= before - h.nbytes
+        return compacted
+
+
+default_registry = HistoryRegistry()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# 모호한 입력(여러 intent 후보)에 대한 에이전트 병렬 실행
+# - route가 state['intents']에 2개 이상을 남기면 그래프는 fanout 노드 하나로 분기
+# - 후보 에이전트를 공용 스레드 풀에서 동시에 실행(각자 state 사본 사용)하고 응답을 intent 순서대로 합침
+# - 일부 에이전트가 실패하면 나머지 응답만 합치고 state['fanout_errors']에 기록
+#
+# 환경변수:
+#   FANOUT_MAX_WORKERS  공용 스레드 풀 크기 (기본 4)
+
+FANOUT_MAX_WORKERS = int(os.getenv("FANOUT_MAX_WORKERS", "4"))
+
+# 합친 응답의 구역 제목
+INTENT_TITLES = {
+    "rag": "FAQ 안내",
+    "phone": "전화 상담",
+    "app": "앱 바로가기",
+    "human": "상담사 연결",
+}
+
+Agent = Callable[[Dict], Dict]
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=FANOUT_MAX_WORKERS, thread_name_prefix="fanout")
+        return _executor
+
+
+def merge_responses(state: Dict, results: List[Tuple[str, Dict]], errors: Dict[str, str]) -> Dict:
+    """에이전트별 결과를 하나의 응답으로 합칩니다 (results는 intent 순서)."""
+    sections = [
+        f"[{INTENT_TITLES.get(intent, intent)}]\n{result.get('response', '')}"
+        for intent, result in results
+    ]
+    state["response"] = "\n\n".join(sections)
+    if errors:
+        state["fanout_errors"] = errors
+    return state
+
+
+def run_agents(state: Dict, agents: Dict[str, Agent], executor: Optional[Executor] = None) -> Dict:
+    """state['intents']의 에이전트를 실행하고 응답을 합칩니다.
+
+    executor가 없으면 순차 실행합니다 (배치 실행기 등 이미 병렬화된 호출자용).
+    """
+    intents = [i for i in state.get("intents") or [state.get("intent", "rag")] if i in agents]
+    if executor is None:
+        outcomes = []
+        for intent in intents:
+            try:
+                outcomes.append((intent, agents[intent](dict(state)), None))
+            except Exception as exc:
+                outcomes.append((intent, None, exc))
+    else:
+        futures = [(intent, executor.submit(agents[intent], dict(state))) for intent in intents]
+        outcomes = []
+        for intent, future in futures:
+            exc = future.exception()
+            outcomes.append((intent, None if exc else future.result(), exc))
+
+    results = [(intent, result) for intent, result, exc in outcomes if exc is None]
+    errors = {intent: str(exc) for intent, _, exc in outcomes if exc is not None}
+    if errors and not results:
+        # 모두 실패하면 단일 에이전트 실행과 같이 예외를 그대로 전파
+        raise next(exc for _, _, exc in outcomes if exc is not None)
+    return merge_responses(state, results, errors)
+
+
+def make_fanout_node(agents: Dict[str, Agent], executor: Optional[Executor] = None) -> Agent:
+    """그래프용 fanout 노드. executor를 생략하면 프로세스 공용 스레드 풀을 사용."""
+
+    def fanout(state: Dict) -> Dict:
+        return run_agents(state, agents, executor or get_executor())
+
+    return fanout
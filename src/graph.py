@@ -1,55 +1,140 @@
-from typing import Dict
-from langgraph.graph import StateGraph, END
+from typing import Callable, Dict, Iterable, Optional, Tuple
 
-from src.router import route
+from src.response_cache import CACHEABLE_INTENTS, ResponseCache, get_default_cache
+from src.router import need_style, route
+from src.safety import moderate
 from src.agents.rag_agent import run_rag_agent
 from src.agents.phone_agent import run_phone_agent
 from src.agents.app_button_agent import run_app_button_agent
 from src.agents.human_filter_agent import run_human_filter_agent
+from src.fanout import make_fanout_node, run_agents
 from src.style_agent import apply_style
+from src.tracing import NodeTracer, get_default_tracer
 
+# langgraph.graph.END와 같은 값 (노드/분기 표를 langgraph import 없이 쓰기 위해)
+END = "__end__"
 
-def build_graph():
-    """LangGraph 상태 그래프 구성.
+Node = Callable[[Dict], Dict]
+
+AGENTS: Dict[str, Node] = {
+    "rag": run_rag_agent,
+    "phone": run_phone_agent,
+    "app": run_app_button_agent,
+    "human": run_human_filter_agent,
+}
+
+
+class Pipeline:
+    """그래프의 노드/분기 표.
+    build_graph는 이 표로 LangGraph를 구성하고, 배치 실행기(src/batch.py)는 같은 표를 직접 따라가며 실행.
     노드:
-      - route: 의도 분류 및 스타일 여부 결정
+      - moderate: 안전 필터링 (차단 시 바로 종료, result['blocked']=True)
+      - cache(optional): 응답 캐시 조회 (적중 시 바로 종료, result['cache_hit']=True)
+      - route: 의도 분류
       - rag/phone/app/human: 각 모듈 실행
-      - style(optional): 화법 적용
+      - fanout: intent 후보가 여럿이면 해당 에이전트들을 병렬 실행 후 응답 병합
+      - style(optional): 화법 적용 (에이전트 실행 후 need_style로 판단)
+      - cache_store(optional): 캐시 가능한 intent의 응답 저장
+    agents로 에이전트 함수를 바꿀 수 있음 (fanout도 같은 함수를 사용).
+    parallel_fanout=False면 fanout 후보 에이전트를 순차 실행 (이미 프로세스 단위로 병렬화된 배치 워커용).
     """
-    graph = StateGraph(dict)
 
-    # 노드 등록
-    graph.add_node("route", route)
-    graph.add_node("rag", run_rag_agent)
-    graph.add_node("phone", run_phone_agent)
-    graph.add_node("app", run_app_button_agent)
-    graph.add_node("human", run_human_filter_agent)
-    graph.add_node("style", apply_style)
+    entry = "moderate"
+
+    def __init__(
+        self,
+        tracer: Optional[NodeTracer] = None,
+        cache: Optional[ResponseCache] = None,
+        agents: Optional[Dict[str, Node]] = None,
+        parallel_fanout: bool = True,
+    ):
+        def traced(name: str, fn: Node) -> Node:
+            return tracer.wrap(name, fn) if tracer is not None else fn
+
+        # fanout 노드도 같은 (계측된) 에이전트 함수를 사용
+        self.agents = {name: traced(name, fn) for name, fn in dict(AGENTS, **(agents or {})).items()}
+        self.nodes: Dict[str, Node] = {"moderate": traced("moderate", moderate)}
+        if cache is not None:
+            self.nodes["cache"] = traced("cache", cache.lookup)
+            self.nodes["cache_store"] = traced("cache_store", cache.store)
+        self.nodes["route"] = traced("route", route)
+        self.nodes.update(self.agents)
+        if parallel_fanout:
+            fanout = make_fanout_node(self.agents)
+        else:
+            def fanout(state: Dict) -> Dict:
+                return run_agents(state, self.agents)
+        self.nodes["fanout"] = traced("fanout", fanout)
+        self.nodes["style"] = traced("style", apply_style)
 
-    # 시작 노드
-    graph.set_entry_point("route")
+        # 분기: 차단/캐시 적중이면 라우팅·에이전트를 건너뛰고 종료
+        after_check = "cache" if cache is not None else "route"
 
-    # 분기: route -> intent 별 노드
-    def decide_after_route(state: Dict) -> str:
-        intent = state.get("intent")
-        if intent == "phone":
-            return "phone"
-        if intent == "app":
-            return "app"
-        if intent == "human":
-            return "human"
-        return "rag"
+        def decide_after_moderate(state: Dict) -> str:
+            return END if state.get("blocked") else after_check
 
-    graph.add_conditional_edges("route", decide_after_route)
+        # 분기: route -> intent 별 노드
+        def decide_after_route(state: Dict) -> str:
+            if len(state.get("intents") or ()) > 1:
+                return "fanout"
+            intent = state.get("intent")
+            if intent == "phone":
+                return "phone"
+            if intent == "app":
+                return "app"
+            if intent == "human":
+                return "human"
+            return "rag"
 
-    # 각 에이전트 이후: 스타일 적용 여부에 따라 style 또는 END
-    def maybe_style(state: Dict) -> str:
-        return "style" if state.get("apply_style") else END
+        # 응답 완료 후: 캐시 대상이면 cache_store, 아니면 END (병합 응답은 모든 후보가 캐시 대상일 때만)
+        def maybe_store(state: Dict) -> str:
+            intents = state.get("intents") or [state.get("intent")]
+            return "cache_store" if cache is not None and all(i in CACHEABLE_INTENTS for i in intents) else END
 
-    for node in ("rag", "phone", "app", "human"):
-        graph.add_conditional_edges(node, maybe_style)
+        # 각 에이전트 이후: 스타일 적용 여부에 따라 style 또는 저장/END
+        def maybe_style(state: Dict) -> str:
+            return "style" if need_style(state) else maybe_store(state)
 
-    # style 이후 종료
-    graph.add_edge("style", END)
+        self.edges: Dict[str, Callable[[Dict], str]] = {"moderate": decide_after_moderate}
+        if cache is not None:
+            self.edges["cache"] = lambda state: END if state.get("cache_hit") else "route"
+            self.edges["cache_store"] = lambda state: END
+        self.edges["route"] = decide_after_route
+        for node in ("rag", "phone", "app", "human", "fanout"):
+            self.edges[node] = maybe_style
+        self.edges["style"] = maybe_store
 
+    def run(self, state: Dict, start: Optional[str] = None, stop_before: Iterable[str] = ()) -> Tuple[Dict, str]:
+        """start(기본 entry) 노드부터 표를 따라 실행. stop_before 노드에 닿으면 실행하지 않고 멈춤.
+        (state, 멈춘 노드 또는 END)를 반환.
+        """
+        node = start or self.entry
+        while node != END and node not in stop_before:
+            state = self.nodes[node](state)
+            node = self.edges[node](state)
+        return state, node
+
+    def resume_after(self, node: str, state: Dict) -> Tuple[Dict, str]:
+        """node를 호출자가 직접 실행한 뒤(예: 배치 rag 검색) 다음 분기부터 이어서 실행."""
+        return self.run(state, start=self.edges[node](state))
+
+
+def build_graph(tracer: Optional[NodeTracer] = None, cache: Optional[ResponseCache] = None):
+    """LangGraph 상태 그래프 구성 (노드/분기는 Pipeline 표).
+    tracer가 주어지거나 GRAPH_TRACING=1 이면 모든 노드를 계측 함수로 감싸 등록.
+    cache를 생략하면 프로세스 공용 캐시를 사용 (GRAPH_CACHE=0 이면 캐시 노드 없이 구성).
+    """
+    # langgraph는 import 비용이 커서 그래프를 만들 때 불러옴
+    from langgraph.graph import StateGraph
+
+    pipeline = Pipeline(
+        tracer=tracer or get_default_tracer(),
+        cache=cache if cache is not None else get_default_cache(),
+    )
+    graph = StateGraph(dict)
+    for name, fn in pipeline.nodes.items():
+        graph.add_node(name, fn)
+    graph.set_entry_point(pipeline.entry)
+    for name, decide in pipeline.edges.items():
+        graph.add_conditional_edges(name, decide)
     return graph.compile()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional
+
+
+# 추천(샘플) 질문 카탈로그
+# - 프로세스당 1회 로드, 파일 mtime이 바뀐 경우에만 다시 읽음 (stat 확인도 check_interval 간격으로 제한)
+# - 스키마 검증 실패 시 마지막으로 정상 로드된 목록을 유지하고 last_error에 사유를 기록
+#
+# 지원 형식:
+#   {"recommendations": [{"id": 1, "question": "...", "category": "..."}, ...]}
+#   {"categories": [{"name": "...", "questions": [{"id": 1, "question": "..."}, ...]}, ...]}
+
+DEFAULT_CATEGORY = "기타"
+
+
+def normalize_question(text: str) -> str:
+    """질문 비교/캐시 키용 정규화 (앞뒤/중복 공백 제거)."""
+    return " ".join(text.split())
+
+
+def _validate_item(item: Any, where: str, category: Optional[str] = None) -> Dict[str, Any]:
+    if not isinstance(item, dict):
+        raise ValueError(f"{where}: 객체가 아닙니다")
+    if not isinstance(item.get("id"), int) or isinstance(item.get("id"), bool):
+        raise ValueError(f"{where}: 'id'는 정수여야 합니다")
+    question = item.get("question")
+    if not isinstance(question, str) or not question.strip():
+        raise ValueError(f"{where}: 'question'은 비어 있지 않은 문자열이어야 합니다")
+    item_category = item.get("category", category or DEFAULT_CATEGORY)
+    if not isinstance(item_category, str) or not item_category.strip():
+        raise ValueError(f"{where}: 'category'는 문자열이어야 합니다")
+    return {"id": item["id"], "question": question.strip(), "category": item_category.strip()}
+
+
+def validate_recommendations(data: Any) -> List[Dict[str, Any]]:
+    """JSON 데이터를 검증하고 {id, question, category} 목록으로 정규화합니다."""
+    if not isinstance(data, dict):
+        raise ValueError("최상위 값은 객체여야 합니다")
+    items: List[Dict[str, Any]] = []
+    for i, item in enumerate(data.get("recommendations", []) or []):
+        items.append(_validate_item(item, f"recommendations[{i}]"))
+    for c, group in enumerate(data.get("categories", []) or []):
+        if not isinstance(group, dict) or not isinstance(group.get("name"), str):
+            raise ValueError(f"categories[{c}]: 'name'이 필요합니다")
+        for i, item in enumerate(group.get("questions", []) or []):
+            items.append(_validate_item(item, f"categories[{c}].questions[{i}]", group["name"]))
+    seen = set()
+    for item in items:
+        if item["id"] in seen:
+            raise ValueError(f"중복된 id: {item['id']}")
+        seen.add(item["id"])
+    return items
+
+
+class RecommendationCatalog:
+    """추천 질문 카탈로그 (스레드 안전, 변경 감지 재로드)."""
+
+    def __init__(self, path: Path, check_interval: float = float(os.getenv("RECOMMENDATIONS_CHECK_INTERVAL", "5"))):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self.last_error: Optional[str] = None
+        self.version = 0  # 재로드될 때마다 증가
+        self._items: List[Dict[str, Any]] = []
+        self._by_category: Dict[str, List[Dict[str, Any]]] = {}
+        self._questions: FrozenSet[str] = frozenset()
+        self._mtime: Optional[float] = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+            try:
+                mtime = self.path.stat().st_mtime
+            except OSError:
+                self.last_error = f"추천 질문 파일을 찾을 수 없습니다: {self.path.name}"
+                return
+            if mtime == self._mtime:
+                return
+            try:
+                items = validate_recommendations(json.loads(self.path.read_text(encoding="utf-8")))
+            except (OSError, ValueError) as e:
+                # 잘못된 파일로 교체된 경우 이전 목록 유지
+                self.last_error = f"추천 질문 로드 오류: {e}"
+                self._mtime = mtime
+                return
+            by_category: Dict[str, List[Dict[str, Any]]] = {}
+            for item in items:
+                by_category.setdefault(item["category"], []).append(item)
+            self._items = items
+            self._by_category = by_category
+            self._questions = frozenset(normalize_question(item["question"]) for item in items)
+            self._mtime = mtime
+            self.last_error = None
+            self.version += 1
+
+    def items(self) -> List[Dict[str, Any]]:
+        self._refresh()
+        return self._items
+
+    def categories(self) -> Dict[str, List[Dict[str, Any]]]:
+        self._refresh()
+        return self._by_category
+
+    def contains_question(self, text: str) -> bool:
+        self._refresh()
+        return normalize_question(text) in self._questions
+
+    def sample(self, limit: int = 5, per_category: int = 1, rng: Optional[random.Random] = None) -> List[Dict[str, Any]]:
+        """카테고리별로 최대 `per_category`건씩 돌아가며 뽑아 `limit`건을 반환합니다.
+
+        rng가 없으면 파일 순서대로(결정적으로) 선택합니다.
+        """
+        by_category = self.categories()
+        pools = []
+        for items in by_category.values():
+            pool = list(items)
+            if rng is not None:
+                rng.shuffle(pool)
+            pools.append(pool[:per_category])
+        picked: List[Dict[str, Any]] = []
+        for rank in range(per_category):
+            for pool in pools:
+                if rank < len(pool):
+                    picked.append(pool[rank])
+                    if len(picked) >= limit:
+                        return picked
+        return picked
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src.router import context_signature
+
+
+# 그래프 응답 캐시 (build_graph의 cache 노드에서 사용)
+# - 키: 테넌트 + 채널 + 지정 스타일 + 세션 문맥 + 정제된 사용자 입력(공백 정규화)
+#   (테넌트마다 KB가, 채널마다 화법이 다르므로 분리. 후속 발화는 직전 턴에 따라 답이 달라지므로
+#    router.context_signature를 키에 포함하고, 후속 발화가 아니면 세션과 무관하게 공유)
+# - TTL + 최대 항목 수(LRU)로 제한, 여러 스레드에서 공유 가능
+#
+# 환경변수:
+#   GRAPH_CACHE=0             캐시 노드 비활성화
+#   GRAPH_CACHE_TTL           항목 유지 시간(초, 기본 300)
+#   GRAPH_CACHE_MAX_ENTRIES   최대 항목 수 (기본 1024)
+
+# 입력만으로 응답이 정해지는 intent만 캐시 (phone은 접수번호, human은 상담 연결 판단이 매번 필요)
+CACHEABLE_INTENTS = frozenset({"rag", "app"})
+
+
+class ResponseCache:
+    """TTL/LRU 응답 캐시."""
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.stats = {"hit": 0, "miss": 0, "store": 0}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.monotonic() - entry[0] < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.stats["hit"] += 1
+                    return entry[1]
+                del self._entries[key]
+            self.stats["miss"] += 1
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            self.stats["store"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # ===== 그래프 노드 =====
+
+    @staticmethod
+    def key_for(state: Dict) -> str:
+        text = " ".join(state.get("user_input", "").split())
+        return (
+            f"{state.get('tenant') or ''}\x1f{state.get('channel') or ''}\x1f{state.get('style') or ''}"
+            f"\x1f{context_signature(state)}\x1f{text}"
+        )
+
+    def lookup(self, state: Dict) -> Dict:
+        """cache 노드: 적중 시 저장된 intent/응답을 채우고 state['cache_hit']=True."""
+        cached = self.get(self.key_for(state))
+        state["cache_hit"] = cached is not None
+        if cached is not None:
+            state.update(cached)
+        return state
+
+    def store(self, state: Dict) -> Dict:
+        """cache_store 노드: 캐시 가능한 intent의 최종 응답을 저장."""
+        intents = state.get("intents") or [state.get("intent")]
+        if all(i in CACHEABLE_INTENTS for i in intents):
+            value = {k: state[k] for k in ("intent", "intents", "response", "final_text") if k in state}
+            self.put(self.key_for(state), value)
+        return state
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_default_cache: Optional[ResponseCache] = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[ResponseCache]:
+    """GRAPH_CACHE=0 이면 None, 아니면 프로세스 공용 캐시를 반환."""
+    global _default_cache
+    if os.getenv("GRAPH_CACHE", "1") == "0":
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache(
+                ttl=float(os.getenv("GRAPH_CACHE_TTL", "300")),
+                max_entries=int(os.getenv("GRAPH_CACHE_MAX_ENTRIES", "1024")),
+            )
+        return _default_cache
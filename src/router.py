@@ -1,4 +1,9 @@
-from typing import Dict, Literal, Tuple
+import os
+import threading
+from collections import Counter
+from typing import Dict, List, Literal, Tuple
+
+from src.style_agent import already_styled, skips_style
 
 INTENTS = Literal["rag", "phone", "app", "human"]
 
@@ -19,15 +24,103 @@ def classify_intent(user_input: str) -> INTENTS:
     return "rag"  # 기본값
 
 
-def need_style(user_input: str) -> bool:
-    # 느낌표/반말/무응답 등을 고려해 일괄적으로 적용하도록 기본 True
-    return True
+def classify_intents(user_input: str) -> List[INTENTS]:
+    """키워드가 걸리는 모든 intent를 KEYWORDS 순서로 반환 (첫 번째가 classify_intent 결과).
+
+    예: "환불 문제로 전화 연결" -> ["phone", "human"]
+    """
+    lowered = user_input.lower()
+    intents = [
+        intent for intent, words in KEYWORDS.items()
+        if any(w.lower() in lowered for w in words)
+    ]
+    return intents or ["rag"]  # type: ignore
+
+
+# 세션 문맥(state['session'], session_store.record_turn 형식)을 쓰는 후속 발화 판단
+# - 앞 턴을 가리키는 표현이 있는 짧은 발화만 후속 발화로 봄 ("그럼 전화로요", "다시 알려줘")
+# - 키워드가 없는 후속 발화는 직전 intent를 이어받고(route), rag 질의는 직전 질문을 붙여 검색(rag_agent)
+FOLLOW_UP_MARKERS = ("그럼", "그거", "그건", "그것", "그렇다면", "다시", "아까", "방금", "이어서", "더 알려")
+FOLLOW_UP_MAX_CHARS = int(os.getenv("FOLLOW_UP_MAX_CHARS", "20"))
+
+
+def is_follow_up(state: Dict) -> bool:
+    """세션에 이전 턴이 있고 현재 입력이 앞 턴을 가리키는 짧은 발화인지."""
+    session = state.get("session") or {}
+    if not session.get("history"):
+        return False
+    text = (state.get("user_input") or "").strip()
+    return 0 < len(text) <= FOLLOW_UP_MAX_CHARS and any(m in text for m in FOLLOW_UP_MARKERS)
+
+
+def previous_turn(state: Dict) -> Dict:
+    """세션의 직전 턴 (차단되지 않은 마지막 턴, 없으면 빈 dict)."""
+    for turn in reversed((state.get("session") or {}).get("history") or []):
+        if turn.get("user"):
+            return turn
+    return {}
+
+
+def context_signature(state: Dict) -> str:
+    """응답에 영향을 주는 세션 문맥 요약 (후속 발화가 아니면 빈 문자열, 응답 캐시 키에 사용)."""
+    if not is_follow_up(state):
+        return ""
+    turn = previous_turn(state)
+    return f"{turn.get('intent') or ''}:{' '.join(str(turn.get('user', '')).split())}"
+
+
+# 이보다 긴 응답은 화법 없이 그대로 전달 (문서형 답변에 인사말을 붙이는 비용/가독성 대비 이득이 작음)
+STYLE_MAX_CHARS = int(os.getenv("STYLE_MAX_CHARS", "2000"))
+
+_style_decisions: Counter = Counter()
+_style_lock = threading.Lock()
+
+
+def style_decision(state: Dict) -> str:
+    """화법 적용 여부와 사유. 'apply'로 시작하면 style 노드를 실행.
+
+    에이전트 실행 후(응답이 채워진 뒤) 판단하며, 비용이 작은 순서로 확인합니다.
+    """
+    response = state.get("response") or ""
+    if not response:
+        return "apply_empty"  # 빈 응답 안내 문구가 필요
+    if skips_style(state):
+        return "skip_style"  # 채널/intent 규칙상 화법 없음 (기본 설정: 정해진 문구로 답하는 phone/app)
+    if len(response) > STYLE_MAX_CHARS:
+        return "skip_long"
+    if already_styled(state):
+        return "skip_already_styled"  # 응답에 인사말/맺음말이 이미 있음
+    return "apply"
+
+
+def need_style(state: Dict) -> bool:
+    reason = style_decision(state)
+    with _style_lock:
+        _style_decisions[reason] += 1
+    return reason.startswith("apply")
+
+
+def style_decision_stats() -> Dict[str, int]:
+    """프로세스 시작 이후 사유별 화법 판단 횟수."""
+    with _style_lock:
+        return dict(_style_decisions)
 
 
 def route(state: Dict) -> Dict:
-    """그래프 첫 단계: 의도 분류 및 스타일 적용 여부 결정."""
+    """그래프 첫 단계: 의도 분류.
+
+    - intent: 대표 intent (응답 라벨/캐시 판단 기준)
+    - intents: 후보 intent 전체. 2개 이상이면 그래프가 fanout 노드에서 병렬 실행
+    키워드가 없는 후속 발화는 세션의 직전 intent를 이어받음 (state['intent_source']='session').
+    화법 적용 여부는 에이전트 실행 후 need_style(state)로 결정합니다.
+    """
     user_input = state.get("user_input", "")
-    intent: INTENTS = classify_intent(user_input)
-    state["intent"] = intent
-    state["apply_style"] = need_style(user_input)
+    intents = classify_intents(user_input)
+    if intents == ["rag"] and is_follow_up(state):
+        last_intent = previous_turn(state).get("intent")
+        if last_intent in KEYWORDS:
+            intents = [last_intent]
+            state["intent_source"] = "session"
+    state["intent"] = intents[0]
+    state["intents"] = intents
     return state
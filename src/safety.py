@@ -97,3 +97,18 @@ def moderate_or_block(user_input: str) -> Tuple[bool, str, Dict[str, int]]:
     return False, sanitized, stats
 
 
+def moderate(state: Dict) -> Dict:
+    """그래프 첫 단계: 안전 필터링.
+
+    - 통과 시 user_input을 정제 텍스트로 바꾸고 통계를 state['_safety_stats']에 기록
+    - 차단 시 state['blocked']=True, intent='blocked', final_text에 차단 메시지를 설정
+    """
+    blocked, text, stats = moderate_or_block(state.get("user_input", ""))
+    state["_safety_stats"] = stats
+    state["blocked"] = blocked
+    if blocked:
+        state["intent"] = "blocked"
+        state["final_text"] = text
+    else:
+        state["user_input"] = text
+    return state
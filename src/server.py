@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from src.agents.rag_tenants import valid_tenant
+from src.router import style_decision_stats
+from src.session_store import SessionStore, get_default_store, record_turn
+from src.tracing import get_default_tracer
+
+
+# LangGraph 파이프라인을 app_api_streamlit.py가 기대하는 `/agent/` 계약으로 제공하는 ASGI 서비스
+# - 프레임워크 없이 순수 ASGI로 구현 (실행은 uvicorn)
+# - 안전 필터링과 그래프 실행은 제한된 크기의 워커 풀에서 수행
+# - 대기 요청이 한도를 넘으면 503으로 즉시 거절(부하 시 지연 누적 방지)
+# - session_id별 대화 상태(최근 턴 요약)는 SessionStore에 저장해 다음 요청의 state['session']으로 전달
+#
+# 실행 예:
+#   python -m src.server                      # 단일 프로세스
+#   uvicorn src.server:app --workers 4        # 프로세스 단위 수평 확장
+
+AGENT_WORKERS = int(os.getenv("AGENT_WORKERS", str(os.cpu_count() or 4)))
+AGENT_MAX_PENDING = int(os.getenv("AGENT_MAX_PENDING", str(AGENT_WORKERS * 4)))
+MAX_BODY_BYTES = 64 * 1024
+
+# 그래프 intent → API intent 라벨 (UI는 QNA 외에는 AICC 배지로 표시)
+INTENT_LABELS = {"rag": "QNA", "phone": "AICC", "app": "AICC", "human": "AICC"}
+
+
+class AgentService:
+    """요청 1건을 처리하는 동기 서비스 (워커 스레드에서 실행).
+    store를 생략하면 프로세스 공용 세션 저장소를 사용.
+    """
+
+    def __init__(self, graph: Any = None, store: Optional[SessionStore] = None):
+        if graph is None:
+            from src.graph import build_graph
+            graph = build_graph()
+        self.graph = graph
+        self.store = store if store is not None else get_default_store()
+
+    def handle(
+        self, user_id: str, session_id: str, human: str, channel: str = "api", tenant: Optional[str] = None
+    ) -> Dict[str, Any]:
+        response: Dict[str, Any] = {
+            "user_id": user_id,
+            "session_id": session_id,
+            "guardrail_result": "PASS",
+            "sentiment": "NEUTRAL",
+            "refUrl": [],
+        }
+        context = self.store.load(session_id)
+        inputs = {"user_input": human, "channel": channel, "session": context}
+        if tenant:
+            inputs["tenant"] = tenant
+        result = self.graph.invoke(inputs)
+        self.store.save(session_id, record_turn(context, result))
+        if result.get("blocked"):
+            response.update(response=result.get("final_text", ""), guardrail_result="FAIL", intent="BLOCKED")
+            return response
+        response["response"] = result.get("final_text") or result.get("response") or "(응답이 없습니다)"
+        response["intent"] = INTENT_LABELS.get(result.get("intent", ""), "QNA")
+        return response
+
+
+class AgentServer:
+    """ASGI 애플리케이션. lifespan 시작 시 그래프와 워커 풀을 준비합니다."""
+
+    def __init__(self, workers: int = AGENT_WORKERS, max_pending: int = AGENT_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.service: Optional[AgentService] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.pending = 0  # 이벤트 루프 스레드에서만 변경
+        self.stats = {"requests": 0, "rejected": 0, "errors": 0}
+
+    def startup(self) -> None:
+        if self.service is None:
+            self.service = AgentService()
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="agent")
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    async def __call__(self, scope: Dict[str, Any], receive, send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        status, body, headers = await self._dispatch(scope, receive)
+        if isinstance(body, str):
+            content_type = b"text/plain; version=0.0.4; charset=utf-8"
+            payload = body.encode("utf-8")
+        else:
+            content_type = b"application/json; charset=utf-8"
+            payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", content_type)] + headers,
+        })
+        await send({"type": "http.response.body", "body": payload})
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    self.startup()
+                except Exception as exc:
+                    await send({"type": "lifespan.startup.failed", "message": str(exc)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _dispatch(self, scope: Dict[str, Any], receive) -> Tuple[int, Any, list]:
+        path = scope.get("path", "").rstrip("/")
+        method = scope.get("method", "GET")
+        if path == "/health":
+            return 200, {"status": "ok", "pending": self.pending, "workers": self.workers, **self.stats}, []
+        if path == "/metrics":
+            # 화법 판단 카운터 + 노드별 지연 (노드 지연은 GRAPH_TRACING=1 일 때만)
+            tracer = get_default_tracer()
+            return 200, _style_metrics() + (tracer.to_prometheus() if tracer is not None else ""), []
+        if path != "/agent":
+            return 404, {"detail": "Not Found"}, []
+        if method != "POST":
+            return 405, {"detail": "Method Not Allowed"}, [(b"allow", b"POST")]
+
+        body = await _read_body(receive)
+        if body is None:
+            return 413, {"detail": "요청 본문이 너무 큽니다."}, []
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            return 400, {"detail": "JSON 형식이 아닙니다."}, []
+        if not isinstance(payload, dict) or not isinstance(payload.get("human"), str) or not payload["human"].strip():
+            return 422, {"detail": "'human' 필드(문자열)가 필요합니다."}, []
+        user_id = str(payload.get("user_id") or "") or f"user-{uuid.uuid4().hex[:12]}"
+        session_id = str(payload.get("session_id") or "") or f"session-{uuid.uuid4().hex}"
+        tenant = str(payload.get("tenant") or "") or None
+        if tenant is not None and not valid_tenant(tenant):
+            return 422, {"detail": "'tenant'는 영문/숫자/-/_ 로 된 64자 이하 문자열이어야 합니다."}, []
+
+        if self.executor is None or self.service is None:
+            self.startup()
+        if self.pending >= self.max_pending:
+            self.stats["rejected"] += 1
+            return 503, {"detail": "요청이 많아 잠시 후 다시 시도해주세요."}, [(b"retry-after", b"1")]
+
+        self.pending += 1
+        self.stats["requests"] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self.executor, self.service.handle, user_id, session_id, payload["human"],
+                str(payload.get("channel") or "api"), tenant,
+            )
+            return 200, result, []
+        except Exception as exc:
+            self.stats["errors"] += 1
+            return 500, {"detail": f"처리 중 오류가 발생했습니다: {exc}"}, []
+        finally:
+            self.pending -= 1
+
+
+def _style_metrics() -> str:
+    lines = [
+        "# HELP graph_style_decisions_total Style node decisions by reason (apply* runs the style node).",
+        "# TYPE graph_style_decisions_total counter",
+    ]
+    for reason, count in sorted(style_decision_stats().items()):
+        lines.append(f'graph_style_decisions_total{{reason="{reason}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+async def _read_body(receive) -> Optional[bytes]:
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+app = AgentServer()
+
+
+def main() -> None:
+    import uvicorn
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    uvicorn.run(
+        "src.server:app",
+        host=os.getenv("AGENT_HOST", "127.0.0.1"),
+        port=int(os.getenv("AGENT_PORT", "8000")),
+        workers=int(os.getenv("AGENT_PROCESSES", "1")),
+    )
+
+
+if __name__ == "__main__":
+    main()
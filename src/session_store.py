@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# 세션별 대화 상태 체크포인트 (로컬 SQLite)
+# - 그래프 결과 전체가 아니라 다음 턴에 필요한 요약 상태만 저장 (record_turn 참고)
+# - 저장은 메모리 버퍼에 모았다가 백그라운드 스레드가 한 트랜잭션으로 기록 (같은 세션은 마지막 값만)
+# - 조회는 버퍼를 먼저 확인하므로 방금 저장한 값을 바로 읽을 수 있음
+# - WAL 모드로 읽기와 쓰기가 서로 막지 않음, TTL이 지난 세션은 주기적으로 삭제
+#
+# 환경변수:
+#   SESSION_DB_PATH          DB 파일 경로 (기본 .sessions/sessions.db)
+#   SESSION_TTL_SECONDS      마지막 저장 후 유지 시간 (기본 86400)
+#   SESSION_FLUSH_INTERVAL   버퍼 기록 주기(초, 기본 0.05)
+#   SESSION_BATCH_SIZE       버퍼가 이 크기에 도달하면 즉시 기록 (기본 128)
+#   SESSION_HISTORY_TURNS    세션에 보관할 최근 턴 수 (기본 20)
+
+SESSION_HISTORY_TURNS = int(os.getenv("SESSION_HISTORY_TURNS", "20"))
+_SNIPPET_CHARS = 200
+_COMPRESS_MIN_BYTES = 256
+
+
+def encode_state(state: Dict[str, Any]) -> bytes:
+    """compact JSON, 일정 크기 이상이면 zlib 압축. 첫 바이트로 형식을 구분."""
+    raw = json.dumps(state, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(raw) >= _COMPRESS_MIN_BYTES:
+        return b"z" + zlib.compress(raw, 1)
+    return b"j" + raw
+
+
+def decode_state(blob: bytes) -> Dict[str, Any]:
+    kind, body = blob[:1], blob[1:]
+    if kind == b"z":
+        body = zlib.decompress(body)
+    return json.loads(body.decode("utf-8"))
+
+
+def record_turn(context: Dict[str, Any], result: Dict[str, Any], max_turns: int = SESSION_HISTORY_TURNS) -> Dict[str, Any]:
+    """그래프 결과 1턴을 세션 상태에 반영한 새 상태를 반환합니다."""
+    answer = result.get("final_text") or result.get("response") or ""
+    turn = {
+        # 차단된 입력은 원문이 남아 있으므로 저장하지 않음
+        "user": "" if result.get("blocked") else result.get("user_input", ""),
+        "intent": result.get("intent"),
+        "bot": answer[:_SNIPPET_CHARS],
+        "ts": round(time.time(), 3),
+    }
+    history = list(context.get("history") or [])[-(max_turns - 1):] if max_turns > 1 else []
+    return {
+        "turns": int(context.get("turns", 0)) + 1,
+        "last_intent": result.get("intent"),
+        "history": history + [turn],
+    }
+
+
+class SessionStore:
+    """session_id → 세션 상태 저장소."""
+
+    def __init__(
+        self,
+        path: str = ".sessions/sessions.db",
+        ttl: float = 86400.0,
+        flush_interval: float = 0.05,
+        batch_size: int = 128,
+        evict_interval: float = 60.0,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.evict_interval = evict_interval
+        self.stats = {"saves": 0, "flushes": 0, "rows_written": 0, "evicted": 0}
+        self._pending: Dict[str, Tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._local = threading.local()
+        self._conns: Optional[List[sqlite3.Connection]] = []  # close()에서 모든 스레드의 연결을 닫기 위해 보관
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY, state BLOB NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions(updated_at)")
+        conn.commit()
+        self._writer = threading.Thread(target=self._run_writer, name="session-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        # 스레드마다 별도 연결 (WAL: 여러 리더 + 단일 라이터)
+        # check_same_thread=False: 사용은 만든 스레드에서만 하고, close()가 다른 스레드에서 닫을 수 있도록
+        if self._conns is None:
+            raise RuntimeError("SessionStore가 닫혔습니다.")
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            with self._lock:
+                conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+                conn.execute("PRAGMA synchronous=NORMAL")
+                self._conns.append(conn)
+            self._local.conn = conn
+        return conn
+
+    # ===== 조회/저장 =====
+
+    def load(self, session_id: str) -> Dict[str, Any]:
+        """세션 상태를 반환. 없거나 TTL이 지났으면 빈 dict."""
+        now = time.time()
+        with self._lock:
+            pending = self._pending.get(session_id)
+        if pending is not None:
+            blob, updated_at = pending
+        else:
+            row = self._connect().execute(
+                "SELECT state, updated_at FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return {}
+            blob, updated_at = row
+        if now - updated_at > self.ttl:
+            return {}
+        return decode_state(blob)
+
+    def save(self, session_id: str, state: Dict[str, Any]) -> None:
+        """버퍼에 저장하고 반환 (기록은 백그라운드 스레드가 일괄 수행)."""
+        blob = encode_state(state)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("SessionStore가 닫혔습니다.")
+            self._pending[session_id] = (blob, time.time())
+            self.stats["saves"] += 1
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._pending.pop(session_id, None)
+        conn = self._connect()
+        conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        conn.commit()
+
+    # ===== 기록/정리 =====
+
+    def flush(self) -> int:
+        """버퍼를 한 트랜잭션으로 기록하고 기록한 행 수를 반환."""
+        with self._lock:
+            if not self._pending:
+                return 0
+            batch = [(sid, blob, ts) for sid, (blob, ts) in self._pending.items()]
+        conn = self._connect()
+        conn.executemany(
+            "INSERT OR REPLACE INTO sessions (session_id, state, updated_at) VALUES (?, ?, ?)", batch
+        )
+        conn.commit()
+        with self._lock:
+            # 기록 중에 다시 저장된 세션은 버퍼에 남김
+            for sid, blob, ts in batch:
+                if self._pending.get(sid, (None,))[0] is blob:
+                    del self._pending[sid]
+            self.stats["flushes"] += 1
+            self.stats["rows_written"] += len(batch)
+        return len(batch)
+
+    def evict_expired(self) -> int:
+        conn = self._connect()
+        cur = conn.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl,))
+        conn.commit()
+        with self._lock:
+            self.stats["evicted"] += cur.rowcount
+        return cur.rowcount
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def _run_writer(self) -> None:
+        next_evict = time.monotonic() + self.evict_interval
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                if time.monotonic() >= next_evict:
+                    self.evict_expired()
+                    next_evict = time.monotonic() + self.evict_interval
+            except sqlite3.Error:
+                # 일시적인 잠금 등은 다음 주기에 재시도 (버퍼는 유지됨)
+                time.sleep(self.flush_interval)
+
+    def close(self) -> None:
+        """남은 버퍼를 기록하고 백그라운드 스레드를 종료한 뒤 모든 스레드의 연결을 닫음."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join()
+        self.flush()
+        with self._lock:
+            conns, self._conns = self._conns, None
+        for conn in conns:
+            conn.close()
+
+
+_default_store: Optional[SessionStore] = None
+_default_lock = threading.Lock()
+
+
+def get_default_store() -> SessionStore:
+    """프로세스 공용 세션 저장소 (프로세스 종료 시 남은 버퍼를 기록)."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = SessionStore(
+                path=os.getenv("SESSION_DB_PATH", ".sessions/sessions.db"),
+                ttl=float(os.getenv("SESSION_TTL_SECONDS", "86400")),
+                flush_interval=float(os.getenv("SESSION_FLUSH_INTERVAL", "0.05")),
+                batch_size=int(os.getenv("SESSION_BATCH_SIZE", "128")),
+            )
+            # 종료 시 버퍼에 남은 저장분 기록
+            atexit.register(_default_store.close)
+        return _default_store
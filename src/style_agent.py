@@ -1,17 +1,132 @@
-from typing import Dict
+from __future__ import annotations
+
+import json
+import os
+import string
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+# 화법(스타일) 적용
+# - src/styles.json의 템플릿을 프로세스당 1회 읽어 "{response}" 기준 조각으로 미리 분해(compile)
+# - 적용 시에는 조각과 응답을 한 번에 이어 붙이기만 함
+# - 스타일 선택: state['style'] > styles.json channels[state['channel']][intent] > channels[...]['default']
+# - 템플릿이 null이거나 "{response}" 뿐인 스타일(예: "none", "concise")은 화법을 건너뜀
+#   (router.need_style이 style 노드 자체를 생략하고 호출자는 response를 그대로 사용)
+#   기본 설정은 접수/딥링크 안내처럼 정해진 문구로 답하는 phone/app intent에 "concise"를 써서 화법을 건너뜀
+# - 응답이 이미 스타일의 인사말로 시작하거나 맺음말로 끝나면(KB 문서에 인사말이 들어 있는 경우 등) 건너뜀
+#
+# 환경변수:
+#   STYLES_PATH  스타일 설정 파일 경로 (기본 src/styles.json)
+
+DEFAULT_STYLES_PATH = Path(__file__).with_name("styles.json")
+PLACEHOLDER = "response"
+
+
+class CompiledStyle:
+    """"{response}" 자리표시자를 기준으로 분해된 템플릿."""
+
+    __slots__ = ("name", "parts")
+
+    def __init__(self, name: str, template: str):
+        self.name = name
+        parts = []
+        literal_buf = ""
+        for literal, field, spec, conv in string.Formatter().parse(template):
+            literal_buf += literal
+            if field is None:
+                continue
+            if field != PLACEHOLDER or spec or conv:
+                raise ValueError(f"스타일 '{name}': 지원하지 않는 자리표시자 {{{field}}}")
+            parts.append(literal_buf)
+            literal_buf = ""
+        parts.append(literal_buf)
+        self.parts: Tuple[str, ...] = tuple(parts)
+
+    @property
+    def is_identity(self) -> bool:
+        return self.parts == ("", "")
+
+    def already_applied(self, text: str) -> bool:
+        """text가 이미 이 스타일의 앞 문구로 시작하거나 뒤 문구로 끝나는지 (공백 차이 무시)."""
+        head, tail = self.parts[0].strip(), self.parts[-1].strip()
+        text = text.strip()
+        return bool(head and text.startswith(head)) or bool(tail and text.endswith(tail))
+
+    def render(self, text: str) -> str:
+        if len(self.parts) == 2:
+            return self.parts[0] + text + self.parts[1]
+        return text.join(self.parts)
+
+
+class StyleRegistry:
+    """채널/intent별 스타일 선택 규칙과 컴파일된 템플릿."""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.empty_text: str = config.get("empty_text", "")
+        self.default_channel: str = config.get("default_channel", "web")
+        self.styles: Dict[str, Optional[CompiledStyle]] = {}
+        for name, template in config.get("styles", {}).items():
+            style = CompiledStyle(name, template) if template is not None else None
+            self.styles[name] = None if style is None or style.is_identity else style
+        self.channels: Dict[str, Dict[str, str]] = config.get("channels", {})
+        for channel, rules in self.channels.items():
+            for key, name in rules.items():
+                if name not in self.styles:
+                    raise ValueError(f"채널 '{channel}'의 '{key}' 규칙: 알 수 없는 스타일 '{name}'")
+        if self.default_channel not in self.channels:
+            raise ValueError(f"기본 채널 '{self.default_channel}' 규칙이 없습니다")
+
+    @classmethod
+    def from_file(cls, path: Path) -> "StyleRegistry":
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    def style_name(self, state: Dict) -> str:
+        name = state.get("style")
+        if name in self.styles:
+            return name
+        rules = self.channels.get(state.get("channel") or self.default_channel) or self.channels[self.default_channel]
+        return rules.get(state.get("intent") or "", rules.get("default", ""))
+
+    def resolve(self, state: Dict) -> Optional[CompiledStyle]:
+        """적용할 스타일. 건너뛰는 스타일이면 None."""
+        return self.styles.get(self.style_name(state))
+
+
+_registry: Optional[StyleRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_style_registry() -> StyleRegistry:
+    """프로세스 공용 스타일 레지스트리 (최초 호출 시 1회 로드)."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = StyleRegistry.from_file(Path(os.getenv("STYLES_PATH", str(DEFAULT_STYLES_PATH))))
+    return _registry
+
+
+def skips_style(state: Dict) -> bool:
+    """선택된 스타일이 화법을 건너뛰는 스타일인지 여부."""
+    return get_style_registry().resolve(state) is None
+
+
+def already_styled(state: Dict) -> bool:
+    """응답에 선택된 스타일의 인사말/맺음말이 이미 들어 있는지 여부."""
+    style = get_style_registry().resolve(state)
+    return style is not None and style.already_applied(state.get("response") or "")
 
 
 def apply_style(state: Dict) -> Dict:
-    """최종 응답에 공손하고 명확한 한국어 화법을 적용(간단 규칙 기반)."""
+    """최종 응답에 채널/intent별 화법 템플릿을 적용."""
+    registry = get_style_registry()
     text = state.get("response") or ""
     if not text:
-        state["final_text"] = "죄송합니다. 현재 드릴 수 있는 답변이 없습니다."
+        state["final_text"] = registry.empty_text
         return state
 
-    styled = (
-        "안녕하세요. 문의 주셔서 감사합니다.\n"
-        f"{text}\n\n"
-        "추가로 도움이 필요하시면 언제든지 말씀해 주세요."
-    )
-    state["final_text"] = styled
+    style = registry.resolve(state)
+    state["final_text"] = style.render(text) if style is not None else text
     return state
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import functools
+import json
+import math
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional
+
+
+# 그래프 노드별 지연 계측
+# - build_graph(tracer=...)로 전달되면 등록되는 모든 노드를 감싸서 실행마다 기록
+# - 꺼져 있으면 원래 함수를 그대로 등록하므로 추가 비용이 없음
+# - 기록은 고정 크기 링 버퍼에 보관하고 JSON/Prometheus 텍스트로 내보냄
+#
+# 환경변수:
+#   GRAPH_TRACING=1        기본 트레이서 사용
+#   GRAPH_TRACING_ALLOC=1  tracemalloc으로 할당량 변화도 기록 (오버헤드 큼)
+#   GRAPH_TRACING_BUFFER   링 버퍼 크기 (기본 4096)
+
+
+class NodeRecord(NamedTuple):
+    node: str
+    started_at: float  # time.time()
+    wall_s: float
+    cpu_s: float  # 실행 스레드의 CPU 시간
+    alloc_bytes: Optional[int]  # tracemalloc 현재 사용량 변화 (다른 스레드 할당 포함 가능)
+    ok: bool
+
+
+class NodeTracer:
+    """노드 실행 기록용 링 버퍼."""
+
+    def __init__(self, capacity: int = 4096, track_alloc: bool = False):
+        self.track_alloc = track_alloc
+        self._records: Deque[NodeRecord] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        if track_alloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def wrap(self, name: str, fn: Callable[[Dict], Dict]) -> Callable[[Dict], Dict]:
+        """노드 함수를 계측 함수로 감쌉니다."""
+        track_alloc = self.track_alloc
+        records = self._records
+        lock = self._lock
+
+        @functools.wraps(fn)
+        def traced(state: Dict) -> Dict:
+            mem0 = tracemalloc.get_traced_memory()[0] if track_alloc else None
+            started_at = time.time()
+            c0 = time.thread_time()
+            t0 = time.perf_counter()
+            ok = False
+            try:
+                result = fn(state)
+                ok = True
+                return result
+            finally:
+                wall = time.perf_counter() - t0
+                cpu = time.thread_time() - c0
+                alloc = tracemalloc.get_traced_memory()[0] - mem0 if mem0 is not None else None
+                with lock:
+                    records.append(NodeRecord(name, started_at, wall, cpu, alloc, ok))
+
+        return traced
+
+    def records(self) -> List[NodeRecord]:
+        with self._lock:
+            return list(self._records)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """노드별 횟수/합계/분위수 요약 (버퍼에 남아 있는 기록 기준)."""
+        by_node: Dict[str, List[NodeRecord]] = {}
+        for r in self.records():
+            by_node.setdefault(r.node, []).append(r)
+        out: Dict[str, Dict[str, Any]] = {}
+        for node, recs in sorted(by_node.items()):
+            walls = sorted(r.wall_s for r in recs)
+            allocs = [r.alloc_bytes for r in recs if r.alloc_bytes is not None]
+            out[node] = {
+                "count": len(recs),
+                "errors": sum(1 for r in recs if not r.ok),
+                "wall_sum_s": sum(walls),
+                "cpu_sum_s": sum(r.cpu_s for r in recs),
+                "wall_p50_s": _quantile(walls, 0.5),
+                "wall_p95_s": _quantile(walls, 0.95),
+                "wall_p99_s": _quantile(walls, 0.99),
+                "alloc_sum_bytes": sum(allocs) if allocs else None,
+            }
+        return out
+
+    def to_json(self, include_records: bool = False) -> str:
+        data: Dict[str, Any] = {"summary": self.summary()}
+        if include_records:
+            data["records"] = [r._asdict() for r in self.records()]
+        return json.dumps(data, ensure_ascii=False)
+
+    def to_prometheus(self, prefix: str = "graph_node") -> str:
+        """Prometheus 텍스트 노출 형식."""
+        summary = self.summary()
+        lines = [
+            f"# HELP {prefix}_wall_seconds Wall time per graph node invocation.",
+            f"# TYPE {prefix}_wall_seconds summary",
+        ]
+        for node, s in summary.items():
+            for q, key in (("0.5", "wall_p50_s"), ("0.95", "wall_p95_s"), ("0.99", "wall_p99_s")):
+                lines.append(f'{prefix}_wall_seconds{{node="{node}",quantile="{q}"}} {s[key]:.9f}')
+            lines.append(f'{prefix}_wall_seconds_sum{{node="{node}"}} {s["wall_sum_s"]:.9f}')
+            lines.append(f'{prefix}_wall_seconds_count{{node="{node}"}} {s["count"]}')
+        lines += [
+            f"# HELP {prefix}_cpu_seconds CPU time per graph node invocation.",
+            f"# TYPE {prefix}_cpu_seconds summary",
+        ]
+        for node, s in summary.items():
+            lines.append(f'{prefix}_cpu_seconds_sum{{node="{node}"}} {s["cpu_sum_s"]:.9f}')
+            lines.append(f'{prefix}_cpu_seconds_count{{node="{node}"}} {s["count"]}')
+        lines += [
+            f"# HELP {prefix}_errors Failed graph node invocations in the buffer.",
+            f"# TYPE {prefix}_errors gauge",
+        ]
+        for node, s in summary.items():
+            lines.append(f'{prefix}_errors{{node="{node}"}} {s["errors"]}')
+        if any(s["alloc_sum_bytes"] is not None for s in summary.values()):
+            lines += [
+                f"# HELP {prefix}_alloc_bytes Net traced allocation delta per graph node.",
+                f"# TYPE {prefix}_alloc_bytes gauge",
+            ]
+            for node, s in summary.items():
+                if s["alloc_sum_bytes"] is not None:
+                    lines.append(f'{prefix}_alloc_bytes{{node="{node}"}} {s["alloc_sum_bytes"]}')
+        return "\n".join(lines) + "\n"
+
+
+def _quantile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+_default_tracer: Optional[NodeTracer] = None
+_default_lock = threading.Lock()
+
+
+def get_default_tracer() -> Optional[NodeTracer]:
+    """GRAPH_TRACING=1 이면 프로세스 공용 트레이서를, 아니면 None을 반환."""
+    global _default_tracer
+    if os.getenv("GRAPH_TRACING", "0") != "1":
+        return None
+    with _default_lock:
+        if _default_tracer is None:
+            _default_tracer = NodeTracer(
+                capacity=int(os.getenv("GRAPH_TRACING_BUFFER", "4096")),
+                track_alloc=os.getenv("GRAPH_TRACING_ALLOC", "0") == "1",
+            )
+        return _default_tracer
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import html as html_lib
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+# URL → 버튼 라벨 결정 유틸리티
+# 설정 파일(button_labels.json)을 프로세스당 1회 읽어 접두사 인덱스/키워드 목록을 미리 구성한다.
+# Streamlit 스크립트는 rerun 마다 모듈 전역이 다시 만들어지므로, 재사용할 상태는 이 모듈에 둔다.
+
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parents[1] / "button_labels.json"
+
+# 텍스트 내 URL 패턴 (http/https 및 커스텀 스킴)
+URL_RE = re.compile(r"(https?://[^\s]+|[a-zA-Z][a-zA-Z0-9+.-]*://[^\s]+)")
+
+class ButtonLabelResolver:
+    """URL에 맞는 버튼 라벨을 반환하는 리졸버.
+
+    - label_for_link: 본문 내 링크용. 설정된 URL 접두사 중 가장 긴 것과 매칭(접두사 인덱스)
+    - label_for_ref_url: refUrl 버튼용. 키워드(설정 순서 우선) → 스킴 → 도메인 순으로 결정
+    """
+
+    def __init__(
+        self,
+        link_prefixes: Dict[str, str],
+        ref_keywords: List[Tuple[str, str]],
+        ref_schemes: Optional[Dict[str, str]] = None,
+        link_default: str = "링크 열기",
+        ref_default: str = "링크",
+        cache_size: int = 4096,
+    ):
+        self.link_default = link_default
+        self.ref_default = ref_default
+        # 접두사 인덱스: 가장 짧은 접두사 길이만큼의 앞부분(head)으로 버킷을 나누고,
+        # 버킷 안은 긴 접두사부터 검사해 가장 구체적인 패턴이 우선하도록 한다.
+        self._head_len = min((len(p) for p in link_prefixes), default=0)
+        self._prefix_buckets: Dict[str, List[Tuple[str, str]]] = {}
+        for prefix, label in link_prefixes.items():
+            self._prefix_buckets.setdefault(prefix[: self._head_len], []).append((prefix, label))
+        for bucket in self._prefix_buckets.values():
+            bucket.sort(key=lambda item: len(item[0]), reverse=True)
+
+        # 키워드는 설정 순서가 우선순위. 소문자로 미리 정규화해 둔다.
+        self._keywords: Tuple[Tuple[str, str], ...] = tuple((kw.lower(), label) for kw, label in ref_keywords)
+        self._schemes = {k.lower(): v for k, v in (ref_schemes or {}).items()}
+
+        # 같은 메시지가 rerun 마다 다시 렌더링되므로 결과를 캐시
+        self.label_for_link = lru_cache(maxsize=cache_size)(self._label_for_link)
+        self.label_for_ref_url = lru_cache(maxsize=cache_size)(self._label_for_ref_url)
+
+    @classmethod
+    def from_config(cls, path: Path = DEFAULT_CONFIG_PATH) -> "ButtonLabelResolver":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(
+            link_prefixes=data.get("link_prefixes", {}),
+            ref_keywords=[(e["keyword"], e["label"]) for e in data.get("ref_keywords", [])],
+            ref_schemes=data.get("ref_schemes", {}),
+            link_default=data.get("link_default", "링크 열기"),
+            ref_default=data.get("ref_default", "링크"),
+        )
+
+    def _label_for_link(self, url: str) -> str:
+        if not url:
+            return "링크"
+        if self._head_len and len(url) >= self._head_len:
+            for prefix, label in self._prefix_buckets.get(url[: self._head_len], ()):
+                if url.startswith(prefix):
+                    return label
+        return self.link_default
+
+    def _label_for_ref_url(self, url: str) -> str:
+        if not url or not isinstance(url, str):
+            return self.ref_default
+        url_lower = url.lower()
+
+        for keyword, label in self._keywords:
+            if keyword in url_lower:
+                return label
+
+        scheme, sep, _ = url_lower.partition(":")
+        if sep and scheme in self._schemes:
+            return self._schemes[scheme]
+
+        # 매칭되지 않으면 도메인 기반 텍스트 생성
+        try:
+            parsed_url = urlparse(url)
+        except ValueError:
+            return self.ref_default
+        if parsed_url.scheme and parsed_url.netloc:
+            domain = parsed_url.netloc
+            return domain[4:] if domain.startswith("www.") else domain
+        return self.ref_default
+
+
+@lru_cache(maxsize=None)
+def get_resolver(path: Optional[str] = None) -> ButtonLabelResolver:
+    """설정 파일 경로별로 리졸버를 1회만 생성해 재사용."""
+    return ButtonLabelResolver.from_config(Path(path) if path else DEFAULT_CONFIG_PATH)
+
+
+def convert_links_to_buttons(text: str, resolver: Optional[ButtonLabelResolver] = None) -> str:
+    """텍스트 내 URL을 탐지해 버튼(anchor) HTML로 치환합니다."""
+    if not text:
+        return ""
+    resolver = resolver or get_resolver()
+    escaped = html_lib.escape(text)
+
+    def repl(match: re.Match) -> str:
+        url = match.group(0)
+        button_text = resolver.label_for_link(url)
+        safe_url = html_lib.escape(url)
+        return f'<a class="deeplink-btn" href="{safe_url}" target="_blank" rel="noopener noreferrer">{button_text}</a>'
+
+    return URL_RE.sub(repl, escaped)
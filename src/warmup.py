@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Optional
+
+
+# 시작 시간 단축용 백그라운드 준비
+# - langgraph/scikit-learn import, 그래프 컴파일, 공용 RAG 인덱스 생성을 별도 스레드에서 미리 수행
+# - 진입점(main.py, Streamlit 앱)은 start_warmup()만 호출하고 바로 화면/프롬프트를 띄운 뒤,
+#   첫 요청에서 get_graph()로 완료를 기다림 (프로세스당 1회)
+# - 실패하면 공용 Future를 비워 다음 start_warmup()/get_graph() 호출이 다시 시도함
+#   (이미 받은 Future는 예외를 그대로 전달)
+
+_future: Optional[Future] = None
+_lock = threading.Lock()
+
+
+def _warm_up(future: Future) -> None:
+    global _future
+    try:
+        from src.agents.rag_agent import get_shared_rag
+        from src.graph import build_graph
+
+        graph = build_graph()
+        get_shared_rag()
+        future.set_result(graph)
+    except BaseException as exc:
+        with _lock:
+            if _future is future:
+                _future = None
+        future.set_exception(exc)
+
+
+def start_warmup() -> Future:
+    """준비 작업을 시작(이미 시작했으면 기존 Future 반환). Future 결과는 컴파일된 그래프."""
+    global _future
+    with _lock:
+        if _future is None:
+            _future = Future()
+            threading.Thread(target=_warm_up, args=(_future,), name="graph-warmup", daemon=True).start()
+        return _future
+
+
+def get_graph(timeout: Optional[float] = None) -> Any:
+    """프로세스 공용 그래프. 준비가 끝나지 않았으면 완료될 때까지 대기."""
+    return start_warmup().result(timeout)